@@ -0,0 +1,46 @@
+"""Benchmark the at-most-one encodings of the one-hot constraints on the
+performance_evaluation.generate_examples workloads.
+
+For each workload and AMO mode, reports the variables and clauses of
+the encodings at the minimal size and at larger sizes, where the
+one-hot constraints dominate, and the time to solve them.
+
+Usage: python -m benchmarks.amo_encodings [n_tasks,n_subtasks,bound ...]
+"""
+import random
+import sys
+import time
+
+from pysat.solvers import Glucose4
+
+from dfa_identify import find_dfa
+from dfa_identify.amo import AMO_MODES
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from performance_evaluation import generate_examples
+
+
+def main(workloads, sizes=(16, 24)):
+    print('workload,amo,n_colors,variables,clauses,sat,solve_s')
+    for n_tasks, n_subtasks, bound in workloads:
+        random.seed(0)
+        accepting, rejecting = generate_examples(n_tasks, n_subtasks, bound)
+        apta = APTA.from_examples(accepting, rejecting)
+        minimal = len(find_dfa(accepting, rejecting).states())
+        name = f'{n_tasks}-{n_subtasks}-{bound}'
+        for n_colors in [minimal, *sizes]:
+            for amo in AMO_MODES:
+                codec, clauses = next(dfa_id_encodings(
+                    apta, sym_mode='bfs', bounds=(n_colors, n_colors),
+                    amo=amo, backend='numpy'))
+                start = time.perf_counter()
+                with Glucose4(bootstrap_with=clauses) as solver:
+                    sat = solver.solve()
+                elapsed = time.perf_counter() - start
+                print(f'{name},{amo},{n_colors},{codec.offsets[-1]},'
+                      f'{len(clauses)},{sat},{elapsed:.2f}')
+
+
+if __name__ == '__main__':
+    workloads = [tuple(map(int, w.split(','))) for w in sys.argv[1:]]
+    main(workloads or [(2, 3, 40), (3, 3, 60)])
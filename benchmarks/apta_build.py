@@ -0,0 +1,75 @@
+"""Benchmark APTA construction: array-backed APTA vs networkx prefix tree.
+
+Usage: python -m benchmarks.apta_build [n_traces ...]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from itertools import chain
+
+import networkx as nx
+
+from dfa_identify.graphs import APTA
+
+
+def legacy_from_examples(accepting, rejecting):
+    """The networkx based construction APTA.from_examples used to perform."""
+    tree, root = nx.prefix_tree(chain(accepting, rejecting)), 0
+    tree.remove_node(-1)
+
+    def transition(node, char):
+        for node in tree.neighbors(node):
+            if tree.nodes[node]['source'] == char:
+                return node
+
+    def access(word):
+        node = root
+        for char in word:
+            node = transition(node, char)
+        return node
+
+    for label, words in [(True, accepting), (False, rejecting)]:
+        for word in words:
+            tree.nodes[access(word)]['label'] = label
+
+    relabels = {n: i + 1 for i, n in enumerate(set(tree.nodes) - {root})}
+    relabels[root] = 0
+    nx.relabel_nodes(tree, relabels, copy=False)
+    return tree
+
+
+def random_traces(n_traces, n_symbols=8, max_len=30, seed=0):
+    """Up to n_traces distinct random traces, labeled alternately."""
+    rng = random.Random(seed)
+    symbols = [f'x{i}' for i in range(n_symbols)]
+    traces = list(dict.fromkeys(  # Repeats would get both labels.
+        tuple(rng.choices(symbols, k=rng.randint(1, max_len)))
+        for _ in range(n_traces)
+    ))
+    return traces[::2], traces[1::2]
+
+
+def measure(build, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(sizes):
+    print('traces,nodes,impl,seconds,peak_mb')
+    for n_traces in sizes:
+        accepting, rejecting = random_traces(n_traces)
+        for name, build in [('networkx', legacy_from_examples),
+                            ('array', APTA.from_examples)]:
+            result, elapsed, peak = measure(build, accepting, rejecting)
+            print(f'{n_traces},{len(result.nodes)},{name},'
+                  f'{elapsed:.2f},{peak / 2**20:.1f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,53 @@
+"""Benchmark checking DFAs against examples: DFA.label per word vs a
+single vectorized walk over the APTA.
+
+Usage: python -m benchmarks.check_dfas [n_words ...]
+"""
+import random
+import sys
+import time
+
+from dfa import DFA
+
+from dfa_identify.check import ExampleChecker
+from dfa_identify.graphs import APTA
+
+
+def random_dfa(n_states, symbols, rng):
+    delta = {(s, c): rng.randrange(n_states)
+             for s in range(n_states) for c in symbols}
+    accepting = {s for s in range(n_states) if rng.random() < 0.5}
+    return DFA(start=0, inputs=symbols, label=accepting.__contains__,
+               transition=lambda s, c: delta[s, c])
+
+
+def main(sizes, n_dfas=100):
+    rng = random.Random(0)
+    symbols = 'abcd'
+    dfas = [random_dfa(10, symbols, rng) for _ in range(n_dfas)]
+    print('words,nodes,dfas,label_s,checker_s')
+    for n_words in sizes:
+        target = random_dfa(10, symbols, rng)
+        words = {''.join(rng.choices(symbols, k=rng.randint(0, 20)))
+                 for _ in range(n_words)}
+        accepting = [w for w in words if target.label(w)]
+        rejecting = [w for w in words if not target.label(w)]
+        apta = APTA.from_examples(accepting, rejecting)
+
+        start = time.perf_counter()
+        slow = [sum(not d.label(w) for w in accepting) +
+                sum(d.label(w) for w in rejecting) for d in dfas]
+        label_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        checker = ExampleChecker(apta)
+        fast = [checker(d).count for d in dfas]
+        checker_time = time.perf_counter() - start
+        assert slow == fast
+
+        print(f'{n_words},{len(apta.nodes)},{n_dfas},{label_time:.2f},'
+              f'{checker_time:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100, 1_000, 10_000])
@@ -0,0 +1,33 @@
+"""Benchmark clause generation: Python generators vs NumPy blocks.
+
+Usage: python -m benchmarks.clause_backends [n_colors ...]
+"""
+import sys
+import time
+
+from dfa_identify.encoding import Codec, encode_dfa_id
+from dfa_identify.graphs import APTA, max_clique
+from benchmarks.clique_bound import random_instance
+
+
+def main(sizes):
+    apta = APTA.from_labeled(random_instance(8, n_words=2000, max_len=20))
+    cgraph = apta.consistency_graph(compact=True)
+    clique = max_clique(cgraph)
+    print(f'# {len(apta.nodes)} nodes, {cgraph.number_of_edges()} edges')
+    print('n_colors,clauses,python_s,numpy_s,python_cps,numpy_cps')
+    for n_colors in sizes:
+        codec = Codec.from_apta(apta, n_colors, sym_mode='bfs')
+        times = {}
+        for backend in ['python', 'numpy']:
+            start = time.perf_counter()
+            clauses = list(encode_dfa_id(apta, codec, cgraph, clique,
+                                         backend=backend))
+            times[backend] = time.perf_counter() - start
+        n = len(clauses)
+        print(f'{n_colors},{n},{times["python"]:.2f},{times["numpy"]:.2f},'
+              f'{n / times["python"]:.0f},{n / times["numpy"]:.0f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [5, 10])
@@ -0,0 +1,75 @@
+"""Benchmark the clique engine and the clique lower bound.
+
+Examples are random words labeled by a random target DFA. For each
+instance, compares networkx's approximate max_clique with the branch
+and bound engine and times the SAT calls for sizes below the clique
+size, which dfa_id_encodings now skips.
+
+Usage: python -m benchmarks.clique_bound [n_states ...]
+"""
+import random
+import sys
+import time
+
+from networkx.algorithms.approximation import clique as nx_clique
+from pysat.solvers import Glucose4
+
+from dfa_identify.clique import search_clique
+from dfa_identify.encoding import Codec, encode_dfa_id
+from dfa_identify.graphs import APTA
+
+
+def random_instance(n_states, n_words=300, max_len=12, seed=0):
+    rng = random.Random(seed)
+    delta = {(s, c): rng.randrange(n_states)
+             for s in range(n_states) for c in 'ab'}
+    accepting_states = {s for s in range(n_states) if rng.random() < 0.5}
+
+    def label(word):
+        state = 0
+        for char in word:
+            state = delta[state, char]
+        return state in accepting_states
+
+    words = {''.join(rng.choices('ab', k=rng.randint(0, max_len)))
+             for _ in range(n_words)}
+    return [(label(w), w) for w in words]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    print('target,nodes,nx_approx,nx_s,bnb,optimal,bnb_s,'
+          'skipped_sizes,skipped_sat_s')
+    for n_states in sizes:
+        apta = APTA.from_labeled(random_instance(n_states))
+        graph = apta.consistency_graph(compact=True)
+        try:
+            approx, nx_time = timed(nx_clique.max_clique, graph.to_networkx())
+            approx = len(approx)
+        except RecursionError:  # ramsey_R2 recurses once per node.
+            approx, nx_time = 'RecursionError', float('nan')
+        result, bnb_time = timed(search_clique, graph.bitsets(),
+                                 time_budget=10)
+
+        # SAT calls for the sizes the lower bound skips.
+        low = len(result.nodes)
+        start = time.perf_counter()
+        for n_colors in range(1, low):
+            codec = Codec.from_apta(apta, n_colors, sym_mode='bfs')
+            clauses = list(encode_dfa_id(apta, codec, graph))
+            with Glucose4(bootstrap_with=clauses) as solver:
+                assert not solver.solve()
+        skipped_time = time.perf_counter() - start
+
+        print(f'{n_states},{len(apta.nodes)},{approx},{nx_time:.2f},'
+              f'{low},{result.optimal},{bnb_time:.2f},{low - 1},'
+              f'{skipped_time:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [3, 5, 7, 9])
@@ -0,0 +1,46 @@
+"""Benchmark peak memory of materializing an encoding: list of lists vs
+the flat CNF buffer (with either clause backend).
+
+Usage: python -m benchmarks.cnf_memory [n_colors ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from dfa_identify.encoding import Codec, encode_dfa_id, encode_dfa_id_cnf
+from dfa_identify.graphs import APTA, max_clique
+from benchmarks.clique_bound import random_instance
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    clauses = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return clauses, elapsed, peak
+
+
+def main(sizes):
+    apta = APTA.from_labeled(random_instance(8, n_words=600, max_len=14))
+    cgraph = apta.consistency_graph(compact=True)
+    clique = max_clique(cgraph)
+    print(f'# {len(apta.nodes)} nodes, {cgraph.number_of_edges()} edges')
+    print('n_colors,clauses,format,seconds,peak_mb')
+    for n_colors in sizes:
+        codec = Codec.from_apta(apta, n_colors, sym_mode='bfs')
+        builds = {
+            'list': lambda: list(encode_dfa_id(apta, codec, cgraph, clique)),
+            'cnf': lambda: encode_dfa_id_cnf(apta, codec, cgraph, clique),
+            'cnf+numpy': lambda: encode_dfa_id_cnf(apta, codec, cgraph,
+                                                   clique, 'numpy'),
+        }
+        for name, build in builds.items():
+            clauses, elapsed, peak = measure(build)
+            print(f'{n_colors},{len(clauses)},{name},{elapsed:.2f},'
+                  f'{peak / 2**20:.0f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [5])
@@ -0,0 +1,45 @@
+"""Benchmark consistency graph construction against the pairwise DFS.
+
+Usage: python -m benchmarks.consistency_graph [n_examples ...]
+"""
+import random
+import sys
+import time
+from itertools import combinations
+
+import networkx as nx
+
+from dfa_identify.graphs import APTA
+from performance_evaluation import generate_examples
+
+
+def pairwise_dfs_graph(apta):
+    """One DFS per node pair, as APTA.consistency_graph used to do."""
+    graph = nx.Graph()
+    graph.add_nodes_from(apta.nodes)
+    for pair in combinations(apta.nodes, 2):
+        if not apta._can_merge(graph.has_edge, pair):
+            graph.add_edge(*pair)
+    return graph
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    random.seed(0)
+    print('examples,nodes,edges,pairwise_dfs_s,bit_matrix_s')
+    for bound in sizes:
+        accepting, rejecting = generate_examples(4, 4, bound)
+        apta = APTA.from_examples(accepting, rejecting)
+        graph, fast = timed(apta.consistency_graph)
+        _, slow = timed(pairwise_dfs_graph, apta)
+        print(f'{bound},{len(apta.nodes)},{graph.number_of_edges()},'
+              f'{slow:.2f},{fast:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [10, 50, 100, 200])
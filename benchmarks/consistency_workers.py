@@ -0,0 +1,26 @@
+"""Scaling of APTA.consistency_graph with the number of worker processes.
+
+Each run builds the graph of a fresh APTA, since APTAs cache theirs.
+
+Usage: python -m benchmarks.consistency_workers [n_traces]
+"""
+import sys
+import time
+
+from dfa_identify.graphs import APTA
+from benchmarks.apta_build import random_traces
+
+
+def main(n_traces):
+    accepting, rejecting = random_traces(n_traces, n_symbols=4, max_len=12)
+    print(f'nodes={len(APTA.from_examples(accepting, rejecting).nodes)}')
+    print('workers,seconds')
+    for workers in [1, 2, 4, 8]:
+        apta = APTA.from_examples(accepting, rejecting)
+        start = time.perf_counter()
+        apta.consistency_graph(compact=True, workers=workers)
+        print(f'{workers},{time.perf_counter() - start:.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000)
@@ -0,0 +1,67 @@
+"""Benchmark model decoding and the encoders' range checks on the
+performance_evaluation.generate_examples workloads.
+
+Reports the time per model of decoding each literal (Codec.decode, as
+extract_dfa used to) vs Codec.decode_model and extract_dfa, and the
+time to generate the clauses with the python backend with and without
+the encoders' range checks (Codec.validate).
+
+Usage: python -m benchmarks.decode_models [n_tasks,n_subtasks,bound ...]
+"""
+import random
+import sys
+import time
+
+import attr
+from pysat.solvers import Glucose4
+
+from dfa_identify.encoding import (
+    Codec, EncodingContext, dfa_id_encodings, encode_dfa_id_cnf,
+)
+from dfa_identify.graphs import APTA, max_clique
+from dfa_identify.identify import extract_dfa
+from performance_evaluation import generate_examples
+
+
+def per_model(decode, models) -> float:
+    start = time.perf_counter()
+    for model in models:
+        decode(model)
+    return (time.perf_counter() - start) / len(models)
+
+
+def main(workloads, n_models=200, n_colors=10):
+    print('workload,step,ms')
+    for n_tasks, n_subtasks, bound in workloads:
+        random.seed(0)
+        accepting, rejecting = generate_examples(n_tasks, n_subtasks, bound)
+        apta = APTA.from_examples(accepting, rejecting)
+        name = f'{n_tasks}-{n_subtasks}-{bound}'
+
+        codec, clauses = next(dfa_id_encodings(apta, sym_mode='bfs'))
+        with Glucose4(bootstrap_with=clauses) as solver:
+            models = [m for _, m in zip(range(n_models),
+                                        solver.enum_models())]
+        steps = {
+            'decode': lambda m: list(map(codec.decode, m)),
+            'decode_model': codec.decode_model,
+            'extract_dfa': lambda m: extract_dfa(codec, apta, m),
+        }
+        for step, decode in steps.items():
+            print(f'{name},{step},{1e3 * per_model(decode, models):.3f}')
+
+        cgraph = apta.consistency_graph(compact=True)
+        clique = max_clique(cgraph)
+        ctx = EncodingContext.from_apta(apta, cgraph)
+        for validate in [True, False]:
+            codec = attr.evolve(Codec.from_apta(apta, n_colors, 'bfs'),
+                                validate=validate)
+            start = time.perf_counter()
+            encode_dfa_id_cnf(apta, codec, cgraph, clique, 'python', ctx)
+            elapsed = time.perf_counter() - start
+            print(f'{name},encode(validate={validate}),{1e3 * elapsed:.0f}')
+
+
+if __name__ == '__main__':
+    workloads = [tuple(map(int, w.split(','))) for w in sys.argv[1:]]
+    main(workloads or [(2, 3, 40), (3, 3, 60)])
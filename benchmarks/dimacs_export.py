@@ -0,0 +1,51 @@
+"""Benchmark writing an encoding as DIMACS: streaming the clause
+generator (python and numpy backends) vs writing a materialized CNF.
+Reports time and peak traced memory, which includes building the CNF.
+
+Usage: python -m benchmarks.dimacs_export [n_colors ...]
+"""
+import os
+import sys
+import tempfile
+
+from dfa_identify.dimacs import write_dimacs
+from dfa_identify.encoding import Codec, encode_dfa_id, encode_dfa_id_cnf
+from dfa_identify.graphs import APTA, max_clique
+from benchmarks.clique_bound import random_instance
+from benchmarks.cnf_memory import measure
+
+
+def main(sizes):
+    apta = APTA.from_labeled(random_instance(8, n_words=600, max_len=14))
+    cgraph = apta.consistency_graph(compact=True)
+    clique = max_clique(cgraph)
+    print(f'# {len(apta.nodes)} nodes, {cgraph.number_of_edges()} edges')
+    print('n_colors,clauses,source,seconds,peak_mb,file_mb')
+    fd, path = tempfile.mkstemp(suffix='.cnf')
+    os.close(fd)
+    for n_colors in sizes:
+        codec = Codec.from_apta(apta, n_colors, sym_mode='bfs')
+
+        def stream(backend):
+            with open(path, 'w') as out:
+                return write_dimacs(
+                    encode_dfa_id(apta, codec, cgraph, clique, backend),
+                    out, n_vars=codec.offsets[-1])
+
+        def cnf(backend):
+            with open(path, 'w') as out:
+                return write_dimacs(
+                    encode_dfa_id_cnf(apta, codec, cgraph, clique, backend),
+                    out, n_vars=codec.offsets[-1])
+
+        for name, write in [('stream', stream), ('cnf', cnf)]:
+            for backend in ['python', 'numpy']:
+                n_clauses, elapsed, peak = measure(lambda: write(backend))
+                print(f'{n_colors},{n_clauses},{name}+{backend},'
+                      f'{elapsed:.2f},{peak / 2**20:.1f},'
+                      f'{os.path.getsize(path) / 2**20:.1f}')
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [4, 8])
@@ -0,0 +1,35 @@
+"""Benchmark the EDSM learner against exact identification.
+
+Usage: python -m benchmarks.edsm [n_states ...]
+"""
+import sys
+import time
+
+from dfa_identify import find_dfa
+from dfa_identify.graphs import APTA
+from dfa_identify.merging import edsm
+from benchmarks.clique_bound import random_instance
+
+
+def main(sizes):
+    print('target,nodes,edsm_states,edsm_s,exact_states,exact_s')
+    for n_states in sizes:
+        examples = random_instance(n_states)
+        apta = APTA.from_labeled(examples)
+
+        start = time.perf_counter()
+        heuristic = edsm(apta)
+        edsm_time = time.perf_counter() - start
+
+        accepting = [w for label, w in examples if label]
+        rejecting = [w for label, w in examples if not label]
+        start = time.perf_counter()
+        exact = find_dfa(accepting, rejecting)
+        exact_time = time.perf_counter() - start
+
+        print(f'{n_states},{len(apta.nodes)},{len(heuristic.states())},'
+              f'{edsm_time:.3f},{len(exact.states())},{exact_time:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [3, 5, 7, 9])
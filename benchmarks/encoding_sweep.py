@@ -0,0 +1,29 @@
+"""Benchmark encoding every candidate size, as find_dfas does when it
+steps through the sizes, for both clause backends.
+
+Usage: python -m benchmarks.encoding_sweep [max_colors]
+"""
+import sys
+import time
+
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from benchmarks.clique_bound import random_instance
+
+
+def main(max_colors):
+    apta = APTA.from_labeled(random_instance(8, n_words=1000, max_len=16))
+    apta.consistency_graph(compact=True)  # Cached, so not timed below.
+    print(f'# {len(apta.nodes)} nodes, sizes 2..{max_colors}')
+    print('backend,clauses,seconds')
+    for backend in ['python', 'numpy']:
+        start = time.perf_counter()
+        encodings = dfa_id_encodings(apta, bounds=(2, max_colors),
+                                     backend=backend, clique_bound=False)
+        n_clauses = sum(len(clauses) for _, clauses in encodings)
+        elapsed = time.perf_counter() - start
+        print(f'{backend},{n_clauses},{elapsed:.2f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6)
@@ -0,0 +1,66 @@
+"""Benchmark DFA enumeration: blocking full models (pysat's
+enum_models) vs blocking only the DFA defining variables
+(identify.projected_models), with and without dropping isomorphic
+DFAs (find_dfas(unique=True)).
+
+Reports models, distinct DFAs (up to isomorphism) and distinct DFAs
+per second, enumerating all DFAs up to a size on small example sets.
+
+Usage: python -m benchmarks.enumeration [max_size]
+"""
+import sys
+import time
+
+from pysat.solvers import Glucose4
+
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from dfa_identify.identify import (
+    EnumerationStats, canonical_key, extract_dfa, find_dfas,
+)
+
+
+EXAMPLES = {
+    'abaa': (['a', 'abaa', 'bb'], ['abb', 'b']),
+    'z0': ([[0], [0, 'z', 0, 0], ['z', 'z']], [[0, 'z', 'z'], ['z']]),
+}
+
+
+def full_models(accepting, rejecting, sym_mode, bounds):
+    """DFA keys of find_dfas before projection: one per full model."""
+    apta = APTA.from_examples(accepting, rejecting)
+    for codec, clauses in dfa_id_encodings(apta, sym_mode, bounds=bounds):
+        with Glucose4(bootstrap_with=clauses) as solver:
+            for model in solver.enum_models():
+                extract_dfa(codec, apta, model)
+                yield canonical_key(codec.decode_model(model))
+
+
+def main(max_size=4):
+    bounds = (None, max_size)
+    print('examples,sym_mode,method,models,distinct,seconds,distinct_per_s')
+    for name, (accepting, rejecting) in EXAMPLES.items():
+        for sym_mode in ['bfs', None]:
+            start = time.perf_counter()
+            keys = list(full_models(accepting, rejecting, sym_mode, bounds))
+            elapsed = time.perf_counter() - start
+            rows = [('full', len(keys), len(set(keys)), elapsed)]
+            distinct = len(set(keys))
+
+            for method, unique in [('projected', False), ('unique', True)]:
+                stats = EnumerationStats()
+                for _ in find_dfas(accepting, rejecting, sym_mode=sym_mode,
+                                   bounds=bounds, allow_unminimized=True,
+                                   unique=unique, stats=stats):
+                    pass
+                rows.append((method, stats.models,
+                             stats.dfas if unique else distinct,
+                             stats.seconds))
+
+            for method, models, n_distinct, seconds in rows:
+                print(f'{name},{sym_mode},{method},{models},{n_distinct},'
+                      f'{seconds:.2f},{n_distinct / seconds:.0f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
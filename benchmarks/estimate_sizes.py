@@ -0,0 +1,48 @@
+"""Benchmark the encoding size estimator against generating the
+encodings, on the performance_evaluation.generate_examples workloads.
+
+For each size, reports the estimated clauses and memory, the actual
+clauses of the generated encoding, and the time to estimate all sizes
+vs to generate them (numpy backend).
+
+Usage: python -m benchmarks.estimate_sizes [n_tasks,n_subtasks,bound ...]
+"""
+import random
+import sys
+import time
+
+from dfa_identify.cache import PreprocessCache
+from dfa_identify.encoding import dfa_id_encodings, estimate_sizes
+from dfa_identify.graphs import APTA
+from performance_evaluation import generate_examples
+
+
+def main(workloads, bounds=(None, 16)):
+    for n_tasks, n_subtasks, bound in workloads:
+        random.seed(0)
+        accepting, rejecting = generate_examples(n_tasks, n_subtasks, bound)
+        apta = APTA.from_examples(accepting, rejecting)
+        cache = PreprocessCache()
+        cache.preprocess(apta)  # Both below share the consistency graph.
+
+        start = time.perf_counter()
+        estimates = estimate_sizes(apta, 'bfs', bounds, cache=cache)
+        estimated = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encodings = [len(clauses) for _, clauses in dfa_id_encodings(
+            apta, 'bfs', bounds=bounds, cache=cache, backend='numpy')]
+        generated = time.perf_counter() - start
+
+        print(f'{n_tasks}-{n_subtasks}-{bound}: estimated in '
+              f'{estimated:.3f}s, generated in {generated:.2f}s')
+        print('n_colors,clauses,estimated_clauses,cnf_mb,memory_mb')
+        for estimate, n_clauses in zip(estimates, encodings):
+            print(f'{estimate.n_colors},{n_clauses},{estimate.clauses},'
+                  f'{estimate.cnf_bytes / 2**20:.1f},'
+                  f'{estimate.memory / 2**20:.1f}')
+
+
+if __name__ == '__main__':
+    workloads = [tuple(map(int, w.split(','))) for w in sys.argv[1:]]
+    main(workloads or [(2, 3, 40), (3, 3, 60)])
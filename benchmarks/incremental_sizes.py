@@ -0,0 +1,63 @@
+"""Benchmark the size search: a fresh solver per size vs one incremental
+solver stepping through the sizes under assumptions.
+
+Sizes start at 1, ignoring the clique lower bound, to time more UNSAT
+calls. The search stops at the first satisfiable size, as find_dfas
+does. The encode row is the one time cost of the incremental encoding.
+
+Usage: python -m benchmarks.incremental_sizes [n_states ...]
+"""
+import sys
+import time
+
+from pysat.solvers import Glucose4
+
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.encoding import dfa_id_incremental_encoding
+from dfa_identify.graphs import APTA
+from dfa_identify.merging import edsm
+from benchmarks.clique_bound import random_instance
+
+
+def per_size(apta, bounds):
+    encodings = dfa_id_encodings(apta, sym_mode='bfs', bounds=bounds,
+                                 clique_bound=False)
+    start = time.perf_counter()
+    for codec, clauses in encodings:
+        with Glucose4(bootstrap_with=clauses) as solver:
+            sat = solver.solve()
+        yield codec.n_colors, sat, time.perf_counter() - start
+        if sat:
+            return
+        start = time.perf_counter()
+
+
+def incremental(apta, bounds):
+    start = time.perf_counter()
+    codec, clauses, sizes = dfa_id_incremental_encoding(
+        apta, sym_mode='bfs', bounds=bounds, clique_bound=False)
+    with Glucose4(bootstrap_with=clauses) as solver:
+        yield 'encode', None, time.perf_counter() - start
+        for n_colors in sizes:
+            start = time.perf_counter()
+            sat = solver.solve(assumptions=codec.assumptions(n_colors))
+            yield n_colors, sat, time.perf_counter() - start
+            if sat:
+                return
+
+
+def main(n_states):
+    print('n_states,mode,size,sat,seconds')
+    for n in n_states:
+        apta = APTA.from_labeled(random_instance(n, n_words=400, max_len=14))
+        bounds = (1, len(edsm(apta).states()))
+        for mode in [per_size, incremental]:
+            total = 0
+            for size, sat, elapsed in mode(apta, bounds):
+                total += elapsed
+                print(f'{n},{mode.__name__},{size},{sat},{elapsed:.2f}')
+            print(f'{n},{mode.__name__},total,,{total:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [4, 6, 8])
@@ -0,0 +1,49 @@
+"""Benchmark the order_by_stutter engines of find_dfas: bounds on an
+incremental totalizer in the size's solver ('totalizer') vs the
+core-guided MaxSAT solver RC2 ('rc2'), on the
+performance_evaluation.generate_examples workloads.
+
+Reports the DFAs enumerated, the fewest non stutter transitions and
+the time to the first (optimal) DFA and to all of them.
+
+Usage: python -m benchmarks.maxsat_stutter [incremental]
+"""
+import random
+import sys
+import time
+
+from dfa import dfa2dict
+
+from dfa_identify.identify import STUTTER_ENGINES, find_dfas
+from performance_evaluation import generate_examples
+
+
+WORKLOADS = [(2, 3, 40), (3, 3, 40), (2, 4, 60), (4, 3, 40)]
+
+
+def non_stutter_count(dfa) -> int:
+    graph, _ = dfa2dict(dfa)
+    return sum(state != target for state, (_, transitions) in graph.items()
+               for target in transitions.values())
+
+
+def main(incremental=False):
+    print('workload,engine,dfas,min_non_stutter,first_s,total_s')
+    for n_tasks, n_subtasks, bound in WORKLOADS:
+        random.seed(0)
+        accepting, rejecting = generate_examples(n_tasks, n_subtasks, bound)
+        name = f'{n_tasks}-{n_subtasks}-{bound}'
+        for engine in STUTTER_ENGINES:
+            start = time.perf_counter()
+            dfas = find_dfas(accepting, rejecting, order_by_stutter=True,
+                             stutter_engine=engine, incremental=incremental)
+            first = next(dfas)
+            first_s = time.perf_counter() - start
+            n_dfas = 1 + sum(1 for _ in dfas)
+            total_s = time.perf_counter() - start
+            print(f'{name},{engine},{n_dfas},{non_stutter_count(first)},'
+                  f'{first_s:.2f},{total_s:.2f}')
+
+
+if __name__ == '__main__':
+    main(incremental=sys.argv[1:] == ['incremental'])
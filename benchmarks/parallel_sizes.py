@@ -0,0 +1,39 @@
+"""Benchmark the speculative parallel size search against the
+sequential size loop of find_dfa.
+
+Reports the clique lower bound, the EDSM upper bound and the minimal
+size per instance, as the parallel search only has room to speculate
+between the bounds. Speedups need as many cores as workers.
+
+Usage: python -m benchmarks.parallel_sizes [n_states ...]
+"""
+import os
+import sys
+import time
+
+from dfa_identify import find_dfa
+from dfa_identify.graphs import APTA, max_clique
+from dfa_identify.merging import edsm
+from benchmarks.clique_bound import random_instance
+
+
+def main(n_states, worker_counts=(1, 2, 4)):
+    print(f'# {os.cpu_count()} cpus')
+    print('n_states,clique,edsm,minimal,workers,seconds')
+    for n in n_states:
+        examples = random_instance(n, n_words=60, max_len=10, seed=1)
+        accepting = [w for label, w in examples if label]
+        rejecting = [w for label, w in examples if not label]
+        apta = APTA.from_labeled(examples)
+        clique = len(max_clique(apta.consistency_graph(compact=True)))
+        upper = len(edsm(apta).states())
+        for workers in worker_counts:
+            start = time.perf_counter()
+            dfa = find_dfa(accepting, rejecting, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f'{n},{clique},{upper},{len(dfa.states())},{workers},'
+                  f'{elapsed:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [6, 10, 12])
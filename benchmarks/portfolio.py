@@ -0,0 +1,45 @@
+"""Benchmark the solver portfolio: find_dfa with each member alone vs
+all of them racing (portfolio.Portfolio), on random target DFAs (see
+benchmarks.clique_bound).
+
+Reports the seconds to the minimal DFA and, for the portfolio, the
+member that won most races. Racing only pays off with a core per
+member.
+
+Usage: python -m benchmarks.portfolio [n_states ...]
+"""
+import sys
+import time
+from functools import partial
+
+from dfa_identify import find_dfa
+from dfa_identify.portfolio import (
+    DEFAULT_MEMBERS, Member, Portfolio, PortfolioStats,
+)
+from benchmarks.clique_bound import random_instance
+
+
+MEMBERS = [*DEFAULT_MEMBERS, Member('g4', seed=1), Member('g4', seed=2)]
+
+
+def main(sizes):
+    print('n_states,solver,seconds,top_winner')
+    for n_states in sizes:
+        examples = random_instance(n_states, n_words=200)
+        accepting = [word for label, word in examples if label]
+        rejecting = [word for label, word in examples if not label]
+        runs = [(str(m), partial(Portfolio, members=[m]), None)
+                for m in MEMBERS]
+        stats = PortfolioStats()
+        runs.append(('portfolio', Portfolio.factory(*MEMBERS, stats=stats),
+                     stats))
+        for name, solver_fact, stats in runs:
+            start = time.perf_counter()
+            find_dfa(accepting, rejecting, solver_fact=solver_fact)
+            elapsed = time.perf_counter() - start
+            winner = stats.wins.most_common(1)[0][0] if stats else ''
+            print(f'{n_states},{name},{elapsed:.2f},{winner}')
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [6, 8, 10])
@@ -0,0 +1,54 @@
+"""Benchmark re-learning with a PreprocessCache.
+
+Times dfa_id_encodings' preprocessing (consistency graph and clique)
+for a fresh APTA: uncached, a memory hit for the same examples in the
+same and in shuffled order, and a disk hit.
+
+Usage: python -m benchmarks.preprocess_cache [n_traces ...]
+"""
+import random
+import sys
+import tempfile
+import time
+
+from dfa_identify.cache import PreprocessCache
+from dfa_identify.graphs import APTA, max_clique
+from benchmarks.apta_build import random_traces
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    print('traces,nodes,uncached_s,same_order_hit_s,shuffled_hit_s,'
+          'disk_hit_s')
+    for n_traces in sizes:
+        traces = sum(random_traces(n_traces, n_symbols=4, max_len=10), [])
+        examples = [(w.count('x0') % 2 == 0, w) for w in traces]
+
+        def fresh(shuffle=False):
+            if shuffle:
+                random.shuffle(examples)
+            return APTA.from_labeled(examples)
+
+        def uncached(apta):
+            max_clique(apta.consistency_graph(compact=True))
+
+        with tempfile.TemporaryDirectory() as path:
+            cache = PreprocessCache(path=path)
+            cache.preprocess(fresh())
+            apta = fresh()
+            slow = timed(uncached, apta)
+            same = timed(cache.preprocess, fresh())
+            shuffled = timed(cache.preprocess, fresh(shuffle=True))
+            cache.clear()
+            disk = timed(cache.preprocess, fresh())
+        print(f'{n_traces},{len(apta.nodes)},{slow:.2f},{same:.2f},'
+              f'{shuffled:.2f},{disk:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(x) for x in sys.argv[1:]] or [100, 500, 2000])
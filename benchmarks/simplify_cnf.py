@@ -0,0 +1,55 @@
+"""Benchmark CNF preprocessing (simplify.simplify) on the
+performance_evaluation.generate_examples workloads.
+
+For each workload and symmetry breaking mode, reports how much the
+encodings at the minimal size and a few sizes above it shrink, the
+time to simplify them, and the time to solve them with and without
+simplification.
+
+Usage: python -m benchmarks.simplify_cnf [n_tasks,n_subtasks,bound ...]
+"""
+import random
+import sys
+import time
+from itertools import product
+
+from pysat.solvers import Glucose4
+
+from dfa_identify import find_dfa
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from dfa_identify.simplify import simplify
+from performance_evaluation import generate_examples
+
+
+def solve_time(clauses) -> float:
+    start = time.perf_counter()
+    with Glucose4(bootstrap_with=clauses) as solver:
+        solver.solve()
+    return time.perf_counter() - start
+
+
+def main(workloads, extra_sizes=(0, 4, 8)):
+    for n_tasks, n_subtasks, bound in workloads:
+        random.seed(0)
+        accepting, rejecting = generate_examples(n_tasks, n_subtasks, bound)
+        apta = APTA.from_examples(accepting, rejecting)
+        minimal = len(find_dfa(accepting, rejecting).states())
+        for size, sym_mode in product(
+                [minimal + n for n in extra_sizes], ['bfs', 'clique']):
+            _, clauses = next(dfa_id_encodings(
+                apta, sym_mode=sym_mode, bounds=(size, size),
+                backend='numpy'))
+            start = time.perf_counter()
+            simplified = simplify(clauses)
+            elapsed = time.perf_counter() - start
+            print(f'{n_tasks}-{n_subtasks}-{bound} {sym_mode} size {size}: '
+                  f'{simplified.stats}')
+            print(f'  simplify {elapsed:.2f}s, '
+                  f'solve {solve_time(clauses):.2f}s -> '
+                  f'{solve_time(simplified.clauses):.2f}s')
+
+
+if __name__ == '__main__':
+    workloads = [tuple(map(int, w.split(','))) for w in sys.argv[1:]]
+    main(workloads or [(2, 3, 40), (3, 3, 60)])
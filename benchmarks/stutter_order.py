@@ -0,0 +1,98 @@
+"""Benchmark order_by_stutter: a fresh solver with a new cardinality
+formula per bound (as before) vs one solver with an incremental
+totalizer and bounds as assumptions (identify.order_models_by_stutter).
+
+Examples are random words labeled by a random target DFA (see
+benchmarks.clique_bound). Reports the number of DFAs, solver
+instances created and the time to the first and to all DFAs.
+
+Usage: python -m benchmarks.stutter_order [n_states ...]
+"""
+import sys
+import time
+
+from pysat.card import CardEnc
+from pysat.solvers import Glucose4
+
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from dfa_identify.identify import order_models_by_stutter, projected_models
+from benchmarks.clique_bound import random_instance
+
+
+class CountingSolver(Glucose4):
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        CountingSolver.created += 1
+        super().__init__(*args, **kwargs)
+
+
+def fresh_solvers(solver_fact, codec, clauses, model):
+    """The previous order_models_by_stutter."""
+    lits = [lit for lit in range(1 + codec.offsets[2], codec.offsets[3] + 1)
+            if (lit - codec.offsets[2] - 1) % codec.n_colors !=
+            (lit - codec.offsets[2] - 1) // codec.n_colors % codec.n_colors]
+
+    def count(model):
+        return sum(model[x - 1] > 0 for x in lits)
+
+    def find_models(bound, make_formula):
+        formula = make_formula(lits=lits, bound=bound,
+                               top_id=codec.offsets[-1])
+        with solver_fact(bootstrap_with=clauses) as solver:
+            solver.append_formula(formula.clauses)
+            yield from (m for m, _ in projected_models(solver, codec))
+
+    candidate = hi = count(model)
+    lo = codec.n_colors - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        witness = next(find_models(mid, CardEnc.atmost), None)
+        if witness is not None:
+            hi = count(witness)
+        else:
+            lo = mid + 1
+    for bound in range(lo, len(lits) + 1):
+        if bound > candidate:
+            witness = next(find_models(bound, CardEnc.atmost), None)
+            if witness is None:
+                break
+            candidate = count(witness)
+        yield from find_models(bound, CardEnc.equals)
+
+
+def size_solver(solver_fact, codec, clauses, model):
+    """order_models_by_stutter on the size's solver."""
+    with solver_fact(bootstrap_with=clauses) as solver:
+        solver.solve()
+        yield from order_models_by_stutter(solver, codec)
+
+
+def main(sizes):
+    print('n_states,n_colors,method,dfas,solvers,first_s,total_s')
+    for n_states in sizes:
+        apta = APTA.from_labeled(random_instance(n_states, n_words=60))
+        for codec, clauses in dfa_id_encodings(apta, sym_mode='bfs'):
+            with Glucose4(bootstrap_with=clauses) as solver:
+                if solver.solve():
+                    model = solver.get_model()
+                    break
+        methods = {'fresh': fresh_solvers,
+                   'incremental': size_solver}
+        for name, method in methods.items():
+            CountingSolver.created = 0
+            start = time.perf_counter()
+            models = method(CountingSolver, codec, clauses, model)
+            first = None
+            n_models = 0
+            for _ in models:
+                first = first or time.perf_counter() - start
+                n_models += 1
+            total = time.perf_counter() - start
+            print(f'{n_states},{codec.n_colors},{name},{n_models},'
+                  f'{CountingSolver.created},{first:.2f},{total:.2f}')
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [4, 5, 6])
@@ -3,6 +3,7 @@ from pysat.solvers import Glucose4
 from dfa_identify.graphs import Word, APTA
 from dfa_identify.encoding import Bounds, ExtraClauseGenerator, Clauses
 from dfa_identify.identify import extract_dfa, find_dfas
+from dfa_identify.cnf import CNF
 from typing import Optional, Iterable
 from dfa import dict2dfa, DFA, draw
 from dfa.utils import find_equiv_counterexample, minimize
@@ -19,7 +20,7 @@ def order_models_by_stutter(
         solver_fact,
         codecs: list[Codec],
         offset_list: list[int],
-        clauses: list[list[int]],
+        clauses: CNF,
         model: list[int],
 ) -> Iterable[DFA]:
     top_id = codecs[-1].offsets[-1] + offset_list[-1]
@@ -105,8 +106,8 @@ def offset_encodings(encodings_list):
     offset_list = [0]
     for codec, clauses in encodings_list[1:]:
         codec_list.append(codec)
-        offset_amount = get_max_var(new_clauses_list)
-        new_clauses = offset_clauses(clauses, offset_amount)
+        offset_amount = new_clauses_list.max_var()
+        new_clauses = clauses.shifted(offset_amount)
         new_clauses_list.extend(new_clauses)
         offset_list.append(offset_amount)
 
@@ -114,10 +115,11 @@ def offset_encodings(encodings_list):
 
 def remove_rejecting_clauses(encodings, apta):
     for codec, clauses in encodings:
-        rejecting_clauses = list(partition_by_rejecting_clauses(codec, apta))
-        new_clauses = []
+        rejecting_clauses = set(
+            map(tuple, partition_by_rejecting_clauses(codec, apta)))
+        new_clauses = CNF()
         for clause in clauses:
-            if clause not in rejecting_clauses:
+            if tuple(clause) not in rejecting_clauses:
                 new_clauses.append(clause)
         yield codec, new_clauses
 
@@ -267,7 +269,7 @@ def find_dfa_decompositions(
         bounds = (dfa_size, dfa_size)
         encodings = dfa_id_encodings(
             apta=apta, sym_mode=sym_mode,
-            extra_clauses=extra_clauses, bounds=bounds)
+            extra_clauses=extra_clauses, bounds=bounds, clique_bound=False)
         encodings = remove_rejecting_clauses(encodings, apta)
         first_encoding = list(next(encodings))
         encodings_list.append(first_encoding)
@@ -1,2 +1,3 @@
 # flake8: noqa
 from dfa_identify.identify import find_dfa, find_dfas, DFA
+from dfa_identify.merging import learn_dfa
@@ -0,0 +1,128 @@
+"""At-most-one (AMO) encodings for the one-hot constraints.
+
+An encoding of AMO over n literals is kept as a template: binary
+clauses over signed indices, 1..n for the literals themselves and
+n + 1, ... for auxiliary variables. A template is instantiated for a
+group of literals by substituting the indices, either one group at a
+time (instantiate) or for all groups at once with NumPy (amo_block).
+
+Modes, for n literals:
+  - pairwise: n (n - 1) / 2 clauses, no auxiliary variables.
+  - sequential: Sinz's sequential counter, 3n - 4 clauses and n - 1
+      auxiliary variables.
+  - commander: Klieber and Kwon's commander encoding with groups of 3,
+      recursing on the commanders.
+  - product: Chen's 2-product encoding, recursing on the rows and
+      columns.
+
+If exactly one of the literals is true, as in the one-hot constraints,
+the auxiliary variables are determined by the literals. So models, and
+thus enumerated DFAs, are not duplicated.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from math import ceil, isqrt
+from typing import Callable, Literal
+
+import attr
+import numpy as np
+
+
+AMOMode = Literal['pairwise', 'sequential', 'commander', 'product']
+AMO_MODES = ('pairwise', 'sequential', 'commander', 'product')
+
+Lits = list[int]
+Pairs = list[tuple[int, int]]
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Template:
+    n_lits: int
+    n_aux: int
+    clauses: np.ndarray  # (n_clauses, 2) signed indices.
+    pairs: Pairs = attr.ib(repr=False)  # clauses as a list.
+
+    def instantiate(self, lits: Lits, aux: Lits) -> list[list[int]]:
+        values = [0, *lits, *aux]
+        return [[values[a] if a > 0 else -values[-a] for a in clause]
+                for clause in self.pairs]
+
+
+def _pairwise(lits: Lits, new_var: Callable[[], int]) -> Pairs:
+    return [(-a, -b) for i, a in enumerate(lits) for b in lits[i + 1:]]
+
+
+def _sequential(lits: Lits, new_var: Callable[[], int]) -> Pairs:
+    if len(lits) <= 1:
+        return []
+    counter = [new_var() for _ in lits[:-1]]  # s_i: some of lits[:i+1].
+    clauses = [(-lits[0], counter[0])]
+    for i in range(1, len(lits) - 1):
+        clauses += [(-lits[i], counter[i]),
+                    (-counter[i - 1], counter[i]),
+                    (-lits[i], -counter[i - 1])]
+    clauses.append((-lits[-1], -counter[-1]))
+    return clauses
+
+
+def _commander(lits: Lits, new_var: Callable[[], int]) -> Pairs:
+    if len(lits) <= 4:
+        return _pairwise(lits, new_var)
+    clauses, commanders = [], []
+    for start in range(0, len(lits), 3):
+        group, commander = lits[start:start + 3], new_var()
+        clauses += _pairwise(group, new_var)
+        clauses += [(-lit, commander) for lit in group]
+        commanders.append(commander)
+    return clauses + _commander(commanders, new_var)
+
+
+def _product(lits: Lits, new_var: Callable[[], int]) -> Pairs:
+    if len(lits) <= 4:
+        return _pairwise(lits, new_var)
+    n_rows = isqrt(len(lits) - 1) + 1  # ceil(sqrt(n))
+    n_cols = ceil(len(lits) / n_rows)
+    rows = [new_var() for _ in range(n_rows)]
+    cols = [new_var() for _ in range(n_cols)]
+    clauses = []
+    for i, lit in enumerate(lits):
+        clauses += [(-lit, rows[i // n_cols]), (-lit, cols[i % n_cols])]
+    return clauses + _product(rows, new_var) + _product(cols, new_var)
+
+
+_ENCODERS = {
+    'pairwise': _pairwise,
+    'sequential': _sequential,
+    'commander': _commander,
+    'product': _product,
+}
+
+
+@lru_cache(maxsize=None)
+def template(n_lits: int, mode: AMOMode) -> Template:
+    if mode not in _ENCODERS:
+        raise ValueError(f"Unknown AMO encoding {mode!r}.")
+    top = n_lits
+
+    def new_var() -> int:
+        nonlocal top
+        top += 1
+        return top
+
+    pairs = _ENCODERS[mode](list(range(1, n_lits + 1)), new_var)
+    clauses = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    return Template(n_lits, top - n_lits, clauses, pairs)
+
+
+def amo_block(lits: np.ndarray, aux: np.ndarray, mode: AMOMode) -> np.ndarray:
+    """AMO clauses for each row of lits, one group after another, with
+    the auxiliary variables of row g in aux[g]."""
+    tmpl = template(lits.shape[-1], mode)
+    values = np.concatenate([np.zeros((len(lits), 1), dtype=np.int64),
+                             lits, aux], axis=1)
+    clauses = np.sign(tmpl.clauses) * values[:, np.abs(tmpl.clauses)]
+    return clauses.reshape(-1, 2)
+
+
+__all__ = ['AMOMode', 'AMO_MODES', 'Template', 'amo_block', 'template']
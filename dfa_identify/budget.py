@@ -0,0 +1,122 @@
+"""Time and conflict budgets for the SAT queries of find_dfas.
+
+A Budget bounds the whole search by a wall clock timeout and each SAT
+query by a number of conflicts. Queries run through pysat's
+solve_limited: the conflict budget is set with conf_budget and a timer
+thread interrupts the solver at the deadline, which leaves it in a
+defined state (unlike a signal raised inside the solver).
+
+The deadline is fixed when the budget is created, i.e., when the first
+DFA is requested from find_dfas, so the timeout covers the whole
+iteration: time the caller spends between DFAs counts against it too.
+It also covers preprocessing. State merging and the consistency graph
+can not be interrupted, but find_dfas checks the deadline after each,
+and the clique search stops at it.
+
+A query cut short raises BudgetExhausted, carrying an AnytimeResult
+with what the search had established: sizes proven UNSAT, the best DFA
+found so far and the size being attempted.
+"""
+from __future__ import annotations
+
+import threading
+from time import monotonic
+from typing import Iterable, Literal, Optional
+
+import attr
+from dfa import DFA
+
+
+Reason = Literal['timeout', 'conflicts']
+
+
+@attr.s(auto_attribs=True)
+class AnytimeResult:
+    """What find_dfas had established when its budget ran out."""
+    lower_bound: Optional[int] = None  # Sizes in bounds below are UNSAT.
+    dfa: Optional[DFA] = None          # Best consistent DFA found so far.
+    size: Optional[int] = None         # Size being attempted.
+    reason: Optional[Reason] = None
+
+
+class BudgetExhausted(RuntimeError):
+    """A SAT query ran out of time or conflicts."""
+
+    def __init__(self, result: AnytimeResult):
+        super().__init__(result)
+        self.result = result
+
+    def __str__(self) -> str:
+        result = self.result
+        best = 'none' if result.dfa is None else \
+            f'{len(result.dfa.states())} states'
+        return (f'Out of {result.reason} while trying size {result.size} '
+                f'(lower bound {result.lower_bound}, best DFA: {best}).')
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Budget:
+    deadline: Optional[float] = None  # time.monotonic() to stop at.
+    conflicts: Optional[int] = None   # Per query.
+
+    @staticmethod
+    def create(timeout: Optional[float] = None,
+               conflict_budget: Optional[int] = None) -> Optional[Budget]:
+        """Budget starting now, or None if unlimited."""
+        if timeout is None and conflict_budget is None:
+            return None
+        if (timeout is not None and timeout <= 0) or \
+                (conflict_budget is not None and conflict_budget <= 0):
+            raise ValueError('Budgets must be positive.')
+        deadline = None if timeout is None else monotonic() + timeout
+        return Budget(deadline, conflict_budget)
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - monotonic()
+
+    def check(self) -> None:
+        """Raise BudgetExhausted, with only the reason set, if the
+        deadline has passed."""
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise BudgetExhausted(AnytimeResult(reason='timeout'))
+
+    def solve(self, solver, assumptions: Iterable[int] = ()) -> bool:
+        """solver.solve within the budget. Raises BudgetExhausted, with
+        only the reason set, if it runs out."""
+        self.check()
+        remaining = self.remaining()
+        if not hasattr(solver, 'solve_limited'):
+            raise ValueError(f'{type(solver).__name__} does not support '
+                             'budgets (no solve_limited).')
+        if self.conflicts is not None:
+            solver.conf_budget(self.conflicts)
+        timer = None
+        if remaining is not None:
+            timer = threading.Timer(remaining, solver.interrupt)
+            timer.start()
+        try:
+            result = solver.solve_limited(assumptions=list(assumptions),
+                                          expect_interrupt=timer is not None)
+        finally:
+            if timer is not None:
+                timer.cancel()
+                timer.join()
+                solver.clear_interrupt()
+        if result is None:
+            remaining = self.remaining()
+            timeout = remaining is not None and remaining <= 0
+            reason = 'timeout' if timeout else 'conflicts'
+            raise BudgetExhausted(AnytimeResult(reason=reason))
+        return result
+
+
+def solve(solver, assumptions: Iterable[int] = (),
+          budget: Optional[Budget] = None) -> bool:
+    """solver.solve(assumptions), within budget if given."""
+    if budget is None:
+        return solver.solve(assumptions=assumptions)
+    return budget.solve(solver, assumptions)
+
+
+__all__ = ['AnytimeResult', 'Budget', 'BudgetExhausted', 'solve']
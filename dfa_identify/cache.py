@@ -0,0 +1,237 @@
+"""Content addressed cache of APTA preprocessing artifacts.
+
+The consistency graph and its clique only depend on the APTA, not on
+the bounds, symmetry breaking or extra clauses of a query. Entries are
+keyed by a hash of the APTA after renumbering its nodes in canonical
+(breadth first, symbol ordered) order, so re-learning the same examples
+in any order hits the cache.
+
+Entries keep the node ids of the APTA they were computed for, along
+with its canonical order. A hit from an APTA with the same numbering,
+e.g., the same examples in the same order, is returned as is. Otherwise
+the entry is relabeled to the querying APTA's node ids.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+import attr
+import numpy as np
+
+from dfa_identify.graphs import APTA, BitGraph, Node, max_clique
+
+
+Entry = tuple[BitGraph, set[Node]]
+Stored = tuple[BitGraph, set[Node], np.ndarray]  # Entry and its order.
+
+
+def canonical_order(apta: APTA) -> tuple[str, np.ndarray]:
+    """Hash of the APTA's content and its nodes in canonical order.
+
+    order[i] is the node numbered i canonically: nodes are visited
+    breadth first, children in the order of their symbols' repr.
+    """
+    symbols = sorted(apta.alphabet, key=repr)
+    ranks = np.empty(len(symbols), dtype=np.int32)
+    ranks[[apta.alphabet[s] for s in symbols]] = np.arange(len(symbols))
+
+    n = len(apta.nodes)
+    kids = np.full((n, len(symbols)), -1, dtype=np.intc)
+    for symbol, rank in zip(symbols, range(len(symbols))):
+        kids[:, rank] = np.frombuffer(
+            apta.children[apta.alphabet[symbol]], dtype=np.intc)
+
+    levels, frontier = [], np.array([apta.root], dtype=np.intc)
+    while len(frontier):
+        levels.append(frontier)
+        frontier = kids[frontier].ravel()
+        frontier = frontier[frontier >= 0]
+    order = np.concatenate(levels)
+
+    position = np.empty(n, dtype=np.int32)
+    position[order] = np.arange(n, dtype=np.int32)
+    parents = np.frombuffer(apta.parents, dtype=np.intc)[order]
+    tokens = np.frombuffer(apta.tokens, dtype=np.intc)[order]
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr([repr(s) for s in symbols]).encode())
+    digest.update(np.frombuffer(apta.labels, dtype=np.int8)[order].tobytes())
+    digest.update(np.where(parents >= 0, position[parents], -1).tobytes())
+    digest.update(np.where(tokens >= 0, ranks[tokens], -1).tobytes())
+    return digest.hexdigest(), order
+
+
+def _permute(matrix: np.ndarray, perm: np.ndarray,
+             chunk: int = 1024) -> np.ndarray:
+    """Packed bit matrix P with P[i, j] = matrix[perm[i], perm[j]]."""
+    n, result = len(matrix), np.empty_like(matrix)
+    for start in range(0, n, chunk):
+        rows = matrix[perm[start:start + chunk]]
+        bits = np.unpackbits(rows, axis=1, count=n, bitorder='little')
+        result[start:start + chunk] = np.packbits(
+            np.take(bits, perm, axis=1), axis=1, bitorder='little')
+    return result
+
+
+def _relabel(entry: Entry, perm: np.ndarray) -> Entry:
+    """Entry with node perm[i] renamed to i."""
+    graph, clique = entry
+    if (perm == np.arange(len(perm))).all():
+        return entry
+    inverse = np.empty_like(perm)
+    inverse[perm] = np.arange(len(perm), dtype=perm.dtype)
+    loops = sorted(tuple(sorted((int(inverse[u]), int(inverse[v]))))
+                   for u, v in graph.loops)
+    graph = BitGraph(_permute(graph.matrix, perm), loops)
+    return graph, {int(inverse[n]) for n in clique}
+
+
+def _nbytes(stored: Stored) -> int:
+    graph, clique, order = stored
+    return graph.matrix.nbytes + order.nbytes + \
+        16 * (len(graph.loops) + len(clique))
+
+
+@attr.s(auto_attribs=True, eq=False)
+class PreprocessCache:
+    """LRU cache of consistency graphs and cliques keyed by APTA content.
+
+    Inputs:
+      - max_entries: Entries kept in memory.
+      - max_bytes: Approximate bound on the memory used by entries.
+      - path: Optional directory backing the memory tier. New entries
+          are written there and reloaded on a memory miss.
+      - max_disk_bytes: Bound on the size of the directory. Least
+          recently used files are removed first.
+
+    hits, disk_hits and misses count lookups served from memory, from
+    disk and by recomputation.
+    """
+    max_entries: int = 32
+    max_bytes: Optional[int] = None
+    path: Optional[Union[str, os.PathLike]] = None
+    max_disk_bytes: Optional[int] = None
+    hits: int = attr.ib(default=0, init=False)
+    disk_hits: int = attr.ib(default=0, init=False)
+    misses: int = attr.ib(default=0, init=False)
+    _entries: OrderedDict = attr.ib(factory=OrderedDict, init=False,
+                                    repr=False)
+    _size: int = attr.ib(default=0, init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        if self.path is not None:
+            self.path = Path(self.path)
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, apta: APTA) -> bool:
+        key, _ = canonical_order(apta)
+        if key in self._entries:
+            return True
+        return self.path is not None and self._file(key).exists()
+
+    def preprocess(self, apta: APTA, workers: int = 1,
+                   time_budget: Optional[float] = None) -> Entry:
+        """Return the consistency graph (as a BitGraph) and clique of apta.
+
+        On a miss, both are computed and stored, with the clique search
+        limited by time_budget seconds as well (see max_clique). On a
+        hit, the graph is also handed to the APTA so that later
+        add_examples only update it incrementally.
+        """
+        key, order = canonical_order(apta)
+        stored = self._get(key)
+        if stored is None:
+            self.misses += 1
+            graph = apta.consistency_graph(compact=True, workers=workers)
+            clique = max_clique(graph, time_budget)
+            self._put(key, (graph, clique, order))
+            return graph, clique
+
+        # Map our nodes to the stored ones via their canonical numbers.
+        graph, clique, stored_order = stored
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order), dtype=order.dtype)
+        graph, clique = _relabel((graph, clique), stored_order[position])
+        apta._cache.setdefault('graph', graph)
+        return graph, clique
+
+    def clear(self) -> None:
+        """Drop the memory tier. Files on disk are kept."""
+        self._entries.clear()
+        self._size = 0
+
+    def _get(self, key: str) -> Optional[Stored]:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        stored = self._load(key)
+        if stored is not None:
+            self.disk_hits += 1
+            self._remember(key, stored)
+        return stored
+
+    def _put(self, key: str, stored: Stored) -> None:
+        self._remember(key, stored)
+        self._store(key, stored)
+
+    def _remember(self, key: str, stored: Stored) -> None:
+        self._entries[key] = stored
+        self._size += _nbytes(stored)
+        while self._entries and (
+                len(self._entries) > self.max_entries or
+                (self.max_bytes is not None and self._size > self.max_bytes)):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= _nbytes(evicted)
+
+    # --------------------------- Disk tier -----------------------------
+
+    def _file(self, key: str) -> Path:
+        return self.path / f'{key}.npz'
+
+    def _load(self, key: str) -> Optional[Stored]:
+        if self.path is None or not self._file(key).exists():
+            return None
+        path = self._file(key)
+        with np.load(path) as data:
+            loops = [tuple(p) for p in data['loops'].tolist()]
+            graph = BitGraph(data['matrix'], loops)
+            stored = (graph, set(data['clique'].tolist()), data['order'])
+        path.touch()  # Mark as recently used.
+        return stored
+
+    def _store(self, key: str, stored: Stored) -> None:
+        if self.path is None:
+            return
+        graph, clique, order = stored
+        loops = np.array(graph.loops, dtype=np.int64).reshape(-1, 2)
+        clique = np.array(sorted(clique), dtype=np.int64)
+        tmp = self.path / f'{key}.npz.tmp'
+        with tmp.open('wb') as handle:  # Write, then rename atomically.
+            np.savez(handle, matrix=graph.matrix, loops=loops,
+                     clique=clique, order=order)
+        os.replace(tmp, self._file(key))
+        self._evict_files()
+
+    def _evict_files(self) -> None:
+        if self.max_disk_bytes is None:
+            return
+        files = sorted(self.path.glob('*.npz'),
+                       key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink()
+
+
+__all__ = ['PreprocessCache', 'canonical_order']
@@ -0,0 +1,112 @@
+"""Bulk evaluation of DFAs against the examples stored in an APTA.
+
+Instead of running each example word through the DFA, the prefix tree
+is walked once, level by level, so shared prefixes are only evaluated
+once. Each level is a single lookup in a dense transition table.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+import attr
+import numpy as np
+from dfa import DFA
+from dfa.utils import dfa2dict
+
+from dfa_identify.graphs import ACCEPTING, APTA, REJECTING
+
+
+@attr.s(auto_attribs=True, frozen=True, eq=False)
+class Mismatches:
+    """Examples a DFA labels incorrectly, as APTA nodes.
+
+    The words, tuples of symbols, are only reconstructed on access.
+    """
+    apta: APTA = attr.ib(repr=False)
+    rejected: np.ndarray  # Accepting example nodes the DFA rejects.
+    accepted: np.ndarray  # Rejecting example nodes the DFA accepts.
+
+    @property
+    def count(self) -> int:
+        return len(self.rejected) + len(self.accepted)
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    @property
+    def false_rejects(self) -> list[tuple]:
+        return [self.apta.word(n) for n in self.rejected.tolist()]
+
+    @property
+    def false_accepts(self) -> list[tuple]:
+        return [self.apta.word(n) for n in self.accepted.tolist()]
+
+
+@attr.s(auto_attribs=True, frozen=True, eq=False)
+class ExampleChecker:
+    """Checks DFAs against an APTA's examples.
+
+    The APTA's levels are computed once, so checking many DFAs, e.g.,
+    those enumerated by find_dfas, only pays for the table lookups.
+    """
+    apta: APTA
+    levels: list[np.ndarray] = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        columns = [np.frombuffer(c, dtype=np.intc)
+                   for c in self.apta.children]
+        levels, frontier = [], np.array([self.apta.root], dtype=np.intc)
+        while True:  # Nodes of depth 1, 2, ...
+            frontier = np.concatenate([c[frontier] for c in columns] + [[]])
+            frontier = frontier[frontier >= 0].astype(np.intc)
+            if not len(frontier):
+                break
+            levels.append(frontier)
+        object.__setattr__(self, 'levels', levels)
+
+    def states(self, dfa: DFA) -> tuple[np.ndarray, np.ndarray]:
+        """DFA state reached by each node and whether it is accepting."""
+        graph, start = dfa2dict(dfa, reindex=True)
+        symbols = self.apta.alphabet.inv
+        missing = {symbols[t] for t in symbols if symbols[t] not in dfa.inputs
+                   and max(self.apta.children[t], default=-1) >= 0}
+        if missing:
+            raise ValueError(f"DFA has no transitions for {missing}.")
+
+        # Symbols not read by any example may be missing from the DFA.
+        table = np.zeros((len(graph), len(symbols)), dtype=np.intc)
+        accepts = np.empty(len(graph), dtype=bool)
+        for state, (label, transitions) in graph.items():
+            accepts[state] = label
+            table[state] = [transitions.get(symbols[t], 0) for t in symbols]
+
+        parents = np.frombuffer(self.apta.parents, dtype=np.intc)
+        tokens = np.frombuffer(self.apta.tokens, dtype=np.intc)
+        states = np.empty(len(parents), dtype=np.intc)
+        states[self.apta.root] = start
+        for level in self.levels:
+            states[level] = table[states[parents[level]], tokens[level]]
+        return states, accepts[states]
+
+    def __call__(self, dfa: DFA) -> Mismatches:
+        _, accepted = self.states(dfa)
+        labels = np.frombuffer(self.apta.labels, dtype=np.int8)
+        return Mismatches(
+            apta=self.apta,
+            rejected=np.flatnonzero((labels == ACCEPTING) & ~accepted),
+            accepted=np.flatnonzero((labels == REJECTING) & accepted),
+        )
+
+
+def check_dfa(dfa: DFA, apta: APTA) -> Mismatches:
+    """Examples in apta that dfa labels incorrectly."""
+    return ExampleChecker(apta)(dfa)
+
+
+def check_dfas(dfas: Iterable[DFA], apta: APTA) -> Iterable[Mismatches]:
+    """Lazily check each of dfas against the examples in apta."""
+    checker = ExampleChecker(apta)
+    return map(checker, dfas)
+
+
+__all__ = ['ExampleChecker', 'Mismatches', 'check_dfa', 'check_dfas']
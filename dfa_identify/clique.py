@@ -0,0 +1,176 @@
+"""Maximum clique search on graphs given as int bitsets.
+
+Branch and bound in the style of Tomita's MCQ and San Segundo's BBMC:
+candidates are greedily colored, and since a clique has at most one
+node of each color, the number of colors bounds how much a branch can
+add to the current clique.
+
+The search is anytime. If its budget, a number of steps and/or
+seconds, runs out, the largest clique found so far is returned and
+marked as not provably maximum. Steps are charged for each candidate
+looked at by the greedy initial clique, the pruning and the coloring
+at each branch and bound node, one per 4096 graph nodes (at least
+one), as the bitsets grow with the graph. Unlike a node count, they
+track the work on large graphs, and unlike seconds, they give the
+same clique on every machine.
+"""
+from __future__ import annotations
+
+import time
+from typing import Iterable, Optional
+
+import attr
+
+
+Bitset = int
+
+
+if hasattr(int, 'bit_count'):  # Python >= 3.10.
+    _popcount = int.bit_count
+else:
+    def _popcount(bitset: Bitset) -> int:
+        return bin(bitset).count('1')
+
+
+def _members(bitset: Bitset) -> Iterable[int]:
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class _Limits:
+    """Deadline and steps left, shared by the stages of a search."""
+
+    def __init__(self, time_budget: Optional[float],
+                 max_steps: Optional[int], n_nodes: int = 0):
+        self.deadline = None if time_budget is None else \
+            time.perf_counter() + time_budget
+        self.steps = max_steps
+        self.width = 1 + n_nodes // 4096  # Steps per candidate.
+
+    def spend(self, candidates: int) -> None:
+        """Charge for looking at candidates, raising _OutOfTime if the
+        budget runs out."""
+        if self.steps is not None:
+            self.steps -= candidates * self.width
+            if self.steps < 0:
+                raise _OutOfTime
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise _OutOfTime
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class CliqueResult:
+    """Largest clique found and whether it is provably maximum."""
+    nodes: frozenset[int]
+    optimal: bool
+
+
+def greedy_clique(adjacency: list[Bitset],
+                  candidates: Optional[Bitset] = None) -> set[int]:
+    """Grow a clique by picking the candidate with most candidate
+    neighbors."""
+    return _greedy_clique(adjacency, candidates, _Limits(None, None))
+
+
+def _greedy_clique(adjacency: list[Bitset], candidates: Optional[Bitset],
+                   limits: _Limits) -> set[int]:
+    """greedy_clique, stopping early (with a smaller clique) if limits
+    run out."""
+    if candidates is None:
+        candidates = (1 << len(adjacency)) - 1
+    clique = set()
+    while candidates:
+        try:
+            limits.spend(_popcount(candidates))
+        except _OutOfTime:
+            break
+        node = max(_members(candidates),
+                   key=lambda n: _popcount(adjacency[n] & candidates))
+        clique.add(node)
+        candidates &= adjacency[node]
+    return clique
+
+
+def _color_classes(adjacency: list[Bitset],
+                   candidates: Bitset) -> list[tuple[int, int]]:
+    """Greedy coloring of candidates as (node, color) pairs ordered by
+    color. Nodes of the same color are pairwise non-adjacent."""
+    colored, color = [], 0
+    while candidates:
+        color += 1
+        free = candidates
+        while free:
+            low = free & -free
+            node = low.bit_length() - 1
+            colored.append((node, color))
+            candidates ^= low
+            free &= ~adjacency[node] & ~low
+    return colored
+
+
+def _prune(adjacency: list[Bitset], candidates: Bitset, size: int,
+           limits: _Limits) -> Bitset:
+    """Drop candidates with fewer than size - 1 candidate neighbors. They
+    can not be part of a clique with more than size - 1 nodes."""
+    changed = True
+    while changed:
+        limits.spend(_popcount(candidates))
+        changed = False
+        for node in _members(candidates):
+            if _popcount(adjacency[node] & candidates) < size - 1:
+                candidates &= ~(1 << node)
+                changed = True
+    return candidates
+
+
+def search_clique(adjacency: list[Bitset],
+                  time_budget: Optional[float] = None,
+                  initial: Iterable[int] = (),
+                  max_steps: Optional[int] = None) -> CliqueResult:
+    """Maximum clique of the graph with adjacency[v] the bitset of v's
+    neighbors (without v itself).
+
+    Inputs:
+      - time_budget: Seconds to search for, including the greedy
+          initial clique and pruning, before giving up on proving
+          optimality. None means no limit.
+      - initial: Known clique to start from. Defaults to a greedy one.
+      - max_steps: Steps (see module docstring) to take before giving
+          up. None means no limit.
+    """
+    limits = _Limits(time_budget, max_steps, len(adjacency))
+    best = set(initial) or _greedy_clique(adjacency, None, limits)
+
+    def expand(clique: list[int], candidates: Bitset) -> None:
+        nonlocal best
+        limits.spend(_popcount(candidates))
+
+        colored = _color_classes(adjacency, candidates)
+        for node, color in reversed(colored):  # Most colors first.
+            if len(clique) + color <= len(best):
+                return  # Remaining candidates need fewer colors.
+            clique.append(node)
+            below = candidates & adjacency[node]
+            if below:
+                expand(clique, below)
+            elif len(clique) > len(best):
+                best = set(clique)
+            clique.pop()
+            candidates &= ~(1 << node)
+
+    try:
+        candidates = _prune(adjacency, (1 << len(adjacency)) - 1,
+                            len(best) + 1, limits)
+        expand([], candidates)
+    except _OutOfTime:
+        return CliqueResult(frozenset(best), optimal=False)
+    return CliqueResult(frozenset(best), optimal=True)
+
+
+__all__ = ['CliqueResult', 'greedy_clique', 'search_clique']
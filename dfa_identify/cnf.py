@@ -0,0 +1,113 @@
+"""Compact container for CNF formulas.
+
+Clauses are stored back to back in a flat int32 buffer, with an int64
+offset array marking where each clause starts. This takes 4 bytes per
+literal, compared to 100+ bytes for a list of lists of Python ints.
+
+Iterating yields each clause as a fresh list, so a CNF can be passed
+wherever an iterable of clauses is expected, e.g., to pysat's
+bootstrap_with, without materializing all clauses as lists at once.
+"""
+from __future__ import annotations
+
+from array import array
+from itertools import islice
+from typing import Iterable, Union
+
+import attr
+import numpy as np
+
+
+Clause = list[int]
+
+
+@attr.s(auto_attribs=True, repr=False)
+class CNF:
+    """Clause i is literals[offsets[i]:offsets[i + 1]]."""
+    literals: array = attr.ib(factory=lambda: array('i'))
+    offsets: array = attr.ib(factory=lambda: array('q', [0]))
+
+    @staticmethod
+    def from_clauses(clauses: Iterable[Clause]) -> CNF:
+        cnf = CNF()
+        cnf.extend(clauses)
+        return cnf
+
+    def __repr__(self) -> str:
+        return f'CNF(n_clauses={len(self)}, n_literals={len(self.literals)})'
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self) -> Iterable[Clause]:
+        literals, offsets = self.literals, self.offsets
+        for start, end in zip(offsets, islice(offsets, 1, None)):
+            yield literals[start:end].tolist()
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Clause, CNF]:
+        if isinstance(key, slice):
+            indices = range(len(self))[key]
+            if indices.step != 1 or not indices:
+                return CNF.from_clauses(self[i] for i in indices)
+            first, last = indices.start, indices.stop
+            begin = self.offsets[first]
+            offsets = array('q', (o - begin for o in
+                                  self.offsets[first:last + 1]))
+            return CNF(self.literals[begin:self.offsets[last]], offsets)
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('CNF index out of range')
+        return self.literals[self.offsets[key]:self.offsets[key + 1]].tolist()
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.literals) * self.literals.itemsize + \
+            len(self.offsets) * self.offsets.itemsize
+
+    def append(self, clause: Clause) -> None:
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+
+    def extend(self,
+               clauses: Union[CNF, np.ndarray, Iterable[Clause]]) -> None:
+        """Append clauses. 2d arrays are taken as one clause per row."""
+        if isinstance(clauses, np.ndarray):
+            self.extend_block(clauses)
+        elif isinstance(clauses, CNF):
+            base = len(self.literals)
+            self.literals.extend(clauses.literals)
+            self.offsets.extend(base + o for o in clauses.offsets[1:])
+        else:
+            for clause in clauses:
+                self.append(clause)
+
+    def extend_block(self, block: np.ndarray) -> None:
+        """Append the rows of a (n_clauses, width) array of literals."""
+        n_clauses, width = block.shape
+        base = len(self.literals)
+        self.literals.frombytes(block.astype(np.int32).tobytes())
+        ends = base + width * np.arange(1, n_clauses + 1, dtype=np.int64)
+        self.offsets.frombytes(ends.tobytes())
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Zero copy NumPy views of literals and offsets. The CNF can
+        not be appended to while the views are alive."""
+        return (np.frombuffer(self.literals, dtype=np.int32),
+                np.frombuffer(self.offsets, dtype=np.int64))
+
+    def max_var(self) -> int:
+        literals, _ = self.arrays()
+        return int(np.abs(literals).max(initial=0))
+
+    def shifted(self, amount: int) -> CNF:
+        """Copy with each variable v renamed to v + amount."""
+        literals, _ = self.arrays()
+        shifted = literals + np.sign(literals).astype(np.int32) * amount
+        result = array('i')
+        result.frombytes(shifted.astype(np.int32).tobytes())
+        return CNF(result, array('q', self.offsets))
+
+
+__all__ = ['CNF', 'Clause']
@@ -0,0 +1,303 @@
+"""DIMACS export and out of process solvers.
+
+write_dimacs streams clauses to a text file or pipe in DIMACS CNF
+format, e.g., for a batch system (see write_encodings). A CNF is
+written in chunks straight from its flat buffers. Other iterables of
+clauses, e.g., encoding.encode_dfa_id, are written clause by clause.
+If their counts are not given, the header is patched afterwards on
+seekable files and the clauses are first collected into a (compact)
+CNF otherwise.
+
+ExternalSolver follows the pysat solver interface used by find_dfas,
+so a solver binary speaking the SAT competition output format
+(kissat, CaDiCaL, ...) can be passed as solver_fact:
+
+    solver_fact = ExternalSolver.factory('kissat', '-q')
+    dfa = find_dfa(accepting, rejecting, solver_fact=solver_fact)
+
+Each query runs the binary on the whole formula, with assumptions
+added as unit clauses, so enumerating many models is slow. A query
+that runs past the solver's timeout kills the binary and raises
+budget.BudgetExhausted, as queries out of a find_dfas budget do.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+from array import array
+from functools import partial
+from itertools import chain
+from typing import IO, Iterable, Optional, Sequence
+
+import numpy as np
+
+from dfa_identify.amo import AMOMode
+from dfa_identify.budget import AnytimeResult, BudgetExhausted
+from dfa_identify.cache import PreprocessCache
+from dfa_identify.cnf import CNF, Clause
+from dfa_identify.encoding import (
+    Backend, Bounds, Codec, EncodingContext, SymMode, candidate_sizes,
+    encode_dfa_id, preprocess,
+)
+from dfa_identify.graphs import APTA
+
+
+HEADER_WIDTH = 48  # Fits 'p cnf <n_vars> <n_clauses>' for 64 bit counts.
+CHUNK = 1 << 16    # Clauses formatted at a time.
+
+
+def _header(n_vars: int, n_clauses: int) -> str:
+    return f'p cnf {n_vars} {n_clauses}'.ljust(HEADER_WIDTH) + '\n'
+
+
+def _write_cnf(cnf: CNF, out: IO[str]) -> None:
+    literals, offsets = cnf.arrays()
+    for start in range(0, len(cnf), CHUNK):
+        ends = offsets[start:start + CHUNK + 1]
+        lits = literals[ends[0]:ends[-1]].astype(np.int64)
+        lits = np.insert(lits, ends[1:] - ends[0], 0)  # Terminate clauses.
+        seps = np.where(lits == 0, '\n', ' ')
+        out.write(''.join(chain.from_iterable(
+            zip(map(str, lits.tolist()), seps.tolist()))))
+
+
+def _write_clauses(clauses: Iterable[Clause],
+                   out: IO[str]) -> tuple[int, int]:
+    n_vars = n_clauses = 0
+    for clause in clauses:
+        out.write(' '.join(map(str, [*clause, 0])) + '\n')
+        n_vars = max(n_vars, *map(abs, clause), 0)
+        n_clauses += 1
+    return n_vars, n_clauses
+
+
+def write_dimacs(clauses: Iterable[Clause], out: IO[str],
+                 n_vars: Optional[int] = None,
+                 n_clauses: Optional[int] = None,
+                 comments: Iterable[str] = ()) -> int:
+    """Write clauses to out in DIMACS CNF format. Returns the number of
+    clauses written.
+
+    n_vars defaults to the largest variable in clauses. It can be set
+    higher, e.g., to the number of variables of a Codec.
+    """
+    for comment in comments:
+        out.write(f'c {comment}\n')
+
+    if isinstance(clauses, CNF):
+        n_vars = max(n_vars or 0, clauses.max_var())
+        out.write(_header(n_vars, len(clauses)))
+        _write_cnf(clauses, out)
+        return len(clauses)
+
+    if n_vars is not None and n_clauses is not None:
+        out.write(_header(n_vars, n_clauses))
+        _, written = _write_clauses(clauses, out)
+        if written != n_clauses:
+            raise ValueError(f'Expected {n_clauses} clauses, got {written}.')
+        return written
+
+    if not out.seekable():
+        return write_dimacs(CNF.from_clauses(clauses), out, n_vars)
+
+    start = out.tell()
+    out.write(_header(0, 0))  # Placeholder of the same width.
+    max_var, written = _write_clauses(clauses, out)
+    end = out.tell()
+    out.seek(start)
+    out.write(_header(max(n_vars or 0, max_var), written))
+    out.seek(end)
+    return written
+
+
+def write_encodings(
+        apta: APTA,
+        directory: str,
+        sym_mode: SymMode = None,
+        bounds: Bounds = (None, None),
+        workers: int = 1,
+        cache: Optional[PreprocessCache] = None,
+        backend: Backend = 'python',
+        amo: AMOMode = 'pairwise',
+        clique_bound: bool = True,
+) -> list[tuple[Codec, str]]:
+    """Write the encoding of each DFA size (see
+    encoding.dfa_id_encodings, also for the arguments) to
+    directory/dfa_<size>.cnf, streaming the clauses as they are
+    generated. Returns the codecs, to decode models with, and the
+    paths."""
+    cgraph, clique = preprocess(apta, workers, cache)
+    ctx = EncodingContext.from_apta(apta, cgraph)
+    written = []
+    for n_colors in candidate_sizes(apta, bounds, clique, clique_bound):
+        codec = Codec.from_apta(apta, n_colors, sym_mode=sym_mode, amo=amo)
+        path = os.path.join(directory, f'dfa_{n_colors}.cnf')
+        with open(path, 'w') as out:
+            clauses = encode_dfa_id(apta, codec, cgraph, clique, backend, ctx)
+            write_dimacs(clauses, out, n_vars=codec.offsets[-1],
+                         comments=[repr(codec)])
+        written.append((codec, path))
+    return written
+
+
+def read_dimacs(lines: Iterable[str]) -> CNF:
+    """Clauses of a DIMACS CNF file, ignoring comments and the header."""
+    tokens = array('i')
+    for line in lines:
+        if line[:1] not in ('c', 'p', '%'):
+            tokens.extend(int(token) for token in line.split())
+    tokens = np.frombuffer(tokens, dtype=np.int32)
+    zeros = np.flatnonzero(tokens == 0)
+    body = tokens[:zeros[-1] if len(zeros) else 0]  # Complete clauses.
+    cnf = CNF()
+    cnf.literals.frombytes(body[body != 0].tobytes())
+    ends = zeros - np.arange(len(zeros))  # Literals before each zero.
+    cnf.offsets.frombytes(ends.astype(np.int64).tobytes())
+    return cnf
+
+
+def read_solution(lines: Iterable[str],
+                  n_vars: int = 0) -> tuple[Optional[bool], list[int]]:
+    """Status (True for SAT, False for UNSAT, None if unknown) and model
+    from SAT competition style solver output. The model lists each of
+    the variables 1..n_vars, which are false if the solver left them
+    out."""
+    status, values = None, {}
+    for line in lines:
+        if line.startswith('s '):
+            answer = line[2:].strip()
+            status = {'SATISFIABLE': True, 'UNSATISFIABLE': False}.get(answer)
+        elif line.startswith('v '):
+            values.update((abs(lit), lit) for lit in map(int, line[2:].split())
+                          if lit != 0)
+    if status is not True:
+        return status, []
+    n_vars = max(n_vars, max(values, default=0))
+    return status, [values.get(var, -var) for var in range(1, n_vars + 1)]
+
+
+class ExternalSolver:
+    """pysat style solver that runs command, a DIMACS solver binary,
+    once per query.
+
+    The formula is passed as a temporary file whose path is appended to
+    command, or, if pipe, written to the solver's standard input. A
+    query taking more than timeout seconds raises BudgetExhausted.
+    """
+
+    def __init__(self, bootstrap_with: Iterable[Clause] = None,
+                 command: Sequence[str] = ('kissat', '-q'),
+                 pipe: bool = False, timeout: Optional[float] = None):
+        self.command, self.pipe, self.timeout = list(command), pipe, timeout
+        self.clauses = CNF()
+        self.n_vars = 0
+        self.status: Optional[bool] = None
+        self.model: list[int] = []
+        if bootstrap_with is not None:
+            self.append_formula(bootstrap_with)
+
+    @classmethod
+    def factory(cls, *command: str, **kwargs):
+        """solver_fact running command, e.g., factory('kissat', '-q')."""
+        return partial(cls, command=command, **kwargs)
+
+    def __enter__(self) -> ExternalSolver:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.delete()
+
+    def delete(self) -> None:
+        self.clauses = CNF()
+
+    def nof_vars(self) -> int:
+        return self.n_vars
+
+    def nof_clauses(self) -> int:
+        return len(self.clauses)
+
+    def add_clause(self, clause: Clause, no_return: bool = True) -> None:
+        self.clauses.append(clause)
+        self.n_vars = max(self.n_vars, *map(abs, clause), 0)
+
+    def append_formula(self, formula, no_return: bool = True) -> None:
+        formula = getattr(formula, 'clauses', formula)  # pysat formulas.
+        if not isinstance(formula, CNF):
+            formula = CNF.from_clauses(formula)
+        self.clauses.extend(formula)
+        self.n_vars = max(self.n_vars, formula.max_var())
+
+    def set_phases(self, literals: Iterable[int] = ()) -> None:
+        raise NotImplementedError('Phases can not be passed to the solver.')
+
+    def solve(self, assumptions: Iterable[int] = ()) -> bool:
+        formula = self.clauses
+        assumptions = list(assumptions)
+        if assumptions:
+            formula = CNF(array('i', formula.literals),
+                          array('q', formula.offsets))
+            formula.extend([lit] for lit in assumptions)
+        n_vars = max(self.n_vars, *map(abs, assumptions), 0)
+        output = self._run(formula, n_vars)
+        if output is None:
+            self.status, self.model = None, []
+            raise BudgetExhausted(AnytimeResult(reason='timeout'))
+        self.status, self.model = read_solution(output.splitlines(), n_vars)
+        if self.status is None:
+            raise RuntimeError(f'{self.command[0]} gave no answer:\n'
+                               f'{output[-1000:]}')
+        return self.status
+
+    def _run(self, formula: CNF, n_vars: int) -> Optional[str]:
+        """Output of the solver on formula, None if it timed out (and
+        was killed)."""
+        if self.pipe:
+            with tempfile.TemporaryFile('w+') as stdout:
+                process = subprocess.Popen(
+                    self.command, stdin=subprocess.PIPE, stdout=stdout,
+                    stderr=subprocess.STDOUT, text=True)
+                try:
+                    write_dimacs(formula, process.stdin, n_vars)
+                    process.stdin.close()
+                    process.wait(timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    return None
+                finally:
+                    process.kill()
+                    process.wait()
+                stdout.seek(0)
+                return stdout.read()
+
+        fd, path = tempfile.mkstemp(suffix='.cnf')
+        try:
+            with os.fdopen(fd, 'w') as out:
+                write_dimacs(formula, out, n_vars)
+            result = subprocess.run(
+                self.command + [path], stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, text=True, timeout=self.timeout)
+            return result.stdout
+        except subprocess.TimeoutExpired:  # run has killed the solver.
+            return None
+        finally:
+            os.remove(path)
+
+    def get_status(self) -> Optional[bool]:
+        return self.status
+
+    def get_model(self) -> Optional[list[int]]:
+        return self.model if self.status else None
+
+    def enum_models(self, assumptions: Iterable[int] = ()):
+        """Models, each blocked once found (as in pysat)."""
+        assumptions = list(assumptions)
+        while self.solve(assumptions):
+            model = self.model
+            yield model
+            self.add_clause([-lit for lit in model])
+
+
+__all__ = [
+    'ExternalSolver', 'read_dimacs', 'read_solution', 'write_dimacs',
+    'write_encodings',
+]
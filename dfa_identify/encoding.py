@@ -7,35 +7,46 @@ from typing import Any, Callable, Iterable, Literal, Optional, Union
 
 import attr
 import funcy as fn
-import networkx as nx
-from networkx.algorithms.approximation.clique import max_clique
+import numpy as np
 from functools import partial
 
-from dfa_identify.graphs import APTA, Node
+from dfa_identify.amo import AMOMode, template
+from dfa_identify.cache import PreprocessCache
+from dfa_identify.cnf import CNF
+from dfa_identify.estimate import Estimate, check_limits, estimate_encoding
+from dfa_identify.graphs import (
+    ACCEPTING, APTA, REJECTING, BitGraph, Graph, Node, max_clique
+)
+from dfa_identify.vectorized import encode_dfa_id_blocks
 
 Nodes = Iterable[Node]
 Clauses = Iterable[list[int]]
-Encodings = Iterable[Clauses]
+Encodings = Iterable[tuple['Codec', CNF]]
 SymMode = Optional[Literal['bfs', 'clique']]
+Backend = Literal['python', 'numpy']
 
 
 # =================== Codec : int <-> variable  ====================
 
 
+_SIZES = {'color': 'n_colors', 'node': 'n_nodes', 'token': 'n_tokens'}
+
+
 def encoder(offset):
     def _encoder(func):
-        sig = inspect.signature(func)
+        # Range checked arguments as (position, name, size attribute).
+        names = list(inspect.signature(func).parameters)[1:]
+        checked = [(i, name, size) for i, name in enumerate(names)
+                   for prefix, size in _SIZES.items()
+                   if name.startswith(prefix)]
 
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            bound = sig.bind_partial(self, *args, **kwargs)
-            for key, val in bound.arguments.items():
-                if key.startswith('color'):
-                    assert 0 <= val < self.n_colors
-                elif key.startswith('node'):
-                    assert 0 <= val < self.n_nodes
-                elif key.startswith('token'):
-                    assert 0 <= val < self.n_tokens
+            if __debug__ and self.validate:
+                for i, name, size in checked:
+                    val = args[i] if i < len(args) else kwargs.get(name)
+                    if val is not None:
+                        assert 0 <= val < getattr(self, size)
 
             base = self.offsets[offset]
             return func(self, *args, **kwargs) + base
@@ -72,29 +83,60 @@ class ParentRelationVar:
 Var = Union[ColorAcceptingVar, ColorNodeVar, ParentRelationVar, AuxillaryVar]
 
 
+@attr.s(auto_attribs=True, frozen=True, eq=False)
+class DecodedModel:
+    """The DFA of a model as arrays over colors."""
+    accepting: np.ndarray    # (n_colors,) bools, from z.
+    start: int               # Color of the APTA's root, from x.
+    transitions: np.ndarray  # (n_colors, n_tokens) colors or -1, from y.
+
+
 @attr.s(auto_detect=True, auto_attribs=True, frozen=True)
 class Codec:
     n_nodes: int
     n_colors: int
     n_tokens: int
     sym_mode: SymMode
+    incremental: bool = False
+    amo: AMOMode = 'pairwise'
+    # Range check the encoders' arguments (unless run with python -O).
+    validate: bool = attr.ib(default=True, eq=False, repr=False)
 
     def __attrs_post_init__(self):
+        # Only allocated if used. Otherwise, they would be free variables
+        # (multiplying the models) below activation or AMO variables.
+        bfs = self.sym_mode == "bfs"
         object.__setattr__(self, "counts", (
             self.n_colors,                                    # z
             self.n_colors * self.n_nodes,                     # x
             self.n_tokens * self.n_colors * self.n_colors,    # y
-            (self.n_colors * (self.n_colors - 1)) // 2,       # p
-            (self.n_colors * (self.n_colors - 1)) // 2,       # t
-            (self.n_colors - 1) * self.n_tokens,              # m
+            bfs * (self.n_colors * (self.n_colors - 1)) // 2,  # p
+            bfs * (self.n_colors * (self.n_colors - 1)) // 2,  # t
+            bfs * (self.n_colors - 1) * self.n_tokens,         # m
+            self.n_colors if self.incremental else 0,         # a
+            self.n_amo_groups * self.amo_template.n_aux,      # amo
         ))
         object.__setattr__(self, "offsets", tuple([0] + fn.lsums(self.counts)))
 
     @staticmethod
     def from_apta(apta: APTA,
                   n_colors: int = 0,
-                  sym_mode: SymMode = None) -> Codec:
-        return Codec(len(apta.nodes), n_colors, len(apta.alphabet), sym_mode)
+                  sym_mode: SymMode = None,
+                  incremental: bool = False,
+                  amo: AMOMode = 'pairwise',
+                  validate: bool = True) -> Codec:
+        return Codec(len(apta.nodes), n_colors, len(apta.alphabet), sym_mode,
+                     incremental, amo, validate)
+
+    @property
+    def amo_template(self):
+        """At-most-one encoding of the one-hot constraints."""
+        return template(self.n_colors, self.amo)
+
+    @property
+    def n_amo_groups(self) -> int:
+        """One-hot groups: node colors, then parent relations."""
+        return self.n_nodes + self.n_tokens * self.n_colors
 
     @encoder(offset=0)
     def color_accepting(self, color: int) -> int:
@@ -133,6 +175,28 @@ class Codec:
         assert color > 0
         return 1 + self.n_tokens * (color - 1) + token
 
+    # --------------------- Incremental Only ---------------------------
+    @encoder(offset=6)
+    def color_active(self, color: int) -> int:
+        """ Activation literal of color. Inactive colors are unused. """
+        return 1 + color
+
+    def assumptions(self, n_colors: int) -> list[int]:
+        """Assumptions restricting an incremental codec to n_colors."""
+        assert self.incremental and n_colors <= self.n_colors
+        return [self.color_active(c) if c < n_colors else
+                -self.color_active(c) for c in range(self.n_colors)]
+
+    # --------------------- At-Most-One Auxiliaries --------------------
+    @encoder(offset=7)
+    def amo_aux(self, group: int, idx: int) -> int:
+        """ Auxiliary variable idx of an at-most-one group, n for node
+        n's colors and n_nodes + n_colors * token + color for the targets
+        of color's token transition. """
+        n_aux = self.amo_template.n_aux
+        assert 0 <= group < self.n_amo_groups and 0 <= idx < n_aux
+        return 1 + n_aux * group + idx
+
     # -------------------------------------------------------------------
 
     def decode(self, lit: int) -> Var:
@@ -152,6 +216,42 @@ class Codec:
 
         return AuxillaryVar(idx)
 
+    def decode_model(self, model: Iterable[int]) -> DecodedModel:
+        """Decode the z, root x and y blocks of a model at once. model
+        may omit or reorder literals; missing ones are false.
+
+        Models from pysat list variable v at index v - 1. Then only the
+        slices of the decoded blocks are read, skipping the x variables
+        of the other nodes, and only their true variables are indexed.
+        """
+        n_colors, top = self.n_colors, self.offsets[3]
+        root_x = self.offsets[1], self.offsets[1] + n_colors
+        lits = None
+        if isinstance(model, list) and len(model) >= top:
+            lits = np.array(model[:n_colors] + model[slice(*root_x)] +
+                            model[self.offsets[2]:top], dtype=np.int64)
+            expected = np.r_[1:n_colors + 1, root_x[0] + 1:root_x[1] + 1,
+                             self.offsets[2] + 1:top + 1]
+            if not np.array_equal(np.abs(lits), expected):
+                lits = None  # Not in variable order.
+        if lits is None:
+            lits = np.asarray(model, dtype=np.int64)
+        true = lits[(lits > 0) & (lits <= top)] - 1  # Index var - 1.
+
+        accepting = np.zeros(n_colors, dtype=bool)
+        accepting[true[true < n_colors]] = True
+        root = true[(true >= root_x[0]) & (true < root_x[1])] - root_x[0]
+        token, y = np.divmod(true[true >= self.offsets[2]] - self.offsets[2],
+                             n_colors * n_colors)
+        target, source = np.divmod(y, n_colors)
+        transitions = np.full((n_colors, self.n_tokens), -1, dtype=np.int64)
+        transitions[source, token] = target
+        if __debug__ and self.validate:
+            # Each (source, token) pair has at most one target.
+            assert len(root) == 1 and \
+                np.count_nonzero(transitions >= 0) == len(target)
+        return DecodedModel(accepting, int(root[0]), transitions)
+
 
 # ================= Clause Generator =====================
 
@@ -159,23 +259,194 @@ Bounds = tuple[Optional[int], Optional[int]]
 ExtraClauseGenerator = Callable[[APTA, Codec], Clauses]
 
 
+def no_extra_clauses(apta: APTA, codec: Codec) -> Clauses:
+    return ()
+
+
+@attr.s(auto_attribs=True, frozen=True, eq=False)
+class EncodingContext:
+    """The parts of an APTA and its consistency graph the clauses are
+    built from. Computed once and shared by all sizes and families."""
+    nodes: np.ndarray      # Non-root nodes.
+    parents: np.ndarray    # parents[i] = parent of nodes[i].
+    tokens: np.ndarray     # tokens[i] = token of the edge into nodes[i].
+    accepting: np.ndarray  # Accepting nodes.
+    rejecting: np.ndarray  # Rejecting nodes.
+    edges: np.ndarray      # (n_edges, 2) conflicts that need clauses.
+    labeled: bool          # Whether edges join accepting and rejecting.
+
+    @staticmethod
+    def from_apta(apta: APTA, cgraph: Graph) -> EncodingContext:
+        parents = np.frombuffer(apta.parents, dtype=np.intc)
+        tokens = np.frombuffer(apta.tokens, dtype=np.intc)
+        labels = np.frombuffer(apta.labels, dtype=np.int8)
+        accepting = np.flatnonzero(labels == ACCEPTING)
+        rejecting = np.flatnonzero(labels == REJECTING)
+
+        if isinstance(cgraph, BitGraph):
+            edges = cgraph.edge_array()
+        else:
+            edges = np.array(list(cgraph.edges), dtype=np.int64)
+        edges = edges.reshape(-1, 2)
+        labeled = len(accepting) > 0 and len(rejecting) > 0
+        if labeled:  # Only accepting/rejecting pairs need clauses.
+            left, right = labels[edges[:, 0]], labels[edges[:, 1]]
+            edges = edges[(left != right) & (left >= 0) & (right >= 0)]
+
+        return EncodingContext(
+            nodes=np.arange(1, len(parents)),
+            parents=parents[1:].astype(np.int64),
+            tokens=tokens[1:].astype(np.int64),
+            accepting=accepting,
+            rejecting=rejecting,
+            edges=edges,
+            labeled=labeled,
+        )
+
+
 def dfa_id_encodings(
         apta: APTA,
         sym_mode: SymMode = None,
-        extra_clauses: ExtraClauseGenerator = lambda *_: (),
-        bounds: Bounds = (None, None)
+        extra_clauses: ExtraClauseGenerator = no_extra_clauses,
+        bounds: Bounds = (None, None),
+        workers: int = 1,
+        cache: Optional[PreprocessCache] = None,
+        backend: Backend = 'python',
+        clique_bound: bool = True,
+        amo: AMOMode = 'pairwise',
+        max_clauses: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        validate: bool = True,
         ) -> Encodings:
-    """Iterator of codecs and clauses for DFAs of increasing size."""
-    cgraph = apta.consistency_graph()
-    clique = max_clique(cgraph)
+    """Iterator of codecs and clauses (as CNFs) for DFAs of increasing size.
+
+    workers sets the number of processes for the consistency graph. If
+    a cache is given, the consistency graph and clique are looked up
+    there before being computed. backend selects how the clauses are
+    generated: 'python' generators or 'numpy' arrays (see vectorized).
+    Both produce the same clauses in the same order. amo selects the
+    at-most-one encoding of the one-hot constraints (see amo).
+
+    If clique_bound, sizes below the size of the consistency graph's
+    clique are skipped. This assumes a single DFA has to be consistent
+    with all examples, which is not the case in decompose.
+
+    If the encoding of any size in bounds (without extra_clauses) is
+    estimated to exceed max_clauses or max_memory bytes (see estimate),
+    EncodingTooLarge is raised up front, before the first encoding is
+    generated. Without an upper bound, the sizes run up to the number
+    of APTA nodes.
+
+    validate=False turns off the range checks of the codecs' encoders
+    (see Codec.validate), e.g., in production once an encoding is known
+    to be correct.
+    """
+    cgraph, clique = preprocess(apta, workers, cache)
+    ctx = EncodingContext.from_apta(apta, cgraph)
+    sizes = candidate_sizes(apta, bounds, clique, clique_bound)
+    make_codec = partial(Codec.from_apta, apta, sym_mode=sym_mode, amo=amo,
+                         validate=validate)
+    if max_clauses is not None or max_memory is not None:
+        for n_colors in sizes:
+            check_limits(estimate_encoding(make_codec(n_colors), ctx,
+                                           len(clique)),
+                         max_clauses, max_memory)
+
+    for n_colors in sizes:
+        codec = make_codec(n_colors)
+        clauses = encode_dfa_id_cnf(apta, codec, cgraph, clique, backend,
+                                    ctx)
+        clauses.extend(extra_clauses(apta, codec))
+
+        yield codec, clauses
+
+
+def dfa_id_incremental_encoding(
+        apta: APTA,
+        sym_mode: SymMode = None,
+        bounds: Bounds = (None, None),
+        workers: int = 1,
+        cache: Optional[PreprocessCache] = None,
+        backend: Backend = 'python',
+        clique_bound: bool = True,
+        amo: AMOMode = 'pairwise',
+        max_clauses: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        validate: bool = True,
+        ) -> tuple[Codec, CNF, range]:
+    """Single encoding for all DFA sizes in bounds.
+
+    Returns an incremental codec for the largest size, its clauses and
+    the range of sizes. The encoding for n_colors of them is obtained
+    by solving under codec.assumptions(n_colors), so one solver, and
+    everything it learns, can be reused across sizes. See
+    dfa_id_encodings for the arguments.
+    """
+    cgraph, clique = preprocess(apta, workers, cache)
+    sizes = candidate_sizes(apta, bounds, clique, clique_bound)
+    codec = Codec.from_apta(apta, max(sizes, default=0), sym_mode=sym_mode,
+                            incremental=True, amo=amo, validate=validate)
+    if not sizes:
+        return codec, CNF(), sizes
+    ctx = EncodingContext.from_apta(apta, cgraph)
+    check_limits(estimate_encoding(codec, ctx, len(clique)),
+                 max_clauses, max_memory)
+    clauses = encode_dfa_id_cnf(apta, codec, cgraph, clique, backend, ctx)
+    return codec, clauses, sizes
+
+
+def estimate_sizes(
+        apta: APTA,
+        sym_mode: SymMode = None,
+        bounds: Bounds = (None, None),
+        cgraph: Optional[Graph] = None,
+        workers: int = 1,
+        cache: Optional[PreprocessCache] = None,
+        clique_bound: bool = True,
+        amo: AMOMode = 'pairwise',
+        incremental: bool = False,
+        ) -> list[Estimate]:
+    """Estimated size of each encoding dfa_id_encodings would generate,
+    or, if incremental, of the one dfa_id_incremental_encoding would.
+
+    Only the consistency graph and its clique are computed, or taken
+    from cgraph or cache if given. See dfa_id_encodings for the other
+    arguments.
+    """
+    if cgraph is None:
+        cgraph, clique = preprocess(apta, workers, cache)
+    else:
+        clique = max_clique(cgraph)
+    sizes = candidate_sizes(apta, bounds, clique, clique_bound)
+    if incremental:
+        sizes = sizes[-1:]
+    ctx = EncodingContext.from_apta(apta, cgraph)
+    codecs = (Codec.from_apta(apta, n_colors, sym_mode, incremental, amo)
+              for n_colors in sizes)
+    return [estimate_encoding(codec, ctx, len(clique)) for codec in codecs]
+
+
+def preprocess(apta: APTA, workers: int = 1,
+               cache: Optional[PreprocessCache] = None,
+               time_budget: Optional[float] = None) -> tuple[Graph, Nodes]:
+    """Consistency graph and max clique, looked up in cache if given.
+    time_budget (seconds) also limits the clique search."""
+    if cache is not None:
+        return cache.preprocess(apta, workers=workers,
+                                time_budget=time_budget)
+    cgraph = apta.consistency_graph(compact=True, workers=workers)
+    return cgraph, max_clique(cgraph, time_budget)
+
+
+def candidate_sizes(apta: APTA, bounds: Bounds, clique: Nodes,
+                    clique_bound: bool = True) -> range:
+    """DFA sizes to search given bounds (see dfa_id_encodings)."""
     max_needed = len(apta.nodes)
 
     low, high = bounds
 
-    # Tighten lower bound.
     if low is None:
         low = 1
-    # low = max(low, len(clique))
 
     if (low > max_needed) and ((high is None) or (low <= high)):
         high = low  # Will find something at low if one exists.
@@ -187,22 +458,53 @@ def dfa_id_encodings(
     if high < low:
         raise ValueError('Empty bound range!')
 
-    for n_colors in range(low, high + 1):
-        codec = Codec.from_apta(apta, n_colors, sym_mode=sym_mode)
-
-        clauses = list(encode_dfa_id(apta, codec, cgraph, clique))
-        clauses.extend(list(extra_clauses(apta, codec)))
-
-        yield codec, clauses
-
-
-def encode_dfa_id(apta, codec, cgraph, clique=None):
-    # Clauses from Table 1.                                      rows
-    yield from onehot_color_clauses(codec)                      # 1, 5
-    yield from partition_by_accepting_clauses(codec, apta)      # 2
-    yield from colors_parent_rel_coupling_clauses(codec, apta)  # 3, 7
-    yield from onehot_parent_relation_clauses(codec)            # 4, 6
-    yield from determination_conflicts(codec, cgraph, apta.accepting, apta.rejecting)           # 8
+    # Tighten lower bound. Clique nodes need pairwise distinct states.
+    if clique_bound:
+        low = max(low, len(clique))
+
+    return range(low, high + 1)
+
+
+def encode_dfa_id(apta, codec, cgraph, clique=None, backend='python',
+                  ctx=None):
+    """Clauses for a DFA of codec.n_colors states consistent with apta.
+    ctx, an EncodingContext of apta and cgraph, is built if not given."""
+    if ctx is None:
+        ctx = EncodingContext.from_apta(apta, cgraph)
+    if backend == 'numpy':
+        for block in encode_dfa_id_blocks(codec, ctx):
+            yield from block.tolist()
+    elif backend == 'python':
+        # Clauses from Table 1.                                      rows
+        yield from onehot_color_clauses(codec)                      # 1, 5
+        yield from partition_by_accepting_clauses(codec, ctx)       # 2
+        yield from colors_parent_rel_coupling_clauses(codec, ctx)   # 3, 7
+        yield from onehot_parent_relation_clauses(codec)            # 4, 6
+        yield from determination_conflicts(codec, ctx)              # 8
+    else:
+        raise ValueError(f"Unknown backend {backend!r}.")
+    yield from symmetry_breaking_clauses(codec, clique)
+    yield from activation_clauses(codec)
+
+
+def encode_dfa_id_cnf(apta, codec, cgraph, clique=None,
+                      backend='python', ctx=None) -> CNF:
+    """encode_dfa_id's clauses as a CNF. Blocks of the numpy backend are
+    copied in directly rather than converted to lists."""
+    if ctx is None:
+        ctx = EncodingContext.from_apta(apta, cgraph)
+    if backend != 'numpy':
+        return CNF.from_clauses(
+            encode_dfa_id(apta, codec, cgraph, clique, backend, ctx))
+    cnf = CNF()
+    for block in encode_dfa_id_blocks(codec, ctx):
+        cnf.extend_block(block)
+    cnf.extend(symmetry_breaking_clauses(codec, clique))
+    cnf.extend(activation_clauses(codec))
+    return cnf
+
+
+def symmetry_breaking_clauses(codec: Codec, clique: Nodes) -> Clauses:
     if codec.sym_mode == "clique":
         yield from symmetry_breaking(codec, clique)
     elif codec.sym_mode == "bfs":
@@ -215,10 +517,15 @@ def onehot_color_clauses(codec: Codec) -> Clauses:
         yield [codec.color_node(n, c) for c in range(codec.n_colors)]
 
     for n in range(codec.n_nodes):  # Each vertex has at most one color.
-        for i in range(codec.n_colors):
-            lit = codec.color_node(n, i)
-            for j in range(i + 1, codec.n_colors):  # i < j
-                yield [-lit, -codec.color_node(n, j)]
+        lits = [codec.color_node(n, c) for c in range(codec.n_colors)]
+        yield from at_most_one(codec, n, lits)
+
+
+def at_most_one(codec: Codec, group: int, lits: list[int]) -> Clauses:
+    """codec.amo encoding of at most one of lits (see Codec.amo_aux)."""
+    tmpl = codec.amo_template
+    aux = [codec.amo_aux(group, i) for i in range(tmpl.n_aux)]
+    return tmpl.instantiate(lits, aux)
 
 
 def tokensXcolors(codec: Codec):
@@ -229,31 +536,33 @@ def onehot_parent_relation_clauses(codec: Codec) -> Clauses:
     # Each parent relation must target at least one color.
     for token, i in tokensXcolors(codec):
         colors = range(codec.n_colors)
-        yield [codec.parent_relation(token, i, j) for j in colors]
+        clause = [codec.parent_relation(token, i, j) for j in colors]
+        if codec.incremental:  # Only active colors need transitions.
+            clause.append(-codec.color_active(i))
+        yield clause
 
     # Each parent relation can target at most one color.
     for token, i in tokensXcolors(codec):
-        for h in range(codec.n_colors):
-            lit1 = codec.parent_relation(token, i, h)
-            for j in range(h + 1, codec.n_colors):  # h < j
-                yield [-lit1, -codec.parent_relation(token, i, j)]
+        colors = range(codec.n_colors)
+        lits = [codec.parent_relation(token, i, j) for j in colors]
+        group = codec.n_nodes + codec.n_colors * token + i
+        yield from at_most_one(codec, group, lits)
 
 
-def partition_by_accepting_clauses(codec: Codec, apta: APTA) -> Clauses:
+def partition_by_accepting_clauses(codec: Codec,
+                                   ctx: EncodingContext) -> Clauses:
+    accepting, rejecting = ctx.accepting.tolist(), ctx.rejecting.tolist()
     for c in range(codec.n_colors):
         lit = codec.color_accepting(c)
-        yield from ([-codec.color_node(n, c), lit] for n in apta.accepting)
-        yield from ([-codec.color_node(n, c), -lit] for n in apta.rejecting)
+        yield from ([-codec.color_node(n, c), lit] for n in accepting)
+        yield from ([-codec.color_node(n, c), -lit] for n in rejecting)
 
 
-def colors_parent_rel_coupling_clauses(codec: Codec, apta: APTA) -> Clauses:
+def colors_parent_rel_coupling_clauses(codec: Codec,
+                                       ctx: EncodingContext) -> Clauses:
     colors = range(codec.n_colors)
-    rev_tree = apta.tree.reverse()
-    non_root_nodes = set(apta.nodes) - {0}     # Root doesn't have a parent.
-    for node, i, j in product(non_root_nodes, colors, colors):
-        parent, *_ = rev_tree.neighbors(node)  # only have 1 parent.
-        token = apta.alphabet[apta.nodes[node]['source']]
-
+    edges = zip(ctx.nodes.tolist(), ctx.parents.tolist(), ctx.tokens.tolist())
+    for (node, parent, token), i, j in product(edges, colors, colors):
         parent_color = codec.color_node(parent, i)
         node_color = codec.color_node(node, j)
         parent_rel = codec.parent_relation(token, i, j)
@@ -263,14 +572,13 @@ def colors_parent_rel_coupling_clauses(codec: Codec, apta: APTA) -> Clauses:
         yield [-parent_color, node_color, -parent_rel]  # 7
 
 
-def determination_conflicts(codec: Codec, cgraph: nx.Graph, accepting=[], rejecting=[]) -> Clauses:
+def determination_conflicts(codec: Codec, ctx: EncodingContext) -> Clauses:
     colors = range(codec.n_colors)
-    for (n1, n2), c in product(cgraph.edges, colors):
-        if len(accepting) > 0 and len(rejecting) > 0:
-            if (n1 in accepting and n2 in rejecting) or (n1 in rejecting and n2 in accepting):
-                yield [-codec.color_node(n1, c), -codec.color_node(n2, c), codec.color_accepting(c)]
-        else:
-            yield [-codec.color_node(n1, c), -codec.color_node(n2, c)]
+    for (n1, n2), c in product(ctx.edges.tolist(), colors):
+        clause = [-codec.color_node(n1, c), -codec.color_node(n2, c)]
+        if ctx.labeled:
+            clause.append(codec.color_accepting(c))
+        yield clause
 
 
 def symmetry_breaking(codec: Codec, clique: Nodes) -> Clauses:
@@ -288,10 +596,13 @@ def symmetry_breaking_common(codec: Codec) -> Clauses:
 
     for color2 in range(codec.n_colors):
         if color2 > 0:
-            yield [
+            clause = [
                 codec.enumeration_parent(color1, color2)
                 for color1 in range(color2)
             ]  # 4
+            if codec.incremental:  # Only active colors have parents.
+                clause.append(-codec.color_active(color2))
+            yield clause
         for color1 in range(color2):
             p = codec.enumeration_parent(color1, color2)
             t = codec.transition_relation(color1, color2)
@@ -311,6 +622,29 @@ def symmetry_breaking_common(codec: Codec) -> Clauses:
                     yield [-p, -m(token2), -y(token1)]  # 6
 
 
+def activation_clauses(codec: Codec) -> Clauses:
+    """Variables mentioning an inactive color are false, so models
+    under codec.assumptions(n) match those of the size n encoding."""
+    if not codec.incremental:
+        return
+    for color in range(codec.n_colors):
+        active = codec.color_active(color)
+        yield [active, -codec.color_accepting(color)]
+        for node in range(codec.n_nodes):
+            yield [active, -codec.color_node(node, color)]
+        for token, other in tokensXcolors(codec):
+            yield [active, -codec.parent_relation(token, color, other)]
+            if other != color:
+                yield [active, -codec.parent_relation(token, other, color)]
+        for token in range(codec.n_tokens):  # Nothing to count.
+            group = codec.n_nodes + codec.n_colors * token + color
+            for idx in range(codec.amo_template.n_aux):
+                yield [active, -codec.amo_aux(group, idx)]
+        if codec.sym_mode == "bfs" and color > 0:
+            for token in range(codec.n_tokens):
+                yield [active, -codec.enumeration_label(token, color)]
+
+
 def symmetry_breaking_bfs(codec: Codec) -> Clauses:
     """
     Symmetry breaking clauses for BFS
@@ -341,4 +675,6 @@ def symmetry_breaking_bfs(codec: Codec) -> Clauses:
                     ]  # 15
 
 
-__all__ = ['Codec', 'dfa_id_encodings', 'Bounds', 'ExtraClauseGenerator']
+__all__ = ['Codec', 'DecodedModel', 'EncodingContext', 'dfa_id_encodings',
+           'dfa_id_incremental_encoding', 'estimate_sizes', 'Bounds',
+           'ExtraClauseGenerator']
@@ -0,0 +1,143 @@
+"""Size of the encodings, predicted without generating them.
+
+The clause families of encoding.encode_dfa_id have closed form sizes
+in the number of colors, nodes, tokens and conflicts (edges of the
+consistency graph that need clauses), so the number of clauses and
+literals of each family, and thus the memory of its CNF, is known
+before any clause is generated. Clauses from extra_clauses are not
+included.
+
+The solver's memory is estimated from the usual clause database
+layout: the literals, a header and two watches per clause, and a few
+words per variable. It is a rough guide, not a bound.
+"""
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+import attr
+
+if TYPE_CHECKING:
+    from dfa_identify.encoding import Codec, EncodingContext
+
+
+Size = tuple[int, int]  # (clauses, literals)
+
+# Rough solver overheads in bytes, see module docstring.
+SOLVER_BYTES_PER_LITERAL = 4
+SOLVER_BYTES_PER_CLAUSE = 32
+SOLVER_BYTES_PER_VARIABLE = 64
+
+
+class EncodingTooLarge(ValueError):
+    """An encoding would exceed the given clause or memory limit."""
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Estimate:
+    n_colors: int
+    variables: int
+    families: dict[str, Size]  # Family name -> (clauses, literals).
+
+    @property
+    def clauses(self) -> int:
+        return sum(clauses for clauses, _ in self.families.values())
+
+    @property
+    def literals(self) -> int:
+        return sum(literals for _, literals in self.families.values())
+
+    @property
+    def cnf_bytes(self) -> int:
+        """Size of the encoding as a cnf.CNF."""
+        return 4 * self.literals + 8 * (self.clauses + 1)
+
+    @property
+    def solver_bytes(self) -> int:
+        return SOLVER_BYTES_PER_LITERAL * self.literals + \
+            SOLVER_BYTES_PER_CLAUSE * self.clauses + \
+            SOLVER_BYTES_PER_VARIABLE * self.variables
+
+    @property
+    def memory(self) -> int:
+        """Estimated bytes to hold the encoding and a solver on it."""
+        return self.cnf_bytes + self.solver_bytes
+
+
+def _symmetry_breaking(codec: Codec, clique_size: int) -> Size:
+    if codec.sym_mode == 'clique':
+        return clique_size, clique_size
+    if codec.sym_mode != 'bfs':
+        return 0, 0
+    k, n_tokens = codec.n_colors, codec.n_tokens
+    inc = int(codec.incremental)
+    token_pairs = n_tokens * (n_tokens - 1) // 2
+    pairs = k * (k - 1) // 2                # color1 < color2.
+    triples = k * (k - 1) * (k - 2) // 6    # color3 < color1 < color2.
+    # The same, restricted to color2 < k - 1.
+    pairs_ = (k - 1) * (k - 2) // 2
+    triples_ = (k - 1) * (k - 2) * (k - 3) // 6
+
+    # symmetry_breaking_common
+    clauses = 1 + max(k - 1, 0) + pairs * (2 + 3 * n_tokens + token_pairs)
+    literals = 1 + pairs + max(k - 1, 0) * inc + \
+        pairs * (3 + 9 * n_tokens + 4 * token_pairs)
+    # symmetry_breaking_bfs: 12, 13, 14 and 15.
+    clauses += triples + pairs + triples_ + pairs_ * token_pairs
+    literals += 2 * triples + 2 * pairs + triples + 2 * triples_ + \
+        4 * pairs_ * token_pairs
+    return clauses, literals
+
+
+def _activation(codec: Codec) -> Size:
+    if not codec.incremental:
+        return 0, 0
+    k, n_tokens = codec.n_colors, codec.n_tokens
+    per_color = 1 + codec.n_nodes + n_tokens * (2 * k - 1) + \
+        n_tokens * codec.amo_template.n_aux
+    clauses = k * per_color + \
+        (codec.sym_mode == 'bfs') * max(k - 1, 0) * n_tokens
+    return clauses, 2 * clauses
+
+
+def estimate_encoding(codec: Codec, ctx: EncodingContext,
+                      clique_size: int = 0) -> Estimate:
+    """Size of encoding.encode_dfa_id's clauses for codec. clique_size
+    is the number of clique nodes, used by clique symmetry breaking."""
+    k, n_nodes, n_tokens = codec.n_colors, codec.n_nodes, codec.n_tokens
+    n_amo = len(codec.amo_template.pairs)  # Binary clauses per group.
+    n_labeled = len(ctx.accepting) + len(ctx.rejecting)
+    n_edges, n_conflicts = len(ctx.nodes), len(ctx.edges)
+    transitions = n_tokens * k
+    families = {
+        'onehot_color': (n_nodes * (1 + n_amo),
+                         n_nodes * (k + 2 * n_amo)),
+        'partition_by_accepting': (k * n_labeled, 2 * k * n_labeled),
+        'parent_rel_coupling': (2 * n_edges * k * k, 6 * n_edges * k * k),
+        'onehot_parent_relation': (
+            transitions * (1 + n_amo),
+            transitions * (k + codec.incremental + 2 * n_amo)),
+        'determination_conflicts': (
+            k * n_conflicts, (2 + ctx.labeled) * k * n_conflicts),
+        'symmetry_breaking': _symmetry_breaking(codec, clique_size),
+        'activation': _activation(codec),
+    }
+    return Estimate(k, codec.offsets[-1], families)
+
+
+def check_limits(estimate: Estimate, max_clauses: Optional[int] = None,
+                 max_memory: Optional[int] = None) -> None:
+    """Raise EncodingTooLarge if estimate exceeds the limits."""
+    if max_clauses is not None and estimate.clauses > max_clauses:
+        raise EncodingTooLarge(
+            f'Encoding for {estimate.n_colors} colors has '
+            f'{estimate.clauses} clauses (max_clauses={max_clauses}).')
+    if max_memory is not None and estimate.memory > max_memory:
+        raise EncodingTooLarge(
+            f'Encoding for {estimate.n_colors} colors needs about '
+            f'{estimate.memory / 2**20:.0f}MB '
+            f'(max_memory={max_memory / 2**20:.0f}MB).')
+
+
+__all__ = ['EncodingTooLarge', 'Estimate', 'check_limits',
+           'estimate_encoding']
@@ -3,34 +3,89 @@
 See Heule, "Exact DFA Identification Using SAT Solve" for details.
 """
 from __future__ import annotations
-from itertools import chain, combinations
-from typing import Any, Iterable
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any, Iterable, Optional, Union
 
 import attr
 import networkx as nx
-import funcy as fn
+import numpy as np
 from bidict import bidict
 
+from dfa_identify.clique import search_clique
+
 
 Word = list[Any]
 Node = Any
 
+# Label codes used by APTA.labels.
+UNLABELED, REJECTING, ACCEPTING = -1, 0, 1
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class NodeView:
+    """Read only view of APTA nodes mimicking networkx's NodeView."""
+    apta: APTA
+
+    def __len__(self) -> int:
+        return len(self.apta.parents)
+
+    def __iter__(self) -> Iterable[Node]:
+        return iter(range(len(self)))
+
+    def __contains__(self, node: Node) -> bool:
+        return isinstance(node, int) and 0 <= node < len(self)
+
+    def __getitem__(self, node: Node) -> dict[str, Any]:
+        return self.apta.node_data(node)
+
+    def __call__(self, data: bool = False):
+        if not data:
+            return self
+        return ((n, self[n]) for n in self)
 
-def transition(tree: nx.DiGraph, node: Node, char: Any) -> Node:
-    for node in tree.neighbors(node):
-        if tree.nodes[node]['source'] == char:
-            return node
 
+class LabelConflict(ValueError):
+    """A word was labeled both accepting and rejecting."""
 
-@attr.s(auto_detect=True, auto_attribs=True, frozen=True)
+
+def _labeled(accepting: Iterable[Word],
+             rejecting: Iterable[Word]) -> Iterable[tuple[bool, Word]]:
+    return chain(((True, w) for w in accepting),
+                 ((False, w) for w in rejecting))
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class APTAUpdate:
+    """Nodes affected by APTA.add_examples."""
+    added: range                # Newly created nodes.
+    relabeled: frozenset[Node]  # Pre-existing nodes that got a label.
+
+    def merge(self, other: APTAUpdate) -> APTAUpdate:
+        """Combine with an update applied after this one."""
+        added = range(self.added.start, other.added.stop)
+        relabeled = (self.relabeled | other.relabeled) - set(added)
+        return APTAUpdate(added, relabeled)
+
+
+@attr.s(auto_detect=True, auto_attribs=True, frozen=True, eq=False)
 class APTA:
-    """Augmented Prefix Tree Acceptor."""
-    tree: nx.DiGraph
-    alphabet: bidict  # Mapping from token to int.
+    """Augmented Prefix Tree Acceptor.
+
+    The tree is stored as flat arrays indexed by integer node ids. The
+    root is 0 and every node is numbered after its parent.
+    """
+    parents: array         # parents[n] = parent of n (-1 for the root).
+    tokens: array          # tokens[n] = token labeling edge into n.
+    labels: array          # labels[n] in {UNLABELED, REJECTING, ACCEPTING}.
+    children: list[array]  # children[t][n] = child of n via t (or -1).
+    alphabet: bidict       # Mapping from token to int.
+    _cache: dict = attr.ib(factory=dict, init=False, repr=False)
 
     @property
-    def nodes(self) -> Iterable[Node]:
-        return self.tree.nodes
+    def nodes(self) -> NodeView:
+        return NodeView(self)
 
     @property
     def root(self) -> Node:
@@ -38,41 +93,71 @@ class APTA:
 
     @property
     def accepting(self) -> set[Node]:
-        return {n for n, d in self.nodes(data=True) if d.get('label')}
+        return {n for n, lbl in enumerate(self.labels) if lbl == ACCEPTING}
 
     @property
     def rejecting(self) -> set[Node]:
-        nodes = self.nodes(data=True)
-        return {n for n, d in nodes if not d.get('label', True)}
+        return {n for n, lbl in enumerate(self.labels) if lbl == REJECTING}
+
+    @property
+    def tree(self) -> nx.DiGraph:
+        """networkx view of the prefix tree. Built on each access."""
+        tree = nx.DiGraph()
+        tree.add_nodes_from(self.nodes(data=True))
+        tree.add_edges_from((p, n) for n, p in enumerate(self.parents) if n)
+        return tree
+
+    def node_data(self, node: Node) -> dict[str, Any]:
+        data = {}
+        if node != self.root:
+            data['source'] = self.alphabet.inv[self.tokens[node]]
+        if self.labels[node] != UNLABELED:
+            data['label'] = self.labels[node] == ACCEPTING
+        return data
+
+    def word(self, node: Node) -> tuple:
+        """The word accessing node as a tuple of symbols."""
+        symbols, parents, tokens = self.alphabet.inv, self.parents, self.tokens
+        word = []
+        while node > 0:
+            word.append(symbols[tokens[node]])
+            node = parents[node]
+        return tuple(reversed(word))
+
+    def successors(self, node: Node) -> Iterable[Node]:
+        return (c for c in (col[node] for col in self.children) if c >= 0)
+
+    def transition(self, node: Node, char: Any) -> Node:
+        token = self.alphabet.get(char)
+        if token is None or self.children[token][node] < 0:
+            return None
+        return self.children[token][node]
 
     @staticmethod
     def from_examples(
-            accepting: list[Word],
-            rejecting: list[Word],
+            accepting: Iterable[Word],
+            rejecting: Iterable[Word],
             alphabet: frozenset = None) -> APTA:
         """Return Augmented Prefix Tree Automata for accepting, rejecting."""
-        # Create prefix tree.
-        tree, root = nx.prefix_tree(chain(accepting, rejecting)), 0
-        tree.remove_node(-1)  # <-- sink node added by nx.
-
-        def access(word: Word) -> Node:
-            node = root
-            for char in word:  # Walk tree for node accessed by word.
-                node = transition(tree, node, char)
-            return node
-
-        # Augment tree with node labels.
-        for label, words in [(True, accepting), (False, rejecting)]:
-            for word in words:
-                tree.nodes[access(word)]['label'] = label
-
-        # Label nodes with integers. With root = 0.
-        relabels = {n: i + 1 for i, n in enumerate(set(tree.nodes) - {root})}
-        relabels[root] = 0
-        nx.relabel_nodes(tree, relabels, copy=False)
+        return APTA.from_labeled(_labeled(accepting, rejecting), alphabet)
+
+    @staticmethod
+    def from_labeled(
+            examples: Iterable[tuple[bool, Word]],
+            alphabet: frozenset = None) -> APTA:
+        """Return APTA for a stream of (label, word) pairs.
+
+        The stream is consumed once, so memory is proportional to the
+        APTA rather than to the examples.
+        """
+        apta = APTA(
+            parents=array('i', [-1]), tokens=array('i', [-1]),
+            labels=array('b', [UNLABELED]), children=[], alphabet=bidict(),
+        )
+        apta.add_labeled(examples)
 
         # Construct alphabet for DFA.
-        alphabet2 = {d['source'] for n, d in tree.nodes(data=True) if n != 0}
+        alphabet2 = set(apta.alphabet)
         if (alphabet is not None):
             if alphabet2 - alphabet:
                 raise ValueError("Symbols in examples not in alphabet")
@@ -87,54 +172,574 @@ class APTA:
         try:
             alphabet = sorted(alphabet)
         except Exception:
-            pass
-
-        alphabet = bidict(enumerate(alphabet)).inv
-
-        return APTA(tree, alphabet)
-
-    def consistency_graph(self) -> nx.Graph:
-        """Return consistency graph for APTA via repeated DFS."""
-        graph = nx.Graph()
-        graph.add_nodes_from(self.tree.nodes)
-        for pair in combinations(self.tree.nodes, 2):
-            if not self._can_merge(graph, pair):
-                graph.add_edge(*pair)
-        return graph
-
-    def _can_merge(self, graph: nx.Graph, pair: tuple[Node, Node]) -> bool:
-        succ = self.tree.neighbors
-        nodes = self.tree.nodes
-
-        stack, visited = [pair], set()
+            alphabet = list(alphabet)
+
+        return apta._reindex_tokens(bidict(enumerate(alphabet)).inv)
+
+    def _reindex_tokens(self, alphabet: bidict) -> APTA:
+        """Return copy of APTA over alphabet, a superset of self's."""
+        perm = array('i', [-1]) * len(self.alphabet)
+        for char, token in self.alphabet.items():
+            perm[token] = alphabet[char]
+        tokens = array('i', chain([-1], (perm[t] for t in self.tokens[1:])))
+
+        n = len(self.parents)
+        children = [
+            self.children[self.alphabet[c]] if c in self.alphabet else
+            array('i', [-1]) * n for c in alphabet
+        ]
+        return APTA(self.parents, tokens, self.labels, children, alphabet)
+
+    def add_examples(self,
+                     accepting: Iterable[Word],
+                     rejecting: Iterable[Word]) -> APTAUpdate:
+        """Extend the APTA in place with new labeled examples.
+
+        Unseen symbols are appended to the alphabet. If the consistency
+        graph was computed before, it is updated incrementally the next
+        time it is requested.
+        """
+        return self.add_labeled(_labeled(accepting, rejecting))
+
+    def add_labeled(self,
+                    examples: Iterable[tuple[bool, Word]]) -> APTAUpdate:
+        """Extend the APTA in place with a stream of (label, word) pairs.
+
+        Raises LabelConflict on a word with both labels. Examples
+        before the conflicting one remain added.
+        """
+        n_nodes, relabeled = len(self.parents), set()
+        char2token = dict(self.alphabet)  # Faster lookups than bidict.
+        try:
+            for label, word in examples:
+                node = self._insert(word, char2token)
+                label = ACCEPTING if label else REJECTING
+                if self.labels[node] == label:
+                    continue
+                if self.labels[node] != UNLABELED:
+                    raise LabelConflict(word)
+                self.labels[node] = label
+                if node < n_nodes:
+                    relabeled.add(node)
+        finally:
+            update = APTAUpdate(range(n_nodes, len(self.parents)),
+                                frozenset(relabeled))
+            if 'graph' in self._cache:
+                pending = self._cache.get('pending')
+                self._cache['pending'] = update if pending is None else \
+                    pending.merge(update)
+        return update
+
+    def _insert(self, word: Word, char2token: dict[Any, int]) -> Node:
+        """Return node accessed by word, adding missing nodes."""
+        children = self.children
+        parents, tokens, labels = self.parents, self.tokens, self.labels
+        node = 0
+        for char in word:
+            token = char2token.get(char)
+            if token is None:
+                if char is None:
+                    raise ValueError("None not allowed in alphabet.")
+                token = len(children)
+                char2token[char] = self.alphabet[char] = token
+                children.append(array('i', [-1]) * len(parents))
+            child = children[token][node]
+            if child < 0:
+                child = len(parents)
+                children[token][node] = child
+                parents.append(node)
+                tokens.append(token)
+                labels.append(UNLABELED)
+                for col in children:
+                    col.append(-1)
+            node = child
+        return node
+
+    def consistency_graph(self, compact: bool = False,
+                          workers: int = 1) -> Graph:
+        """Return consistency graph for APTA.
+
+        Nodes conflict if their subtrees disagree on the label of a
+        common suffix. This relation is propagated bottom-up as rows of
+        a bit matrix. Only pairs where one node is an ancestor of the
+        other need the DFS of _can_merge to account for loops.
+
+        If compact, the bit matrix is returned as a BitGraph rather
+        than converted to a networkx Graph. workers > 1 propagates
+        disjoint subtrees in a process pool.
+
+        The graph is cached. After add_examples, only the rows of nodes
+        whose subtree changed are recomputed. workers only applies when
+        the graph is first built: cached graphs are returned as they
+        are and updates are computed serially.
+        """
+        graph = self._cache.get('graph')
+        update = self._cache.pop('pending', None)
+        if graph is None:
+            graph = BitGraph(*conflict_matrix(self, workers))
+        elif update is not None:
+            graph = BitGraph(*update_conflict_matrix(self, graph, update))
+        self._cache['graph'] = graph
+        return graph if compact else graph.to_networkx()
+
+    def _ancestor_pairs(self, intervals,
+                        nodes=None) -> list[tuple[Node, Node]]:
+        """(ancestor, descendant) pairs in lexicographic order.
+
+        If nodes is given, only pairs whose ancestor is in nodes.
+        """
+        enter, leave = intervals
+        preorder = array('i', [0]) * len(enter)
+        for node, time in enumerate(enter):
+            preorder[time] = node
+
+        pairs = []
+        for node in sorted(self.nodes if nodes is None else nodes):
+            below = preorder[enter[node] + 1:leave[node]]
+            pairs.extend((node, d) for d in sorted(below))
+        return pairs
+
+    def _preorder_intervals(self) -> tuple[array, array]:
+        """Preorder entry and exit times of each node's subtree."""
+        enter = array('i', [0]) * len(self.parents)
+        leave = array('i', [0]) * len(self.parents)
+        stack, clock = [(0, False)], 0
+        while stack:
+            node, done = stack.pop()
+            if done:
+                leave[node] = clock
+                continue
+            enter[node], clock = clock, clock + 1
+            stack.append((node, True))
+            stack.extend((c, False) for c in self.successors(node))
+        return enter, leave
+
+    def _can_merge(self, is_edge, pair: tuple[Node, Node],
+                   intervals=None, visited: Optional[set] = None) -> bool:
+        """DFS over the node pairs that merging pair forces together.
+
+        If preorder intervals are given, pairs that are neither on the
+        path to pair nor ancestor related are not expanded. Their
+        successors can not loop back onto pair, so is_edge already
+        decides them. If visited is given, the visited pairs (smaller
+        node first) are added to it.
+        """
+        labels, children = self.labels, self.children
+        first, second = pair
+
+        enter, leave = intervals if intervals is not None else ((), ())
+        at_second = enter[second] if intervals is not None else 0
+
+        stack, visited = [pair], set() if visited is None else visited
         while stack:  # DFS for inconsistency in states.
             left, right = stack.pop()
 
-            if (left, right) in visited:
+            key = (left, right) if left < right else (right, left)
+            if key in visited:
                 continue
-            visited.add((left, right))
+            visited.add(key)
 
-            if (left, right) in graph.edges:
+            if is_edge(left, right):
                 return False  # Reached known distinguished nodes.
 
-            left_lbl = nodes[left].get('label')
-            right_lbl = nodes[right].get('label')
-            if None not in {left_lbl, right_lbl} and left_lbl != right_lbl:
+            left_lbl, right_lbl = labels[left], labels[right]
+            if UNLABELED not in {left_lbl, right_lbl} and \
+                    left_lbl != right_lbl:
                 return False  # Discovered distiguishing path.
 
-            # Group neighbors by access token.
-            succ_left = {nodes[n]['source']: n for n in succ(left)}
-            succ_right = {nodes[n]['source']: n for n in succ(right)}
-            merged = list(fn.merge_with(set, succ_left, succ_right).values())
-
-            # Interchange pair[0] and pair[1] is applicable.
-            for p1, p2 in [pair, pair[::-1]]:
-                merged.extend([(p | {p1}) - {p2} for p in merged if p2 in p])
+            if intervals is not None:  # Skip pairs unrelated to pair.
+                at_left, at_right = enter[left], enter[right]
+                end_left, end_right = leave[left], leave[right]
+                if not (at_left <= at_second < end_left
+                        or at_right <= at_second < end_right
+                        or at_left <= at_right < end_left
+                        or at_right <= at_left < end_right):
+                    continue
 
             # Add un-reconciled successors to stack.
-            stack.extend([p for p in merged if len(p) == 2])
+            for col in children:
+                succ_left, succ_right = col[left], col[right]
+                if succ_left < 0 or succ_right < 0:
+                    continue
+                stack.append((succ_left, succ_right))
+
+                # Interchange pair[0] and pair[1] is applicable.
+                for x, y in [(succ_left, succ_right), (succ_right, succ_left)]:
+                    if x == second and y != first:
+                        stack.append((first, y))
+                    if x == first and y != second:
+                        stack.append((second, y))
 
         return True
 
 
-__all__ = ['APTA', 'Node', 'Word']
+def _bit(matrix: np.ndarray, left: Node, right: Node) -> bool:
+    return bool((matrix[left, right >> 3] >> (right & 7)) & 1)
+
+
+def _set_bit(matrix: np.ndarray, left: Node, right: Node) -> None:
+    matrix[left, right >> 3] |= 1 << (right & 7)
+
+
+def _unpack(row: np.ndarray, count: int) -> np.ndarray:
+    return np.unpackbits(row, count=count, bitorder='little').view(bool)
+
+
+@attr.s(auto_attribs=True, frozen=True, eq=False)
+class EdgeView:
+    """Edges (u, v) with u < v of a BitGraph."""
+    graph: BitGraph
+
+    def __iter__(self) -> Iterable[tuple[Node, Node]]:
+        for node in self.graph.nodes:
+            for nbr in self.graph.neighbors(node):
+                if nbr > node:
+                    yield node, nbr
+
+    def __len__(self) -> int:
+        return self.graph.number_of_edges()
+
+    def __contains__(self, edge: tuple[Node, Node]) -> bool:
+        return self.graph.has_edge(*edge)
+
+
+@attr.s(auto_attribs=True, frozen=True, eq=False)
+class BitGraph:
+    """Undirected graph stored as a packed symmetric bit matrix.
+
+    Bit v (little endian) of row u is set iff u and v are adjacent.
+    For consistency graphs, loops lists the ancestor pairs conflicting
+    only because merging them loops back onto the pair.
+    """
+    matrix: np.ndarray
+    loops: list[tuple[Node, Node]] = ()
+
+    @property
+    def nodes(self) -> range:
+        return range(len(self.matrix))
+
+    @property
+    def edges(self) -> EdgeView:
+        return EdgeView(self)
+
+    def has_edge(self, left: Node, right: Node) -> bool:
+        return _bit(self.matrix, left, right)
+
+    def neighbors(self, node: Node) -> list[Node]:
+        row = _unpack(self.matrix[node], len(self.matrix))
+        return np.flatnonzero(row).tolist()
+
+    def degree(self, node: Node) -> int:
+        return int(np.unpackbits(self.matrix[node]).sum())
+
+    def number_of_edges(self) -> int:
+        return int(np.unpackbits(self.matrix).sum()) // 2
+
+    def edge_array(self) -> np.ndarray:
+        """(n_edges, 2) array of edges (u, v) with u < v."""
+        n, blocks = len(self.matrix), [np.empty((0, 2), dtype=np.int64)]
+        for node, row in enumerate(self.matrix):
+            nbrs = np.flatnonzero(_unpack(row, n)[node + 1:]) + node + 1
+            blocks.append(np.column_stack([np.full_like(nbrs, node), nbrs]))
+        return np.concatenate(blocks)
+
+    def bitsets(self) -> list[int]:
+        """Adjacency of each node as a Python int with bit v for node v."""
+        return [int.from_bytes(row.tobytes(), 'little') for row in self.matrix]
+
+    def to_networkx(self) -> nx.Graph:
+        graph = nx.Graph()
+        graph.add_nodes_from(self.nodes)
+        graph.add_edges_from(self.edges)
+        return graph
+
+
+Graph = Union[nx.Graph, BitGraph]
+
+
+# Steps (see clique) max_clique takes by default. This is about a
+# second both on dense random graphs of a few hundred nodes and on a
+# 15k node consistency graph, but varies with the machine and graph.
+# A step limit, unlike a time limit, gives the same clique, and so the
+# same encoding, on every machine. find_dfas adds its timeout, if any.
+CLIQUE_STEPS = 1_000_000
+
+
+def max_clique(graph: Graph, time_budget: Optional[float] = None,
+               max_steps: Optional[int] = CLIQUE_STEPS) -> set[Node]:
+    """Large clique of graph. It is maximum if branch and bound finishes
+    within max_steps steps and time_budget seconds (None for no limit).
+
+    Every clique of the consistency graph needs a distinct DFA state,
+    so its size lower bounds the size of consistent DFAs.
+    """
+    if isinstance(graph, BitGraph):
+        adjacency = graph.bitsets()
+        result = search_clique(adjacency, time_budget, max_steps=max_steps)
+        return set(result.nodes)
+
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    adjacency = [
+        sum(1 << index[nbr] for nbr in graph.neighbors(node) if nbr != node)
+        for node in nodes
+    ]
+    result = search_clique(adjacency, time_budget, max_steps=max_steps)
+    return {nodes[i] for i in result.nodes}
+
+
+def _row_builder(labels: array, children: list[array]):
+    """Return function computing a node's packed conflict row.
+
+    The row of a node is its label conflicts OR-ed with the rows of its
+    children, pulled back along the edges with the same token.
+    """
+    n = len(labels)
+    labels = np.frombuffer(labels, dtype=np.int8)
+    label_rows = {
+        ACCEPTING: labels == REJECTING,
+        REJECTING: labels == ACCEPTING,
+        UNLABELED: np.zeros(n, dtype=bool),
+    }
+
+    # For each token, the nodes with a child via token and that child.
+    columns = [np.frombuffer(col, dtype=np.intc) for col in children]
+    sources = [np.flatnonzero(col >= 0) for col in columns]
+    targets = [col[src] for col, src in zip(columns, sources)]
+
+    def build(node: Node, rows) -> np.ndarray:
+        row = label_rows[labels[node]].copy()
+        for col, src, tgt in zip(columns, sources, targets):
+            child = col[node]
+            if child < 0:
+                continue
+            row[src] |= _unpack(rows[child], n)[tgt]
+        return np.packbits(row, bitorder='little')
+
+    return build
+
+
+_WORKER_STATE = {}  # Per process state of conflict_matrix's workers.
+
+
+def _init_worker(labels: array, children: list[array]) -> None:
+    _WORKER_STATE['children'] = children
+    _WORKER_STATE['build'] = _row_builder(labels, children)
+
+
+def _subtree_rows(roots: list[Node]) -> tuple[np.ndarray, np.ndarray]:
+    """Rows of all nodes in the subtrees of roots (run in a worker)."""
+    children, build = _WORKER_STATE['children'], _WORKER_STATE['build']
+    nodes, stack = [], list(roots)
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(c for c in (col[node] for col in children) if c >= 0)
+    nodes.sort(reverse=True)
+
+    rows = {}
+    for node in nodes:
+        rows[node] = build(node, rows)
+    return np.array(nodes, dtype=np.int64), np.stack([rows[n] for n in nodes])
+
+
+def _init_loop_worker(apta: APTA, matrix: np.ndarray, intervals) -> None:
+    _WORKER_STATE.update(apta=apta, matrix=matrix, intervals=intervals)
+
+
+def _check_pairs(pairs: Loops) -> list[tuple[tuple[Node, Node], Any]]:
+    """_can_merge pairs against the matrix alone (run in a worker).
+
+    Returns (pair, None) for rejected pairs and (pair, keys) for
+    accepted ones, where keys are the ancestor pairs their DFS visited.
+    Pairs with an edge in the matrix are left out.
+    """
+    apta, matrix = _WORKER_STATE['apta'], _WORKER_STATE['matrix']
+    intervals = _WORKER_STATE['intervals']
+    enter, leave = intervals
+
+    def is_edge(left: Node, right: Node) -> bool:
+        return _bit(matrix, left, right)
+
+    results = []
+    for pair in pairs:
+        if _bit(matrix, *pair):
+            continue
+        visited = set()
+        if not apta._can_merge(is_edge, pair, intervals, visited):
+            results.append((pair, None))
+            continue
+        keys = [(u, v) for u, v in visited
+                if enter[u] < enter[v] < leave[u] and (u, v) != pair]
+        results.append((pair, keys))
+    return results
+
+
+def _shards(apta: APTA, n_shards: int) -> tuple[list[list[Node]], list[Node]]:
+    """Split the tree into disjoint subtrees of at most n / n_shards
+    nodes, bin packed into n_shards groups of subtree roots. Also return
+    the remaining nodes above those subtrees."""
+    sizes = array('i', [1]) * len(apta.parents)
+    for node in reversed(range(1, len(apta.parents))):
+        sizes[apta.parents[node]] += sizes[node]
+
+    target = max(1, len(apta.parents) // n_shards)
+    roots, top, stack = [], [], [apta.root]
+    while stack:
+        node = stack.pop()
+        if sizes[node] <= target:
+            roots.append(node)
+        else:
+            top.append(node)
+            stack.extend(apta.successors(node))
+
+    groups, loads = [[] for _ in range(n_shards)], [0] * n_shards
+    for root in sorted(roots, key=lambda r: -sizes[r]):  # Largest first.
+        idx = loads.index(min(loads))
+        groups[idx].append(root)
+        loads[idx] += sizes[root]
+    return [g for g in groups if g], top
+
+
+Loops = list[tuple[Node, Node]]
+
+
+def conflict_matrix(apta: APTA, workers: int = 1) -> tuple[np.ndarray, Loops]:
+    """Packed symmetric bit matrix of the APTA's consistency graph.
+
+    Row n is the little endian np.packbits of the boolean vector of
+    nodes conflicting with n. If workers > 1, disjoint subtrees are
+    propagated in a process pool and the rows above them afterwards,
+    and the ancestor pairs are checked for loops in the pool as well.
+
+    Also returns the ancestor pairs that only conflict because merging
+    them loops back onto the pair.
+    """
+    n = len(apta.nodes)
+    build = _row_builder(apta.labels, apta.children)
+
+    # 1. Children are numbered after parents, so a reverse sweep sees
+    #    the rows of a node's children before the node itself.
+    matrix = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+    remaining = range(n)
+    if workers > 1:
+        shards, remaining = _shards(apta, 4 * workers)
+        init_args = (apta.labels, apta.children)
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=init_args) as pool:
+            for nodes, rows in pool.map(_subtree_rows, shards):
+                matrix[nodes] = rows
+
+    for node in sorted(remaining, reverse=True):
+        matrix[node] = build(node, matrix)
+
+    # 2. Merging a node with its descendant may loop back on itself.
+    intervals = apta._preorder_intervals()
+    loops = _loop_pairs(apta, matrix, intervals,
+                        apta._ancestor_pairs(intervals), workers=workers)
+    return matrix, loops
+
+
+def _loop_pairs(apta: APTA, matrix: np.ndarray, intervals,
+                candidates: Loops, known: Loops = (),
+                workers: int = 1) -> Loops:
+    """Candidate ancestor pairs that _can_merge rejects although matrix
+    has no edge for them. Pairs are visited in lexicographic order and
+    only loops found before a pair count as edges for its DFS. known
+    loops are taken as is. Sets the bits of all loops in matrix.
+
+    If workers > 1, the DFS of each pair runs in a process pool against
+    the matrix alone. Loops only add edges, so a pair rejected there is
+    a loop, and an accepted pair is one iff its DFS visited an earlier
+    loop, which is resolved here in order.
+    """
+    loops, known = set(), set(known)
+
+    def is_edge(left: Node, right: Node) -> bool:
+        key = (left, right) if left < right else (right, left)
+        return _bit(matrix, left, right) or key in loops
+
+    pairs = sorted(chain(candidates, known))
+    checks = None
+    if workers > 1:
+        todo = [p for p in pairs if p not in known]
+        chunks = [todo[i::4 * workers] for i in range(4 * workers)]
+        lean = APTA(apta.parents, apta.tokens, apta.labels, apta.children,
+                    apta.alphabet)  # Without the cache.
+        with ProcessPoolExecutor(
+                workers, initializer=_init_loop_worker,
+                initargs=(lean, matrix, intervals)) as pool:
+            checks = dict(chain.from_iterable(pool.map(_check_pairs,
+                                                       chunks)))
+
+    for pair in pairs:
+        if pair in known:
+            loops.add(pair)
+        elif checks is not None:
+            keys = checks.get(pair, ())  # Pairs with an edge are left out.
+            if keys is None or not loops.isdisjoint(keys):
+                loops.add(pair)
+        elif not _bit(matrix, *pair) and \
+                not apta._can_merge(is_edge, pair, intervals):
+            loops.add(pair)
+
+    for pair in loops:
+        _set_bit(matrix, *pair)
+        _set_bit(matrix, *pair[::-1])
+    return sorted(loops)
+
+
+def update_conflict_matrix(apta: APTA, graph: BitGraph,
+                           update: APTAUpdate) -> tuple[np.ndarray, Loops]:
+    """Return conflict_matrix(apta) given the graph before update.
+
+    Only pairs involving a node whose subtree changed are recomputed.
+    """
+    n, n_old = len(apta.nodes), len(graph.matrix)
+
+    # Nodes whose subtree changed: new, relabeled and their ancestors.
+    dirty = set(update.added)
+    for node in update.relabeled | {apta.parents[n] for n in update.added}:
+        while node >= 0 and node not in dirty:
+            dirty.add(node)
+            node = apta.parents[node]
+    dirty = sorted(dirty, reverse=True)
+
+    # Start from the old label propagation with dirty entries cleared.
+    matrix = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+    matrix[:n_old, :graph.matrix.shape[1]] = graph.matrix
+    for pair in graph.loops:
+        matrix[pair[0], pair[1] >> 3] &= ~np.uint8(1 << (pair[1] & 7))
+        matrix[pair[1], pair[0] >> 3] &= ~np.uint8(1 << (pair[0] & 7))
+    clean = np.ones(n, dtype=bool)
+    clean[dirty] = False
+    matrix &= np.packbits(clean, bitorder='little')
+    matrix[dirty] = 0
+
+    # 1. Iterate the propagation on dirty rows, mirroring them into the
+    #    dirty columns, until the least fixed point is reached.
+    build, changed = _row_builder(apta.labels, apta.children), True
+    while changed:
+        changed = False
+        for node in dirty:
+            row = build(node, matrix) | matrix[node]
+            if (row == matrix[node]).all():
+                continue
+            changed = True
+            matrix[node] = row
+            nbrs = np.flatnonzero(_unpack(row, n))
+            matrix[nbrs, node >> 3] |= np.uint8(1 << (node & 7))
+
+    # 2. Loops below a clean node are unaffected by the update.
+    intervals = apta._preorder_intervals()
+    dirty = set(dirty)
+    known = [p for p in graph.loops if p[0] not in dirty]
+    candidates = apta._ancestor_pairs(intervals, dirty)
+    loops = _loop_pairs(apta, matrix, intervals, candidates, known)
+    return matrix, loops
+
+
+__all__ = [
+    'APTA', 'APTAUpdate', 'BitGraph', 'Graph', 'LabelConflict', 'Node',
+    'CLIQUE_STEPS', 'Word', 'max_clique',
+]
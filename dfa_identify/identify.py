@@ -1,34 +1,85 @@
 from __future__ import annotations
 
-from itertools import groupby
-from typing import Optional, Iterable
+from time import perf_counter
+from typing import Literal, Optional, Iterable
 
+import attr
+import numpy as np
 from dfa import dict2dfa, DFA
 from pysat.solvers import Glucose4
 
-from pysat.card import CardEnc
+from pysat.card import ITotalizer
+from pysat.examples.rc2 import RC2
+from pysat.formula import WCNF
 from more_itertools import roundrobin
 
-from dfa_identify.graphs import Word, APTA
-from dfa_identify.encoding import dfa_id_encodings, Codec, SymMode
-from dfa_identify.encoding import Bounds, ExtraClauseGenerator
+from dfa_identify.amo import AMOMode
+from dfa_identify.budget import (
+    AnytimeResult, Budget, BudgetExhausted, solve as solve_within,
+)
+from dfa_identify.cache import PreprocessCache
+from dfa_identify.cnf import CNF
+from dfa_identify.graphs import Word, APTA, LabelConflict
+from dfa_identify.encoding import dfa_id_encodings, Backend, Codec, SymMode
+from dfa_identify.encoding import DecodedModel
+from dfa_identify.encoding import dfa_id_incremental_encoding
+from dfa_identify.encoding import candidate_sizes, preprocess
 from dfa_identify.encoding import (
-    ColorAcceptingVar,
-    ColorNodeVar,
-    ParentRelationVar
+    Bounds, ExtraClauseGenerator, no_extra_clauses
 )
+from dfa_identify.merging import edsm
+from dfa_identify.parallel import search_size
+from dfa_identify.simplify import Simplified, simplify as simplify_cnf
+from dfa_identify.encoding import ParentRelationVar
+
+
+StutterEngine = Literal['totalizer', 'rc2']
+STUTTER_ENGINES = ('totalizer', 'rc2')
+RC2_ORACLE = 'g4'  # pysat name of the SAT solver RC2 runs on.
+# APTA nodes up to which find_dfas runs state merging by default. EDSM
+# scores every red-blue pair, which takes about a second at 1.7k nodes
+# and ten at 3.4k nodes on hard (randomly labeled) examples.
+EDSM_MAX_NODES = 2000
+
+@attr.s(auto_attribs=True)
+class EnumerationStats:
+    """Progress of find_dfas, updated as DFAs are yielded."""
+    models: int = 0         # Models found by the solver.
+    duplicates: int = 0     # Models dropped as isomorphic repeats.
+    dfas: int = 0           # DFAs yielded.
+    seconds: float = 0.0    # Spent enumerating, excluding the caller.
+
+    @property
+    def dfas_per_second(self) -> float:
+        return self.dfas / self.seconds if self.seconds else 0.0
 
 
 def find_dfas(
-        accepting: list[Word],
-        rejecting: list[Word],
+        accepting: Iterable[Word],
+        rejecting: Iterable[Word],
         solver_fact=Glucose4,
         sym_mode: SymMode = "bfs",
-        extra_clauses: ExtraClauseGenerator = lambda *_: (),
+        extra_clauses: ExtraClauseGenerator = no_extra_clauses,
         bounds: Bounds = (None, None),
         order_by_stutter: bool = False,
         alphabet: frozenset = None,
         allow_unminimized: bool = False,
+        apta: Optional[APTA] = None,
+        cache: Optional[PreprocessCache] = None,
+        backend: Backend = 'python',
+        incremental: bool = False,
+        workers: int = 1,
+        amo: AMOMode = 'pairwise',
+        simplify: bool = False,
+        max_clauses: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        unique: bool = False,
+        stats: Optional[EnumerationStats] = None,
+        stutter_engine: StutterEngine = 'totalizer',
+        timeout: Optional[float] = None,
+        conflict_budget: Optional[int] = None,
+        edsm_bound: Optional[bool] = None,
+        validate: bool = True,
 ) -> Iterable[DFA]:
     """Finds all minimal dfa that are consistent with the labeled examples.
 
@@ -44,6 +95,9 @@ def find_dfas(
                 - (2, None): DFA must have at least 2 states.
                 - (2, 10):  DFA must have between 2 and 10 states.
                 - (None, None): No constraints (default).
+                Without an upper bound, extra_clauses or allow_unminimized,
+                the size of the DFA found by state merging (merging.edsm)
+                is used as upper bound, see edsm_bound.
       - sym_mode: Which symmetry breaking strategy to employ.
       - extra_clauses: Optional user defined additional clauses to add
           for a given codec (encoding of size k DFA).
@@ -51,17 +105,63 @@ def find_dfas(
       - alphabet: Optionally specify the alphabet the DFA should be over.
       - allow_unminimized: Continue after all minimized (equiv
           states merges) have been enumerated.
+      - apta: Optional APTA, e.g., from ingest.apta_from_file, that
+          accepting and rejecting are added to (in place) instead of
+          building a new one. Reusing an APTA across calls lets its
+          consistency graph be updated incrementally.
+      - cache: Optional PreprocessCache holding consistency graphs and
+          cliques of previously seen example sets.
+      - backend: Clause generation backend, 'python' or 'numpy'.
+      - simplify: Preprocess each size's clauses (see simplify.simplify)
+          before handing them to the solver. Not supported with
+          incremental.
+      - max_clauses, max_memory: Raise estimate.EncodingTooLarge up
+          front, before any encoding, if a size in bounds (see
+          dfa_id_encodings) has an encoding estimated to have more
+          clauses or need more bytes (see estimate).
+      - unique: Drop DFAs isomorphic to one already yielded. Models are
+          always blocked on the DFA defining variables only, so they
+          differ in accepting colors, start color or transitions, but
+          may still be isomorphic, e.g., up to renaming colors.
+      - stats: Optional EnumerationStats to record progress in, e.g.,
+          distinct DFAs per second.
+      - stutter_engine: How order_by_stutter minimizes the non stutter
+          transitions: 'totalizer', bounds on a cardinality constraint
+          in the size's solver (see order_models_by_stutter), or
+          'rc2', the core-guided MaxSAT solver RC2 (see
+          maxsat_models_by_stutter), which ignores solver_fact.
+      - timeout: Seconds the search may take, from the first DFA
+          requested. This is wall clock time and includes
+          preprocessing and the time the caller spends between DFAs.
+      - conflict_budget: Conflicts each SAT query may take.
+          When either budget runs out, budget.BudgetExhausted is
+          raised. Its result (budget.AnytimeResult) holds the smallest
+          size not proven UNSAT, the best DFA found so far (the
+          smallest DFA yielded or, failing that, the one from state
+          merging) and the size being attempted. Budgets need a
+          solver_fact with pysat's solve_limited and are not
+          supported with stutter_engine='rc2'.
+      - edsm_bound: Whether to run state merging for an upper bound (see
+          bounds). None, the default, runs it only for APTAs with at
+          most EDSM_MAX_NODES nodes, as it gets slow on large ones.
+      - validate: Range check the encoders' arguments while encoding
+          (see encoding.Codec.validate). False skips these checks.
 
     Returns:
       An iterable of all minimal DFA consistent with accepting and rejecting.
     """
-    # Convert to hashable words.
-    accepting = list(map(tuple, accepting))
-    rejecting = list(map(tuple, rejecting))
-
-    if set(accepting) & set(rejecting):
+    # Stream examples into the APTA, detecting conflicts on insertion.
+    try:
+        if apta is None:
+            apta = APTA.from_examples(
+                accepting=accepting, rejecting=rejecting, alphabet=alphabet
+            )
+        else:
+            apta.add_examples(accepting=accepting, rejecting=rejecting)
+    except LabelConflict:
         return
-    elif len(accepting) == len(rejecting) == 0:
+
+    if len(apta.accepting) == len(apta.rejecting) == 0:
         if not alphabet:
             raise ValueError('Need examples or an alphabet!')
 
@@ -70,50 +170,273 @@ def find_dfas(
             'solver_fact': solver_fact, 'sym_mode': sym_mode,
             'extra_clauses': extra_clauses, 'bounds': bounds,
             'order_by_stutter': order_by_stutter, 'alphabet': alphabet,
-            'allow_unminimized': allow_unminimized,
+            'allow_unminimized': allow_unminimized, 'cache': cache,
+            'backend': backend, 'incremental': incremental,
+            'workers': workers, 'amo': amo, 'simplify': simplify,
+            'max_clauses': max_clauses, 'max_memory': max_memory,
+            'unique': unique, 'stats': stats,
+            'stutter_engine': stutter_engine, 'timeout': timeout,
+            'conflict_budget': conflict_budget, 'edsm_bound': edsm_bound,
+            'validate': validate,
         }
         dfas_pos = find_dfas(accepting=[()], rejecting=[  ], **kwargs)
         dfas_neg = find_dfas(accepting=[  ], rejecting=[()], **kwargs)
         yield from roundrobin(dfas_pos, dfas_neg)
-        return 
-
-    apta = APTA.from_examples(
-        accepting=accepting, rejecting=rejecting, alphabet=alphabet
-    )
-    encodings = dfa_id_encodings(
-        apta=apta, sym_mode=sym_mode,
-        extra_clauses=extra_clauses, bounds=bounds)
+        return
 
-    for codec, clauses in encodings:
-        with solver_fact(bootstrap_with=clauses) as solver:
-            if not solver.solve():
+    budget = Budget.create(timeout, conflict_budget)
+    anytime = AnytimeResult()
+    if budget is not None and order_by_stutter and stutter_engine == 'rc2':
+        raise ValueError('Budgets are not supported with rc2.')
+
+    low, high = bounds
+    if edsm_bound is None:
+        edsm_bound = len(apta.nodes) <= EDSM_MAX_NODES
+    if edsm_bound and high is None and not allow_unminimized and \
+            extra_clauses is no_extra_clauses:
+        # State merging finds a consistent DFA, bounding the minimal size.
+        anytime.dfa = edsm(apta)
+        size = len(anytime.dfa.states())
+        if low is None or low <= size:
+            bounds = (low, size)
+
+    if budget is not None:
+        # Preprocess within the budget: the clique search stops at the
+        # deadline, the other stages are checked against it after.
+        try:
+            budget.check()
+            if cache is None:  # Keep the consistency graph for below.
+                cache = PreprocessCache(max_entries=1)
+            preprocess(apta, workers, cache, budget.remaining())
+            budget.check()
+        except BudgetExhausted as exhausted:
+            exhausted.result.dfa = anytime.dfa
+            raise
+
+    if incremental and extra_clauses is not no_extra_clauses:
+        raise ValueError('extra_clauses are not supported incrementally.')
+    if incremental and simplify:
+        raise ValueError('simplify is not supported incrementally.')
+    if stutter_engine not in STUTTER_ENGINES:
+        raise ValueError(f'Unknown stutter engine {stutter_engine!r}.')
+
+    phases = []
+    if workers > 1 and extra_clauses is no_extra_clauses:
+        # extra_clauses could make satisfiability non-monotone in size.
+        if cache is None:  # Keep the consistency graph for below.
+            cache = PreprocessCache(max_entries=1)
+        _, clique = preprocess(apta, workers, cache)
+        if len(candidate_sizes(apta, bounds, clique)) > 1:
+            try:
+                found = search_size(apta, workers, solver_fact, sym_mode,
+                                    bounds, cache, backend, amo,
+                                    max_clauses, max_memory, budget,
+                                    validate)
+            except BudgetExhausted as exhausted:
+                exhausted.result.dfa = anytime.dfa
+                raise
+            if found is None:
+                return
+            size, phases = found
+            bounds = (size, bounds[1])
+
+    queries = _size_queries(
+        apta, solver_fact, sym_mode, extra_clauses, bounds, cache, backend,
+        incremental, workers, phases, amo, simplify, max_clauses,
+        max_memory, validate)
+    if stats is None:
+        stats = EnumerationStats()
+    seen = set() if unique else None
+
+    def emit(codec, models):
+        start = perf_counter()
+        for model, decoded in models:
+            stats.models += 1
+            if seen is not None:
+                key = canonical_key(decoded)
+                if key in seen:
+                    stats.duplicates += 1
+                    continue
+                seen.add(key)
+            dfa = _dfa_from_decoded(codec, apta, decoded)
+            stats.dfas += 1
+            stats.seconds += perf_counter() - start
+            yield dfa
+            start = perf_counter()
+        stats.seconds += perf_counter() - start
+
+    yielded = False
+
+    def track(dfas):
+        nonlocal yielded
+        for dfa in dfas:
+            if not yielded:  # The first DFA is a smallest one.
+                anytime.dfa, yielded = dfa, True
+            yield dfa
+
+    try:
+        for codec, clauses, solver, assumptions, simplified in queries:
+            size = codec.n_colors - sum(lit < 0 for lit in assumptions)
+            anytime.size = size
+            if anytime.lower_bound is None:
+                anytime.lower_bound = size
+            if not solve_within(solver, assumptions, budget):
+                anytime.lower_bound = size + 1
                 continue
             if not order_by_stutter:
-                models = solver.enum_models()
-                yield from (extract_dfa(codec, apta, m) for m in models)
+                yield from track(emit(codec, projected_models(
+                    solver, codec, assumptions, simplified, budget)))
                 if allow_unminimized:
                     continue
                 return
 
-            model = solver.get_model()  # Save for analysis below.
+            # Search for maximally stuttering DFAs.
+            if stutter_engine == 'rc2':
+                models = maxsat_models_by_stutter(codec, clauses,
+                                                  assumptions)
+            else:
+                models = order_models_by_stutter(
+                    solver, codec, assumptions, simplified, budget)
+            yield from track(emit(
+                codec, ((m, codec.decode_model(m)) for m in models)))
+            if allow_unminimized:
+                continue
+            return
+    except BudgetExhausted as exhausted:
+        exhausted.result.lower_bound = anytime.lower_bound
+        exhausted.result.dfa = anytime.dfa
+        exhausted.result.size = anytime.size
+        raise
+
+
+def projected_models(solver, codec: Codec, assumptions: list[int] = (),
+                     simplified: Optional[Simplified] = None,
+                     budget: Optional[Budget] = None):
+    """(model, decoded) for the models of solver, blocking each on the
+    variables that define its DFA: z, the root's x and the true y.
+    Models only differing in other variables, e.g., symmetry breaking
+    or AMO auxiliaries, are skipped.
+
+    If simplified, solver is on its clauses and models are expanded
+    to (and blocking clauses compressed from) the original variables.
+    Each query is limited by budget, if given.
+
+    Blocking clauses are guarded by the activation literals among
+    assumptions (see Codec.assumptions), so on an incremental solver
+    they do not cut off models of other sizes.
+    """
+    guard = [-lit for lit in assumptions if codec.incremental and
+             codec.offsets[6] < abs(lit) <= codec.offsets[7]]
+    while solve_within(solver, assumptions, budget):
+        model = solver.get_model()
+        if simplified is not None:
+            model = simplified.expand(model)
+        decoded = codec.decode_model(model)
+        yield model, decoded
+        blocking = blocking_clause(codec, decoded) + guard
+        if simplified is not None:
+            blocking = simplified.compress(blocking)
+        solver.add_clause(blocking)
+
+
+def blocking_clause(codec: Codec, decoded: DecodedModel) -> list[int]:
+    """Clause excluding the DFA of decoded (see projected_models)."""
+    k = codec.n_colors
+    z = codec.offsets[0] + np.arange(1, k + 1)
+    z *= np.where(decoded.accepting, -1, 1)
+    root = codec.offsets[1] + 1 + decoded.start
+    parents, tokens = np.nonzero(decoded.transitions >= 0)
+    targets = decoded.transitions[parents, tokens]
+    y = codec.offsets[2] + 1 + parents + k * targets + k * k * tokens
+    return [*z.tolist(), -root, *(-y).tolist()]
+
+
+def canonical_key(decoded: DecodedModel) -> tuple:
+    """Hashable form of decoded's DFA, restricted to the colors reachable
+    from the start, that is equal for isomorphic DFAs: colors are
+    renumbered in breadth first order, following tokens in order."""
+    accepting = decoded.accepting.tolist()
+    transitions = decoded.transitions.tolist()
+    order, queue = {decoded.start: 0}, [decoded.start]
+    for color in queue:
+        for target in transitions[color]:
+            if target >= 0 and target not in order:
+                order[target] = len(order)
+                queue.append(target)
+    return tuple(
+        (accepting[color], tuple(order.get(t, -1) for t in transitions[color]))
+        for color in queue)
+
+
+def _size_queries(apta, solver_fact, sym_mode, extra_clauses, bounds, cache,
+                  backend, incremental, workers, phases, amo, simplify,
+                  max_clauses, max_memory, validate):
+    """(codec, clauses, solver, assumptions, simplified) for increasing
+    DFA sizes.
+
+    Either a fresh solver per size or, if incremental, a single solver
+    with per size assumptions. phases, a model of the smallest size's
+    (non-incremental) encoding, steers the first solver towards it.
+    If simplify, the solver gets the clauses of simplified (see
+    simplify.Simplified), else simplified is None.
+    """
+    if not incremental:
+        encodings = dfa_id_encodings(
+            apta=apta, sym_mode=sym_mode,
+            extra_clauses=extra_clauses, bounds=bounds, cache=cache,
+            backend=backend, workers=workers, amo=amo,
+            max_clauses=max_clauses, max_memory=max_memory,
+            validate=validate)
+        for codec, clauses in encodings:
+            formula, simplified = clauses, None
+            if simplify:
+                simplified = simplify_cnf(clauses)
+                formula = simplified.clauses
+                phases = simplified.compress(phases)
+            with solver_fact(bootstrap_with=formula) as solver:
+                if phases:
+                    try:
+                        solver.set_phases(phases)
+                    except NotImplementedError:
+                        pass
+                    phases = []
+                yield codec, clauses, solver, [], simplified
+        return
 
-        # Search for maximally stuttering DFAs.
-        models = order_models_by_stutter(solver_fact, codec, clauses, model)
-        yield from (extract_dfa(codec, apta, m) for m in models)
-        if allow_unminimized:
-            continue
+    codec, clauses, sizes = dfa_id_incremental_encoding(
+        apta=apta, sym_mode=sym_mode, bounds=bounds, cache=cache,
+        backend=backend, workers=workers, amo=amo,
+        max_clauses=max_clauses, max_memory=max_memory, validate=validate)
+    if not sizes:
         return
+    with solver_fact(bootstrap_with=clauses) as solver:
+        for n_colors in sizes:
+            yield codec, clauses, solver, codec.assumptions(n_colors), None
 
 
 def find_dfa(
-        accepting: list[Word],
-        rejecting: list[Word],
+        accepting: Iterable[Word],
+        rejecting: Iterable[Word],
         solver_fact=Glucose4,
         sym_mode: SymMode = "bfs",
-        extra_clauses: ExtraClauseGenerator = lambda *_: (),
+        extra_clauses: ExtraClauseGenerator = no_extra_clauses,
         bounds: Bounds = (None, None),
         order_by_stutter: bool = False,
         alphabet: frozenset = None,
+        apta: Optional[APTA] = None,
+        cache: Optional[PreprocessCache] = None,
+        backend: Backend = 'python',
+        incremental: bool = False,
+        workers: int = 1,
+        amo: AMOMode = 'pairwise',
+        simplify: bool = False,
+        max_clauses: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        stutter_engine: StutterEngine = 'totalizer',
+        timeout: Optional[float] = None,
+        conflict_budget: Optional[int] = None,
+        edsm_bound: Optional[bool] = None,
+        validate: bool = True,
 ) -> Optional[DFA]:
     """Finds a minimal dfa that is consistent with the labeled examples.
 
@@ -131,6 +454,18 @@ def find_dfa(
           for a given codec (encoding of size k DFA).
       - order_by_stutter: Order DFA by number of self loop transitions.
       - alphabet: Optionally specify the alphabet the DFA should be over.
+      - apta: Optional APTA to add the examples to. See find_dfas.
+      - cache: Optional PreprocessCache. See find_dfas.
+      - backend: Clause generation backend. See find_dfas.
+      - incremental: Reuse one solver across sizes. See find_dfas.
+      - workers: Processes for a parallel size search. See find_dfas.
+      - amo: At-most-one encoding. See find_dfas.
+      - simplify: Preprocess the clauses. See find_dfas.
+      - max_clauses, max_memory: Encoding size limits. See find_dfas.
+      - stutter_engine: Optimizer for order_by_stutter. See find_dfas.
+      - timeout, conflict_budget: Search budgets. See find_dfas.
+      - edsm_bound: State merging upper bound. See find_dfas.
+      - validate: Encoder range checks. See find_dfas.
 
     Returns:
       Either a DFA consistent with accepting and rejecting or None
@@ -138,47 +473,33 @@ def find_dfa(
     """
     all_dfas = find_dfas(
         accepting, rejecting, solver_fact, sym_mode, extra_clauses, bounds,
-        order_by_stutter, alphabet
+        order_by_stutter, alphabet, apta=apta, cache=cache,
+        backend=backend, incremental=incremental, workers=workers,
+        amo=amo, simplify=simplify, max_clauses=max_clauses,
+        max_memory=max_memory, stutter_engine=stutter_engine,
+        timeout=timeout, conflict_budget=conflict_budget,
+        edsm_bound=edsm_bound, validate=validate,
     )
     return next(all_dfas, None)
 
 
 def extract_dfa(codec: Codec, apta: APTA, model: list[int]) -> DFA:
-    # Fill in don't cares in model.
-    decoded = map(codec.decode, model)
-    decoded = list(decoded)
-    var_groups = groupby(decoded, type)
-
-    group1 = next(var_groups)
-    assert group1[0] == ColorAcceptingVar
-    accepting = {v.color for v in group1[1] if v.true}
-
-    group2 = next(var_groups)
-    assert group2[0] == ColorNodeVar
+    return _dfa_from_decoded(codec, apta, codec.decode_model(model))
 
-    node2color = {}
-    for var in group2[1]:
-        if not var.true:
-            continue
-        assert var.node not in node2color
-        node2color[var.node] = var.color
 
-        #if var.color in accepting:
-        #    assert apta.tree.nodes[var.node].get('label', True)
+def _dfa_from_decoded(codec: Codec, apta: APTA,
+                      decoded: DecodedModel) -> DFA:
+    token2char = apta.alphabet.inv
+    chars = [token2char[token] for token in range(codec.n_tokens)]
+    accepting = decoded.accepting.tolist()
 
-    group3 = next(var_groups)
-    assert group3[0] == ParentRelationVar
+    # Colors with outgoing transitions, i.e., all but inactive ones.
     dfa_dict = {}
-    token2char = apta.alphabet.inv
-    for var in group3[1]:
-        if not var.true:
-            continue
-        default = (var.parent_color in accepting, {})
-        (_, char2node) = dfa_dict.setdefault(var.parent_color, default)
-        char = token2char[var.token]
-        assert char not in char2node
-        char2node[char] = var.node_color
-    dfa_ = dict2dfa(dfa_dict, start=node2color[0])
+    for color, targets in enumerate(decoded.transitions.tolist()):
+        char2node = {c: t for c, t in zip(chars, targets) if t >= 0}
+        if char2node:
+            dfa_dict[color] = (accepting[color], char2node)
+    dfa_ = dict2dfa(dfa_dict, start=decoded.start)
 
     return DFA(
         start=dfa_.start,
@@ -189,60 +510,140 @@ def extract_dfa(codec: Codec, apta: APTA, model: list[int]) -> DFA:
     )
 
 
-__all__ = ['DFA', 'find_dfas', 'find_dfa', 'extract_dfa']
-
+__all__ = ['DFA', 'EnumerationStats', 'find_dfas', 'find_dfa',
+           'extract_dfa']
 
-def order_models_by_stutter(
-        solver_fact,
-        codec: Codec,
-        clauses: list[list[int]],
-        model: list[int],
-) -> Iterable[DFA]:
-    top_id = codec.offsets[-1]
 
-    # Compute parent relation variables that don't stutter.
+def _non_stutter_lits(codec: Codec, assumptions: list[int]) -> list[int]:
+    """Parent relation variables of transitions that are not self loops,
+    among the colors left active by assumptions."""
+    # Colors deactivated by the assumptions of an incremental codec.
+    n_colors = codec.n_colors - sum(lit < 0 for lit in assumptions)
     lits = []
     for lit in range(1 + codec.offsets[2], codec.offsets[3] + 1):
         par_rel = codec.decode(lit)
         assert isinstance(par_rel, ParentRelationVar)
         if par_rel.node_color == par_rel.parent_color:
             continue
+        if max(par_rel.node_color, par_rel.parent_color) >= n_colors:
+            continue
         lits.append(lit)
+    return lits
 
-    # Binary search for min non-stutter using cardinality constraints.
-
-    def non_stutter_count(model) -> int:
-        return sum(model[x - 1] > 0 for x in lits)
 
-    def find_models(bound: int, make_formula):
-        formula = make_formula(lits=lits, bound=bound, top_id=top_id)
+def order_models_by_stutter(
+        solver,
+        codec: Codec,
+        assumptions: list[int] = (),
+        simplified: Optional[Simplified] = None,
+        budget: Optional[Budget] = None,
+) -> Iterable[list[int]]:
+    """Models of solver by increasing number of non stutter (not self
+    loop) transitions, starting from the fewest, see projected_models.
+    solver is the size's solver and has just found a model under
+    assumptions; simplified is as in projected_models.
+
+    An incremental totalizer over the non stutter transitions is added
+    to solver under a fresh activation literal, and its bounds are
+    imposed through assumptions, so what the solver learns carries over
+    between bounds. Once all models are emitted, the totalizer is
+    switched off for good, e.g., for the next size of an incremental
+    solver. Each query is limited by budget, if given.
+    """
+    n_colors = codec.n_colors - sum(lit < 0 for lit in assumptions)
+    assumptions = list(assumptions)
+    lits = _non_stutter_lits(codec, assumptions)
+    fixed = 0  # Non stutter transitions that simplify fixed to true.
+    if simplified is not None:
+        fixed = int(np.sum(simplified.assignment[lits] > 0))
+        lits = simplified.compress(lits)
+    if not lits:  # E.g., a single state only has stutter transitions.
+        models = projected_models(solver, codec, assumptions, simplified,
+                                  budget)
+        yield from (model for model, _ in models)
+        return
 
-        with solver_fact(bootstrap_with=clauses) as solver:
-            solver.append_formula(formula, no_return=True)
-            if not solver.solve():
-                return
-            yield from solver.enum_models()
-
-    candidate_bound = non_stutter_count(model)  # Candidate upper bound.
-    hi = candidate_bound     # Also upper bounds lower bound.
-    lo = codec.n_colors - 1  # Each node needs to be visited.
-    while lo < hi:
-        mid = (lo + hi) // 2
-        models = find_models(mid, CardEnc.atmost)
-        witness = next(models, None)
-        if witness is not None:
-            hi = non_stutter_count(witness)
-            assert hi <= mid
-        else:
-            lo = mid + 1
-
-    # Incrementally emit models with less stutter.
-    naive_bound = len(lits)
-    for bound in range(lo, naive_bound + 1):
-        if bound > candidate_bound:
-            witness = next(find_models(bound, CardEnc.atmost), None)
-            if witness is None:
-                break
-            candidate_bound = non_stutter_count(witness)
-
-        yield from find_models(bound, CardEnc.equals)
+    def non_stutter_count(model) -> int:
+        return fixed + sum(model[x - 1] > 0 for x in lits)
+
+    candidate_bound = non_stutter_count(solver.get_model())
+    top_id = solver.nof_vars()
+    if simplified is None:
+        top_id = max(top_id, codec.offsets[-1])
+    active = top_id + 1  # Activation literal of the totalizer.
+    totalizer = ITotalizer(lits=lits, ubound=max(candidate_bound - fixed, 1),
+                           top_id=active)
+
+    def add_totalizer(clauses) -> None:
+        solver.append_formula([clause + [-active] for clause in clauses])
+
+    with totalizer:
+        add_totalizer(totalizer.cnf.clauses)
+
+        def at_most(bound: int) -> list[int]:
+            """Assumptions for at most bound non stutter transitions."""
+            bound -= fixed
+            if bound >= len(lits):
+                return assumptions
+            if bound > totalizer.ubound:
+                totalizer.increase(ubound=bound)
+                if totalizer.nof_new:
+                    add_totalizer(totalizer.cnf.clauses[-totalizer.nof_new:])
+            return assumptions + [active, -totalizer.rhs[bound]]
+
+        # Binary search for min non-stutter.
+        hi = candidate_bound            # Also upper bounds lower bound.
+        lo = max(n_colors - 1, fixed)   # Each node needs to be visited.
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if solve_within(solver, at_most(mid), budget):
+                hi = non_stutter_count(solver.get_model())
+                assert hi <= mid
+            else:
+                lo = mid + 1
+
+        # Incrementally emit models with less stutter. Models emitted
+        # for smaller bounds are blocked, leaving those at the bound.
+        for bound in range(lo, fixed + len(lits) + 1):
+            models = projected_models(solver, codec, at_most(bound),
+                                      simplified, budget)
+            yield from (model for model, _ in models)
+            if not solve_within(solver, assumptions, budget):
+                break  # Every model has been emitted.
+    solver.add_clause([-active])
+
+
+def maxsat_models_by_stutter(
+        codec: Codec,
+        clauses: CNF,
+        assumptions: list[int] = (),
+) -> Iterable[list[int]]:
+    """Models of clauses by increasing number of non stutter transitions,
+    as order_models_by_stutter, but found by the core-guided MaxSAT
+    solver RC2: clauses (and assumptions, as units) are hard and each
+    non stutter transition is a soft unit clause against it.
+
+    Each optimum is blocked on its DFA (see projected_models) before
+    computing the next, so the costs never decrease.
+    """
+    assumptions = list(assumptions)
+    n_vars = max(codec.offsets[-1], clauses.max_var())
+    formula = WCNF()
+    formula.extend(clauses)
+    formula.extend([lit] for lit in assumptions)
+    for lit in _non_stutter_lits(codec, assumptions):
+        formula.append([-lit], weight=1)
+    formula.nv = max(formula.nv, n_vars)
+
+    with RC2(formula, solver=RC2_ORACLE) as rc2:
+        optimum = rc2.compute()
+        while optimum is not None:
+            # RC2 leaves out variables not occurring in the formula.
+            model = -np.arange(1, n_vars + 1)
+            optimum = np.asarray(optimum, dtype=np.int64)
+            optimum = optimum[np.abs(optimum) <= n_vars]
+            model[np.abs(optimum) - 1] = optimum
+            model = model.tolist()
+            yield model
+            rc2.add_clause(blocking_clause(codec, codec.decode_model(model)))
+            optimum = rc2.compute()
@@ -0,0 +1,95 @@
+"""Streaming readers for labeled examples stored in files.
+
+Two formats are supported:
+
+  - jsonl: One JSON object per line, e.g., {"label": true, "word": ["a"]}.
+           "trace" is accepted in place of "word".
+  - csv: One row per example, the label followed by the word's symbols.
+
+Labels are 1/0, true/false, accept/reject or +/- (any case), as JSON
+booleans, numbers or strings. Other labels are rejected.
+
+Examples are read lazily so that APTAs can be built from corpora that do
+not fit in memory.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from os import PathLike
+from pathlib import Path
+from typing import Iterable, Literal, Optional, TextIO, Union
+
+from dfa_identify.graphs import APTA, Word
+
+
+Format = Literal['jsonl', 'csv']
+LabeledWord = tuple[bool, Word]
+
+SUFFIXES = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv'}
+LABELS = {
+    '1': True, 'true': True, 'accept': True, 'accepting': True, '+': True,
+    '0': False, 'false': False, 'reject': False, 'rejecting': False,
+    '-': False,
+}
+
+
+def _parse_label(value) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    return LABELS.get(str(value).strip().lower())
+
+
+def read_examples(
+        path: Union[str, PathLike],
+        fmt: Optional[Format] = None) -> Iterable[LabeledWord]:
+    """Lazily yield (label, word) pairs stored in path.
+
+    If fmt is not given, it is inferred from the file suffix.
+    """
+    path = Path(path)
+    if fmt is None:
+        fmt = SUFFIXES.get(path.suffix.lower())
+    if fmt not in ('jsonl', 'csv'):
+        raise ValueError(f"Unknown example format for {path}.")
+
+    with path.open(newline='') as lines:
+        read = _read_jsonl if fmt == 'jsonl' else _read_csv
+        yield from read(lines)
+
+
+def _read_jsonl(lines: TextIO) -> Iterable[LabeledWord]:
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        example = json.loads(line)
+        word = example.get('word', example.get('trace'))
+        if word is None or 'label' not in example:
+            raise ValueError(f"Line {lineno}: expected label and word.")
+        label = _parse_label(example['label'])
+        if label is None:
+            raise ValueError(
+                f"Line {lineno}: unknown label {example['label']!r}.")
+        yield label, word
+
+
+def _read_csv(lines: TextIO) -> Iterable[LabeledWord]:
+    for lineno, row in enumerate(csv.reader(lines), 1):
+        if not row:
+            continue
+        label, *word = row
+        label = _parse_label(label)
+        if label is None:
+            raise ValueError(f"Line {lineno}: unknown label {row[0]!r}.")
+        yield label, word
+
+
+def apta_from_file(
+        path: Union[str, PathLike],
+        fmt: Optional[Format] = None,
+        alphabet: frozenset = None) -> APTA:
+    """Build an APTA from the examples in path in a single pass."""
+    return APTA.from_labeled(read_examples(path, fmt), alphabet)
+
+
+__all__ = ['read_examples', 'apta_from_file']
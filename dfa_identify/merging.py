@@ -0,0 +1,160 @@
+"""Evidence driven state merging (EDSM) with the red-blue framework.
+
+See Lang, Pearlmutter and Price, "Results of the Abbadingo One DFA
+Learning Competition and a New Evidence-Driven State Merging Algorithm".
+
+Red states form the hypothesis, blue states are the tree nodes directly
+reachable from it. Each step merges the blue/red pair whose folding
+agrees on the most labels, or promotes a blue state that can not be
+merged into any red one. The result is consistent with the examples,
+but not necessarily minimal, which makes its size an upper bound for
+the exact search.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Optional
+
+import attr
+from dfa import DFA, dict2dfa
+
+from dfa_identify.graphs import (
+    ACCEPTING, APTA, UNLABELED, LabelConflict, Node, Word
+)
+
+
+@attr.s(auto_attribs=True, eq=False)
+class _Hypothesis:
+    """Mutable copy of an APTA's transitions and labels with undo."""
+    children: list[array]
+    labels: array
+    log: list = attr.ib(factory=list)
+
+    @staticmethod
+    def from_apta(apta: APTA) -> _Hypothesis:
+        return _Hypothesis([array('i', c) for c in apta.children],
+                           array('b', apta.labels))
+
+    def set_child(self, node: Node, token: int, child: Node) -> None:
+        col = self.children[token]
+        self.log.append((col, node, col[node]))
+        col[node] = child
+
+    def set_label(self, node: Node, label: int) -> None:
+        self.log.append((self.labels, node, self.labels[node]))
+        self.labels[node] = label
+
+    def undo(self) -> None:
+        while self.log:
+            seq, node, old = self.log.pop()
+            seq[node] = old
+
+    def merge(self, parent: Node, token: int, red: Node, blue: Node) -> int:
+        """Redirect parent's token transition from blue to red and fold
+        blue's subtree into red. Return the number of agreeing labels,
+        or -1 if labels conflict (leaving the merge half done)."""
+        self.set_child(parent, token, red)
+        score, stack = 0, [(red, blue)]
+        while stack:
+            node, other = stack.pop()
+            label = self.labels[other]
+            if label != UNLABELED:
+                if self.labels[node] == UNLABELED:
+                    self.set_label(node, label)
+                elif self.labels[node] != label:
+                    return -1
+                else:
+                    score += 1
+            for token, col in enumerate(self.children):
+                child = col[other]
+                if child < 0:
+                    continue
+                if col[node] < 0:
+                    self.set_child(node, token, child)
+                else:
+                    stack.append((col[node], child))
+        return score
+
+
+def edsm(apta: APTA) -> DFA:
+    """Return a DFA consistent with apta's examples via red-blue EDSM.
+
+    Missing transitions become self loops and unlabeled states reject.
+    """
+    hyp = _Hypothesis.from_apta(apta)
+    red = [apta.root]
+
+    def blues() -> Iterable[tuple[Node, int, Node]]:
+        """(blue, token, parent) triples in order of blue."""
+        reds = set(red)
+        edges = ((col[r], t, r) for r in red
+                 for t, col in enumerate(hyp.children))
+        return sorted((b, t, r) for b, t, r in edges
+                      if b >= 0 and b not in reds)
+
+    while True:
+        frontier = blues()
+        if not frontier:
+            break
+        best = None  # (score, blue, red, parent, token)
+        for blue, token, parent in frontier:
+            candidates = []
+            for state in red:
+                score = hyp.merge(parent, token, state, blue)
+                hyp.undo()
+                if score >= 0:
+                    candidates.append((score, -state))
+            if not candidates:
+                red.append(blue)  # Promote, as no merge is possible.
+                break
+            score, state = max(candidates)
+            if best is None or score > best[0]:
+                best = (score, blue, -state, parent, token)
+        else:
+            _, blue, state, parent, token = best
+            hyp.merge(parent, token, state, blue)
+            hyp.log.clear()
+
+    return _to_dfa(hyp, red, apta)
+
+
+def _to_dfa(hyp: _Hypothesis, red: list[Node], apta: APTA) -> DFA:
+    dfa_dict = {}
+    for state in red:
+        transitions = {}
+        for char, token in apta.alphabet.items():
+            child = hyp.children[token][state]
+            transitions[char] = state if child < 0 else child
+        dfa_dict[state] = (hyp.labels[state] == ACCEPTING, transitions)
+    dfa_ = dict2dfa(dfa_dict, start=apta.root)
+    return DFA(
+        start=dfa_.start,
+        inputs=dfa_.inputs,
+        outputs=dfa_.outputs,
+        label=dfa_._label,
+        transition=dfa_._transition,
+    )
+
+
+def learn_dfa(
+        accepting: Iterable[Word],
+        rejecting: Iterable[Word],
+        alphabet: frozenset = None,
+        apta: Optional[APTA] = None,
+) -> Optional[DFA]:
+    """Fast heuristic alternative to find_dfa.
+
+    Returns a DFA consistent with the labeled examples that is not
+    guaranteed to be minimal, or None if a word is labeled both ways.
+    """
+    try:
+        if apta is None:
+            apta = APTA.from_examples(accepting, rejecting, alphabet)
+        else:
+            apta.add_examples(accepting, rejecting)
+    except LabelConflict:
+        return None
+    return edsm(apta)
+
+
+__all__ = ['edsm', 'learn_dfa']
@@ -0,0 +1,168 @@
+"""Speculative search for the minimal DFA size over worker processes.
+
+Satisfiability is monotone in the size: a consistent DFA with k states
+can be padded to one with k + 1 states. So each answer settles more
+than one size. UNSAT at k rules out all sizes <= k, and SAT at k rules
+out all sizes > k as candidates for the minimum. Workers solve one
+size each. Sizes are picked by galloping up from the smallest open size
+until some size is SAT, and by splitting the largest open gap after
+that. A worker whose size has been settled by another answer is
+terminated.
+
+With a budget, each worker's query is limited by it and the search
+stops at the first query that runs out, or at the deadline.
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+from multiprocessing.connection import Connection, wait
+from typing import Optional
+
+from pysat.solvers import Glucose4
+
+from dfa_identify.amo import AMOMode
+from dfa_identify.budget import (
+    AnytimeResult, Budget, BudgetExhausted, solve as solve_within,
+)
+from dfa_identify.cache import PreprocessCache
+from dfa_identify.encoding import (
+    Backend, Bounds, Codec, EncodingContext, SymMode, candidate_sizes,
+    encode_dfa_id_cnf, preprocess,
+)
+from dfa_identify.estimate import check_limits, estimate_encoding
+from dfa_identify.graphs import APTA, Graph, Node
+
+
+Model = list[int]
+
+
+def _solve_size(conn: Connection, apta: APTA, cgraph: Graph,
+                clique: list[Node], n_colors: int, sym_mode: SymMode,
+                solver_fact, backend: Backend, amo: AMOMode,
+                budget: Optional[Budget] = None,
+                validate: bool = True) -> None:
+    """Send a model of the size n_colors encoding, None if UNSAT or,
+    if budget runs out, the reason (in a worker)."""
+    codec = Codec.from_apta(apta, n_colors, sym_mode=sym_mode, amo=amo,
+                            validate=validate)
+    clauses = encode_dfa_id_cnf(apta, codec, cgraph, clique, backend)
+    with solver_fact(bootstrap_with=clauses) as solver:
+        try:
+            sat = solve_within(solver, budget=budget)
+            conn.send(solver.get_model() if sat else None)
+        except BudgetExhausted as exhausted:
+            conn.send(exhausted.result.reason)
+    conn.close()
+
+
+def _next_size(low: int, high: int, sat: Optional[int],
+               running) -> Optional[int]:
+    """Open size to start next. low is the smallest size not known to
+    be UNSAT and sat the smallest known SAT size, if any."""
+    top = high if sat is None else sat - 1
+    if low > top:
+        return None
+    if low not in running:
+        return low
+    if sat is None:  # Gallop: low, low + 1, low + 3, low + 7, ...
+        size = min(top, 2 * max(running) - low + 1)
+        if size not in running:
+            return size
+    # Split the largest gap between settled or running sizes.
+    points = [low - 1] + sorted(s for s in running if s <= top) + [top + 1]
+    gap, left = max((b - a, a) for a, b in zip(points, points[1:]))
+    if gap <= 1:
+        return None
+    return left + gap // 2
+
+
+def search_size(
+        apta: APTA,
+        workers: int,
+        solver_fact=Glucose4,
+        sym_mode: SymMode = None,
+        bounds: Bounds = (None, None),
+        cache: Optional[PreprocessCache] = None,
+        backend: Backend = 'python',
+        amo: AMOMode = 'pairwise',
+        max_clauses: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        budget: Optional[Budget] = None,
+        validate: bool = True,
+) -> Optional[tuple[int, Model]]:
+    """Smallest size in bounds with a DFA consistent with apta, and a
+    model of its encoding (see encoding.dfa_id_encodings), or None.
+
+    Runs up to workers solvers at once. Returns as soon as the size is
+    proven SAT and the size below it UNSAT (or below bounds). All sizes
+    are checked against max_clauses and max_memory (see estimate) up
+    front, before any worker is started. If budget runs out,
+    BudgetExhausted is raised with the smallest open size as lower
+    bound and the smallest size being solved.
+    """
+    cgraph, clique = preprocess(apta, workers, cache)
+    sizes = candidate_sizes(apta, bounds, clique)
+    if max_clauses is not None or max_memory is not None:
+        encoding_ctx = EncodingContext.from_apta(apta, cgraph)
+        for size in sizes:
+            codec = Codec.from_apta(apta, size, sym_mode, amo=amo)
+            estimate = estimate_encoding(codec, encoding_ctx, len(clique))
+            check_limits(estimate, max_clauses, max_memory)
+    low, high = sizes.start, sizes.stop - 1
+    sat, model = None, None
+    running = {}  # size -> (process, connection)
+
+    def stop(size: int) -> None:
+        process, conn = running.pop(size)
+        process.terminate()
+        process.join()
+        conn.close()
+
+    ctx = mp.get_context()
+    try:
+        while low < (high + 1 if sat is None else sat):
+            while len(running) < workers:
+                size = _next_size(low, high, sat, running)
+                if size is None:
+                    break
+                reader, writer = ctx.Pipe(duplex=False)
+                args = (writer, apta, cgraph, clique, size, sym_mode,
+                        solver_fact, backend, amo, budget, validate)
+                process = ctx.Process(target=_solve_size, args=args,
+                                      daemon=True)
+                process.start()
+                writer.close()
+                running[size] = (process, reader)
+
+            remaining = None if budget is None else budget.remaining()
+            ready = wait([conn for _, conn in running.values()],
+                         None if remaining is None else max(remaining, 0))
+            if not ready:
+                raise BudgetExhausted(AnytimeResult(
+                    low, size=min(running), reason='timeout'))
+            for size in [s for s, (_, c) in running.items() if c in ready]:
+                try:
+                    result = running[size][1].recv()
+                except EOFError:
+                    raise RuntimeError(f'Solver for size {size} died.')
+                stop(size)
+                if isinstance(result, str):  # Out of budget.
+                    raise BudgetExhausted(AnytimeResult(
+                        low, size=size, reason=result))
+                if result is None:
+                    low = max(low, size + 1)
+                elif sat is None or size < sat:
+                    sat, model = size, result
+
+            # Cancel workers whose sizes were settled.
+            for size in list(running):
+                if size < low or (sat is not None and size >= sat):
+                    stop(size)
+    finally:
+        for size in list(running):
+            stop(size)
+
+    return None if sat is None else (sat, model)
+
+
+__all__ = ['search_size']
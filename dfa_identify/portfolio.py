@@ -0,0 +1,246 @@
+"""Solver portfolio: several SAT solvers racing on the same formula.
+
+Solve times on the harder DFA sizes vary a lot between solvers and
+even between runs of one solver with different initial phases. A
+Portfolio runs each member, a pysat solver name and optionally a seed
+for random initial phases, in its own process. Each query goes to all
+of them, the first answer is returned and the other members are
+killed.
+
+Portfolio follows the pysat solver interface used by find_dfas, so
+it can be passed as solver_fact:
+
+    solver_fact = Portfolio.factory(Member('g4'), Member('lgl'))
+    dfa = find_dfa(accepting, rejecting, solver_fact=solver_fact)
+
+Once a member finds a model, later queries, e.g., enumerating models
+with blocking clauses, go to that member only, so it keeps what it
+learned (unless stick=False). Killed members are restarted from the
+full formula when they are next needed. Wins are counted in an
+optional PortfolioStats, e.g., to pick members for similar instances.
+
+The members are daemon processes, so a Portfolio can not be used
+inside the size search workers of find_dfas(workers > 1).
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import random
+from collections import Counter
+from functools import partial
+from multiprocessing.connection import Connection, wait
+from time import perf_counter
+from typing import Iterable, Optional, Sequence
+
+import attr
+from pysat.solvers import Solver, SolverNames
+
+from dfa_identify.cnf import CNF, Clause
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Member:
+    solver: str                 # pysat solver name, e.g., 'g4' or 'lgl'.
+    seed: Optional[int] = None  # Seed of random initial phases, if any.
+
+    def __str__(self) -> str:
+        return self.solver if self.seed is None else \
+            f'{self.solver}/{self.seed}'
+
+
+SOLVER_NAMES = frozenset(
+    name for names in vars(SolverNames).values()
+    if isinstance(names, tuple) for name in names)
+
+# Glucose 4, CaDiCaL, MapleChrono and Lingeling, under the first of
+# their names that the installed python-sat knows (CaDiCaL 1.5.3 is
+# 'cd15' in newer releases, older ones only have 'cd').
+DEFAULT_MEMBERS = tuple(
+    Member(next(name for name in names if name in SOLVER_NAMES))
+    for names in [('g4',), ('cd15', 'cd'), ('mcb',), ('lgl',)]
+    if SOLVER_NAMES.intersection(names))
+
+
+@attr.s(auto_attribs=True)
+class PortfolioStats:
+    """Outcome of the races of one or more Portfolios."""
+    races: int = 0
+    wins: Counter = attr.ib(factory=Counter)  # Member -> races won.
+    seconds: float = 0.0                      # Spent racing.
+
+
+def _run_member(conn: Connection, member: Member, clauses: CNF,
+                phases: list[int]) -> None:
+    """Answer the queries sent over conn (in a member process)."""
+    with Solver(name=member.solver, bootstrap_with=clauses) as solver:
+        if not phases and member.seed is not None:
+            rng = random.Random(member.seed)
+            phases = [var if rng.random() < 0.5 else -var
+                      for var in range(1, clauses.max_var() + 1)]
+        if phases:
+            try:
+                solver.set_phases(phases)
+            except NotImplementedError:
+                pass
+        while True:
+            try:
+                command, arg = conn.recv()
+            except EOFError:
+                break
+            if command == 'add':
+                solver.append_formula(arg)
+            elif command == 'phases':
+                try:
+                    solver.set_phases(arg)
+                except NotImplementedError:
+                    pass
+            elif command == 'solve':
+                sat = solver.solve(assumptions=arg)
+                conn.send((sat, solver.get_model() if sat else None))
+    conn.close()
+
+
+class Portfolio:
+    """pysat style solver racing members (see module docstring)."""
+
+    def __init__(self, bootstrap_with: Iterable[Clause] = None,
+                 members: Sequence[Member] = DEFAULT_MEMBERS,
+                 stick: bool = True,
+                 stats: Optional[PortfolioStats] = None):
+        if not members:
+            raise ValueError('A portfolio needs at least one member.')
+        for member in members:
+            if member.solver.lower() not in SOLVER_NAMES:
+                raise ValueError(f'Unknown pysat solver {member.solver!r}.')
+        self.members, self.stick = list(members), stick
+        self.stats = stats
+        self.clauses = CNF()
+        self.n_vars = 0
+        self.phases: list[int] = []
+        self.status: Optional[bool] = None
+        self.model: list[int] = []
+        self.winner: Optional[Member] = None  # Of the last query.
+        self.leader: Optional[Member] = None  # Member that found a model.
+        # member -> (process, connection, clauses sent).
+        self.running: dict[Member, tuple[mp.Process, Connection, int]] = {}
+        if bootstrap_with is not None:
+            self.append_formula(bootstrap_with)
+
+    @classmethod
+    def factory(cls, *members: Member, **kwargs):
+        """solver_fact racing members (default: DEFAULT_MEMBERS)."""
+        return partial(cls, members=members or DEFAULT_MEMBERS, **kwargs)
+
+    def __enter__(self) -> Portfolio:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.delete()
+
+    def delete(self) -> None:
+        for member in list(self.running):
+            self._stop(member)
+
+    def nof_vars(self) -> int:
+        return self.n_vars
+
+    def nof_clauses(self) -> int:
+        return len(self.clauses)
+
+    def add_clause(self, clause: Clause, no_return: bool = True) -> None:
+        self.clauses.append(clause)
+        self.n_vars = max(self.n_vars, *map(abs, clause), 0)
+
+    def append_formula(self, formula, no_return: bool = True) -> None:
+        formula = getattr(formula, 'clauses', formula)  # pysat formulas.
+        if not isinstance(formula, CNF):
+            formula = CNF.from_clauses(formula)
+        self.clauses.extend(formula)
+        self.n_vars = max(self.n_vars, formula.max_var())
+
+    def set_phases(self, literals: Iterable[int] = ()) -> None:
+        self.phases = list(literals)
+        for member in list(self.running):
+            self._send(member, 'phases', self.phases)
+
+    def _start(self, member: Member) -> None:
+        reader, writer = mp.Pipe()
+        process = mp.Process(
+            target=_run_member, daemon=True,
+            args=(writer, member, self.clauses, self.phases))
+        process.start()
+        writer.close()
+        self.running[member] = (process, reader, len(self.clauses))
+
+    def _stop(self, member: Member) -> None:
+        process, conn, _ = self.running.pop(member)
+        process.terminate()
+        process.join()
+        conn.close()
+
+    def _send(self, member: Member, command: str, arg) -> bool:
+        """Send a command to a running member, stopping it if it died."""
+        try:
+            self.running[member][1].send((command, arg))
+            return True
+        except OSError:
+            self._stop(member)
+            return False
+
+    def solve(self, assumptions: Iterable[int] = ()) -> bool:
+        assumptions = list(assumptions)
+        racers = [self.leader] if self.leader is not None else self.members
+        start = perf_counter()
+        for member in racers:
+            if member not in self.running:
+                self._start(member)
+                continue
+            process, conn, sent = self.running[member]
+            if sent < len(self.clauses):
+                self.running[member] = (process, conn, len(self.clauses))
+                self._send(member, 'add', self.clauses[sent:])
+        waiting = {self.running[member][1]: member for member in racers
+                   if member in self.running and
+                   self._send(member, 'solve', assumptions)}
+
+        answer = None
+        while answer is None:
+            if not waiting:
+                raise RuntimeError('Every portfolio member died.')
+            conn = wait(list(waiting))[0]
+            member = waiting.pop(conn)
+            try:
+                answer = conn.recv()
+            except (EOFError, OSError):
+                self._stop(member)
+        for loser in waiting.values():
+            self._stop(loser)
+
+        sat, model = answer
+        self.status, self.model = sat, model or []
+        self.winner = member
+        if sat and self.stick:
+            self.leader = member
+        if self.stats is not None:
+            self.stats.races += 1
+            self.stats.wins[member] += 1
+            self.stats.seconds += perf_counter() - start
+        return sat
+
+    def get_status(self) -> Optional[bool]:
+        return self.status
+
+    def get_model(self) -> Optional[list[int]]:
+        return self.model if self.status else None
+
+    def enum_models(self, assumptions: Iterable[int] = ()):
+        """Models, each blocked once found (as in pysat)."""
+        assumptions = list(assumptions)
+        while self.solve(assumptions):
+            model = self.model
+            yield model
+            self.add_clause([-lit for lit in model])
+
+
+__all__ = ['DEFAULT_MEMBERS', 'Member', 'Portfolio', 'PortfolioStats',
+           'SOLVER_NAMES']
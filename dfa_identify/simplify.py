@@ -0,0 +1,226 @@
+"""CNF preprocessing before the clauses are handed to a solver.
+
+The encodings contain unit clauses, e.g., from symmetry breaking, that
+fix many variables and satisfy or shorten many other clauses. simplify
+runs, vectorized over the flat CNF arrays:
+
+  1. unit propagation, dropping satisfied clauses and false literals,
+  2. optionally, pure literal elimination,
+  3. removal of duplicate clauses and clauses subsumed by a binary one,
+
+and renumbers the remaining variables densely. The result keeps the
+variable map, so models of the simplified formula can be expanded to
+models of the original one, e.g., for Codec.decode and extract_dfa.
+
+Unit propagation and subsumption preserve the models, up to variables
+that no longer occur, which expand sets to false. Pure literal
+elimination only preserves satisfiability, so enumerating models of a
+formula simplified with it may miss some.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+import attr
+import numpy as np
+
+from dfa_identify.cnf import CNF
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class Shrinkage:
+    """Formula size before and after simplification."""
+    variables: tuple[int, int]
+    clauses: tuple[int, int]
+    literals: tuple[int, int]
+    units: int = 0     # Variables fixed by unit propagation.
+    pure: int = 0      # Variables fixed as pure literals.
+    subsumed: int = 0  # Clauses removed as duplicates or subsumed.
+
+    def __str__(self) -> str:
+        def ratio(pair):
+            before, after = pair
+            return f'{before} -> {after} ({after / max(before, 1):.0%})'
+        return (f'variables {ratio(self.variables)}, '
+                f'clauses {ratio(self.clauses)}, '
+                f'literals {ratio(self.literals)}; '
+                f'{self.units} units, {self.pure} pure, '
+                f'{self.subsumed} subsumed')
+
+
+@attr.s(auto_attribs=True, frozen=True, eq=False)
+class Simplified:
+    clauses: CNF            # Over the variables 1..len(variables).
+    variables: np.ndarray   # variables[i] = original variable of i + 1.
+    assignment: np.ndarray  # Fixed values (1, -1 or 0) by original var.
+    stats: Shrinkage
+    unsat: bool = False
+
+    def expand(self, model: list[int]) -> list[int]:
+        """Model of the original formula from one of clauses. Variables
+        added after clauses, e.g., by a totalizer, are ignored."""
+        values = self.assignment.copy()
+        model = np.asarray(model, dtype=np.int64)
+        model = model[np.abs(model) <= len(self.variables)]
+        values[self.variables[np.abs(model) - 1]] = np.sign(model)
+        values[values == 0] = -1
+        lits = np.arange(len(values)) * values
+        return lits[1:].tolist()
+
+    def compress(self, lits: Iterable[int]) -> list[int]:
+        """Literals of the original formula renamed for clauses, dropping
+        those of variables that were eliminated."""
+        lits = np.fromiter(lits, dtype=np.int64)
+        if not len(self.variables):
+            return []
+        idx = np.searchsorted(self.variables, np.abs(lits))
+        idx = np.minimum(idx, len(self.variables) - 1)
+        kept = self.variables[idx] == np.abs(lits)
+        return (np.sign(lits[kept]) * (idx[kept] + 1)).tolist()
+
+
+def _clause_ids(offsets: np.ndarray) -> np.ndarray:
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def _select(lits: np.ndarray, offsets: np.ndarray, keep_lits: np.ndarray,
+            keep_clauses: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Keep the given literals of the given clauses."""
+    keep_lits = keep_lits & keep_clauses[_clause_ids(offsets)]
+    lengths = np.add.reduceat(keep_lits, offsets[:-1]) \
+        if len(lits) else np.zeros(len(offsets) - 1, dtype=np.int64)
+    lengths = lengths[keep_clauses]
+    return lits[keep_lits], np.concatenate([[0], np.cumsum(lengths)])
+
+
+def _normalize(lits, offsets):
+    """Sort each clause by variable, drop repeated literals and
+    tautologies."""
+    cids = _clause_ids(offsets)
+    order = np.lexsort((lits, np.abs(lits), cids))
+    lits, cids = lits[order], cids[order]
+    same_clause = cids[1:] == cids[:-1]
+    repeated = np.concatenate([[False], same_clause & (lits[1:] == lits[:-1])])
+    clashing = same_clause & (lits[1:] == -lits[:-1])
+    tautology = np.zeros(len(offsets) - 1, dtype=bool)
+    tautology[cids[1:][clashing]] = True
+    return _select(lits, offsets, ~repeated, ~tautology)
+
+
+def _propagate(lits, offsets, values):
+    """Unit propagation, updating values in place. Returns the reduced
+    clauses, the number of fixed variables and whether a conflict was
+    found."""
+    starts, n_units = offsets[:-1], 0
+    while len(starts):
+        lit_values = values[np.abs(lits)] * np.sign(lits)
+        sat = np.maximum.reduceat(lit_values, starts) == 1
+        unknown = np.add.reduceat(lit_values == 0, starts)
+        if ((unknown == 0) & ~sat).any():
+            return lits, offsets, n_units, True
+        units = ~sat & (unknown == 1)
+        if not units.any():
+            break
+        unit_lits = lits[(lit_values == 0) & units[_clause_ids(offsets)]]
+        values[np.abs(unit_lits)] = np.sign(unit_lits)
+        if (values[np.abs(unit_lits)] != np.sign(unit_lits)).any():
+            return lits, offsets, n_units, True  # Complementary units.
+        n_units += len(np.unique(np.abs(unit_lits)))
+    else:
+        return lits, offsets, n_units, False
+    lits, offsets = _select(lits, offsets, lit_values == 0, ~sat)
+    return lits, offsets, n_units, False
+
+
+def _eliminate_pure(lits, offsets, values, protected):
+    n_pure = 0
+    size = len(values)
+    while len(offsets) > 1:
+        pos = np.bincount(lits[lits > 0], minlength=size)
+        neg = np.bincount(-lits[lits < 0], minlength=size)
+        pure = ((pos > 0) != (neg > 0)) & ~protected
+        if not pure.any():
+            break
+        values[pure] = np.where(pos[pure] > 0, 1, -1)
+        n_pure += int(pure.sum())
+        sat = np.maximum.reduceat(pure[np.abs(lits)], offsets[:-1])
+        lits, offsets = _select(lits, offsets, np.ones(len(lits), bool),
+                                ~sat.astype(bool))
+    return lits, offsets, n_pure
+
+
+def _remove_subsumed(lits, offsets, n_vars):
+    """Drop duplicate clauses and clauses containing a binary clause.
+    Clauses must be normalized."""
+    lengths = np.diff(offsets)
+    cids = _clause_ids(offsets)
+    codes = 2 * np.abs(lits) + (lits < 0)  # Same order as normalized.
+    base = 2 * (n_vars + 1)
+    remove = np.zeros(len(lengths), dtype=bool)
+
+    binary = np.flatnonzero(lengths == 2)
+    pairs = codes[offsets[binary][:, None] + np.arange(2)]
+    keys = np.unique(pairs[:, 0] * base + pairs[:, 1])  # Sorted.
+    for length in np.unique(lengths):
+        clauses = np.flatnonzero(lengths == length)
+        rows = codes[offsets[clauses][:, None] + np.arange(length)]
+        _, first = np.unique(rows, axis=0, return_index=True)
+        duplicate = np.ones(len(clauses), dtype=bool)
+        duplicate[first] = False
+        remove[clauses[duplicate]] = True
+        if length <= 2 or not len(keys):
+            continue
+        for i in range(length):
+            for j in range(i + 1, length):
+                pair = rows[:, i] * base + rows[:, j]
+                idx = np.minimum(np.searchsorted(keys, pair), len(keys) - 1)
+                subsumed = keys[idx] == pair
+                remove[clauses[subsumed]] = True
+    keep = ~remove
+    return _select(lits, offsets, keep[cids], keep) + (int(remove.sum()),)
+
+
+def simplify(cnf: CNF, pure_literals: bool = False,
+             protect: Iterable[int] = ()) -> Simplified:
+    """Simplified copy of cnf. Variables in protect, e.g., those used in
+    assumptions or clauses added later, are not eliminated as pure."""
+    lits, offsets = (a.astype(np.int64) for a in cnf.arrays())
+    n_vars = cnf.max_var()
+    before = (n_vars, len(cnf), len(lits))
+    values = np.zeros(n_vars + 1, dtype=np.int64)
+
+    unsat = (np.diff(offsets) == 0).any()
+    n_units = n_pure = n_subsumed = 0
+    if not unsat and len(cnf):
+        lits, offsets = _normalize(lits, offsets)
+        lits, offsets, n_units, unsat = _propagate(lits, offsets, values)
+    if not unsat and pure_literals:
+        protected = np.zeros(n_vars + 1, dtype=bool)
+        protected[np.abs(np.fromiter(protect, dtype=np.int64))] = True
+        protected[values != 0] = True
+        lits, offsets, n_pure = _eliminate_pure(lits, offsets, values,
+                                                protected)
+    if not unsat:
+        lits, offsets, n_subsumed = _remove_subsumed(lits, offsets, n_vars)
+
+    if unsat:  # Stand in contradiction over a single variable.
+        variables = np.array([1], dtype=np.int64)
+        clauses = CNF.from_clauses([[1], [-1]])
+    else:
+        variables = np.unique(np.abs(lits))
+        renamed = np.sign(lits) * (np.searchsorted(variables, np.abs(lits))
+                                   + 1)
+        clauses = CNF()
+        clauses.literals.frombytes(renamed.astype(np.int32).tobytes())
+        clauses.offsets.frombytes(offsets[1:].astype(np.int64).tobytes())
+
+    stats = Shrinkage(
+        variables=(before[0], len(variables)),
+        clauses=(before[1], len(clauses)),
+        literals=(before[2], len(clauses.literals)),
+        units=n_units, pure=n_pure, subsumed=n_subsumed,
+    )
+    return Simplified(clauses, variables, values, stats, bool(unsat))
+
+
+__all__ = ['Shrinkage', 'Simplified', 'simplify']
@@ -0,0 +1,122 @@
+"""NumPy backend for the clause families of encoding.encode_dfa_id.
+
+Each family is computed as an integer array with one clause per row,
+using the variable layout given by Codec.offsets instead of calling
+the Codec's encoder methods per literal. Rows are produced in the same
+order as the corresponding generators in encoding, so both backends
+emit identical clause sequences.
+"""
+from __future__ import annotations
+
+from typing import Iterable, TYPE_CHECKING
+
+import numpy as np
+
+from dfa_identify.amo import amo_block
+
+if TYPE_CHECKING:
+    from dfa_identify.encoding import Codec, EncodingContext
+
+
+Block = np.ndarray  # (n_clauses, clause_width) array of literals.
+
+
+def color_accepting(codec: Codec) -> np.ndarray:
+    """z[c] = codec.color_accepting(c)."""
+    return codec.offsets[0] + 1 + np.arange(codec.n_colors)
+
+
+def color_node(codec: Codec) -> np.ndarray:
+    """x[n, c] = codec.color_node(n, c)."""
+    nodes, colors = np.ogrid[:codec.n_nodes, :codec.n_colors]
+    return codec.offsets[1] + 1 + codec.n_colors * nodes + colors
+
+
+def parent_relation(codec: Codec) -> np.ndarray:
+    """y[t, i, j] = codec.parent_relation(t, i, j)."""
+    a = codec.n_colors
+    tokens, color1, color2 = np.ogrid[:codec.n_tokens, :a, :a]
+    return codec.offsets[2] + 1 + color1 + a * color2 + a * a * tokens
+
+
+def amo_aux(codec: Codec) -> np.ndarray:
+    """aux[g, i] = codec.amo_aux(g, i)."""
+    n_aux = codec.amo_template.n_aux
+    groups, idx = np.ogrid[:codec.n_amo_groups, :n_aux]
+    return codec.offsets[7] + 1 + n_aux * groups + idx
+
+
+def onehot_color_blocks(codec: Codec) -> Iterable[Block]:
+    x = color_node(codec)
+    aux = amo_aux(codec)[:codec.n_nodes]
+    yield x                               # At least one color.
+    yield amo_block(x, aux, codec.amo)    # At most one color.
+
+
+def partition_by_accepting_blocks(codec: Codec,
+                                  ctx: EncodingContext) -> Iterable[Block]:
+    x, z = color_node(codec), color_accepting(codec)
+    blocks = []
+    for nodes, sign in [(ctx.accepting, 1), (ctx.rejecting, -1)]:
+        lits = np.empty((codec.n_colors, len(nodes), 2), dtype=np.int64)
+        lits[..., 0] = -x[nodes].T
+        lits[..., 1] = sign * z[:, None]
+        blocks.append(lits)
+    yield np.concatenate(blocks, axis=1).reshape(-1, 2)
+
+
+def colors_parent_rel_coupling_blocks(codec: Codec,
+                                      ctx: EncodingContext) -> Iterable[Block]:
+    x, y = color_node(codec), parent_relation(codec)
+    parent_color = x[ctx.parents][:, :, None]  # (node, i, j)
+    node_color = x[ctx.nodes][:, None, :]
+    parent_rel = y[ctx.tokens]
+
+    lits = np.empty((len(ctx.nodes), codec.n_colors, codec.n_colors, 2, 3),
+                    dtype=np.int64)
+    lits[..., 0, 0] = lits[..., 1, 0] = -parent_color
+    lits[..., 0, 1], lits[..., 1, 1] = -node_color, node_color
+    lits[..., 0, 2], lits[..., 1, 2] = parent_rel, -parent_rel
+    yield lits.reshape(-1, 3)
+
+
+def color_active(codec: Codec) -> np.ndarray:
+    """a[c] = codec.color_active(c)."""
+    return codec.offsets[6] + 1 + np.arange(codec.n_colors)
+
+
+def onehot_parent_relation_blocks(codec: Codec) -> Iterable[Block]:
+    y = parent_relation(codec)
+    alo = y.reshape(-1, codec.n_colors)  # Targets at least one color.
+    if codec.incremental:  # Unless the parent's color is inactive.
+        inactive = np.tile(-color_active(codec), codec.n_tokens)
+        alo = np.column_stack([alo, inactive])
+    yield alo
+    aux = amo_aux(codec)[codec.n_nodes:]  # Targets at most one color.
+    yield amo_block(y.reshape(-1, codec.n_colors), aux, codec.amo)
+
+
+def determination_conflict_blocks(codec: Codec,
+                                  ctx: EncodingContext) -> Iterable[Block]:
+    x, z = color_node(codec), color_accepting(codec)
+    width = 3 if ctx.labeled else 2
+    lits = np.empty((len(ctx.edges), codec.n_colors, width), dtype=np.int64)
+    lits[..., 0] = -x[ctx.edges[:, 0]]
+    lits[..., 1] = -x[ctx.edges[:, 1]]
+    if ctx.labeled:
+        lits[..., 2] = z
+    yield lits.reshape(-1, width)
+
+
+def encode_dfa_id_blocks(codec: Codec,
+                         ctx: EncodingContext) -> Iterable[Block]:
+    """Blocks of encoding.encode_dfa_id's clauses, without symmetry
+    breaking and activation clauses."""
+    yield from onehot_color_blocks(codec)                      # 1, 5
+    yield from partition_by_accepting_blocks(codec, ctx)       # 2
+    yield from colors_parent_rel_coupling_blocks(codec, ctx)   # 3, 7
+    yield from onehot_parent_relation_blocks(codec)            # 4, 6
+    yield from determination_conflict_blocks(codec, ctx)       # 8
+
+
+__all__ = ['encode_dfa_id_blocks']
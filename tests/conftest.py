@@ -0,0 +1,28 @@
+import random
+
+import pytest
+
+
+def _random_examples(seed, n_states=4, n_words=60, max_len=8,
+                     alphabet='ab'):
+    """Random words, split by the labels of a random DFA."""
+    rng = random.Random(seed)
+    delta = {(s, c): rng.randrange(n_states)
+             for s in range(n_states) for c in alphabet}
+    final = {s for s in range(n_states) if rng.random() < 0.5}
+
+    def label(word):
+        state = 0
+        for char in word:
+            state = delta[state, char]
+        return state in final
+
+    words = sorted({''.join(rng.choices(alphabet, k=rng.randint(0, max_len)))
+                    for _ in range(n_words)})
+    return [w for w in words if label(w)], [w for w in words if not label(w)]
+
+
+@pytest.fixture
+def random_examples():
+    """random_examples(seed, ...) -> (accepting, rejecting) words."""
+    return _random_examples
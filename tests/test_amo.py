@@ -0,0 +1,53 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from dfa_identify.amo import AMO_MODES, amo_block, template
+
+
+def extensions(tmpl, assignment):
+    """Number of auxiliary assignments satisfying tmpl given the lits."""
+    count = 0
+    for aux in product([False, True], repeat=tmpl.n_aux):
+        values = (None,) + tuple(assignment) + aux
+        count += all(any(values[abs(a)] == (a > 0) for a in clause)
+                     for clause in tmpl.pairs)
+    return count
+
+
+@pytest.mark.parametrize('mode', AMO_MODES)
+def test_template(mode):
+    for n in range(8):
+        tmpl = template(n, mode)
+        assert tmpl.clauses.shape == (len(tmpl.pairs), 2)
+        if tmpl.n_aux > 6:
+            continue
+        for assignment in product([False, True], repeat=n):
+            count = extensions(tmpl, assignment)
+            if sum(assignment) == 1:
+                assert count == 1  # Auxiliaries are determined.
+            else:
+                assert (count > 0) == (sum(assignment) == 0)
+
+
+def test_sizes():
+    assert template(10, 'pairwise').n_aux == 0
+    assert len(template(10, 'pairwise').pairs) == 45
+    assert template(10, 'sequential').n_aux == 9
+    assert len(template(10, 'sequential').pairs) == 26
+    pairwise = template(30, 'pairwise')
+    for mode in ['commander', 'product']:
+        assert len(template(30, mode).pairs) < len(pairwise.pairs)
+    with pytest.raises(ValueError):
+        template(3, 'ladder')
+
+
+@pytest.mark.parametrize('mode', AMO_MODES)
+def test_amo_block(mode):
+    tmpl = template(6, mode)
+    lits = np.arange(1, 19).reshape(3, 6)
+    aux = 100 + np.arange(3 * tmpl.n_aux).reshape(3, tmpl.n_aux)
+    expected = [c for g in range(3)
+                for c in tmpl.instantiate(lits[g].tolist(), aux[g].tolist())]
+    assert amo_block(lits, aux, mode).tolist() == expected
@@ -0,0 +1,101 @@
+import pytest
+from pysat.solvers import Glucose4
+
+from dfa_identify import budget, find_dfa, find_dfas, identify
+from dfa_identify.budget import Budget, BudgetExhausted
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time.monotonic for budgets, as a list to advance by hand."""
+    now = [0.0]
+    monkeypatch.setattr(budget, 'monotonic', lambda: now[0])
+    return now
+
+
+def check_anytime_result(result, accepting, rejecting):
+    # State merging's DFA is the best found before the minimal size.
+    dfa = result.dfa
+    assert len(dfa.states()) >= (result.lower_bound or 1)
+    assert all(dfa.label(word) for word in accepting)
+    assert not any(dfa.label(word) for word in rejecting)
+
+
+def test_budget():
+    assert Budget.create() is None
+    budget = Budget.create(timeout=10, conflict_budget=5)
+    assert 0 < budget.remaining() <= 10 and budget.conflicts == 5
+    with pytest.raises(ValueError):
+        Budget.create(timeout=0)
+    with pytest.raises(ValueError):
+        Budget.create(conflict_budget=-1)
+
+
+def test_generous_budget():
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    expected = sorted(map(repr, find_dfas(accepting, rejecting)))
+    for kwargs in [{}, {'incremental': True}, {'order_by_stutter': True}]:
+        dfas = find_dfas(accepting, rejecting, timeout=60,
+                         conflict_budget=10**6, **kwargs)
+        assert sorted(map(repr, dfas)) == expected
+
+    with pytest.raises(ValueError):
+        next(find_dfas(accepting, rejecting, order_by_stutter=True,
+                       stutter_engine='rc2', timeout=60))
+
+
+def test_timeout_includes_caller(clock):
+    dfas = find_dfas(['a', 'abaa', 'bb'], ['abb', 'b'], timeout=10)
+    next(dfas)
+    clock[0] += 10  # The deadline passes while the caller works.
+    with pytest.raises(BudgetExhausted) as info:
+        next(dfas)
+    assert info.value.result.reason == 'timeout'
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'conflict_budget': 1},
+    {'conflict_budget': 1, 'incremental': True},
+    {'conflict_budget': 1, 'workers': 2},
+])
+def test_anytime_result(kwargs, random_examples):
+    accepting, rejecting = random_examples(0, n_states=10, n_words=200,
+                                           max_len=12)
+    with pytest.raises(BudgetExhausted) as info:
+        find_dfa(accepting, rejecting, **kwargs)
+    result = info.value.result
+    assert result.reason == 'conflicts'
+    assert result.lower_bound <= result.size
+    check_anytime_result(result, accepting, rejecting)
+
+
+def test_solver_timeout(clock, random_examples):
+    def solver_fact(**kwargs):
+        clock[0] += 10  # The deadline passes before the first query.
+        return Glucose4(**kwargs)
+
+    accepting, rejecting = random_examples(0, n_states=10, n_words=200,
+                                           max_len=12)
+    with pytest.raises(BudgetExhausted) as info:
+        find_dfa(accepting, rejecting, solver_fact=solver_fact, timeout=10)
+    result = info.value.result
+    assert result.reason == 'timeout'
+    assert result.lower_bound <= result.size
+    check_anytime_result(result, accepting, rejecting)
+
+
+def test_preprocessing_timeout(clock, monkeypatch, random_examples):
+    original = identify.edsm
+
+    def edsm(apta):
+        clock[0] += 10  # The deadline passes while merging states.
+        return original(apta)
+
+    monkeypatch.setattr(identify, 'edsm', edsm)
+    accepting, rejecting = random_examples(0, n_states=10, n_words=200,
+                                           max_len=12)
+    with pytest.raises(BudgetExhausted) as info:
+        find_dfa(accepting, rejecting, timeout=10)
+    result = info.value.result
+    assert result.reason == 'timeout' and result.size is None
+    check_anytime_result(result, accepting, rejecting)
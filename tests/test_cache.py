@@ -0,0 +1,90 @@
+import random
+
+from dfa_identify import find_dfa
+from dfa_identify.cache import PreprocessCache, canonical_order
+from dfa_identify.graphs import APTA
+from dfa_identify.encoding import dfa_id_encodings
+
+
+ACCEPTING = ['a', 'abaa', 'bb']
+REJECTING = ['abb', 'b']
+
+
+def test_canonical_order():
+    key1, order1 = canonical_order(APTA.from_examples(ACCEPTING, REJECTING))
+    shuffled = APTA.from_examples(ACCEPTING[::-1], REJECTING[::-1])
+    key2, order2 = canonical_order(shuffled)
+    assert key1 == key2
+    assert sorted(order2) == list(range(len(shuffled.nodes)))
+    assert order2[0] == 0
+
+    key3, _ = canonical_order(APTA.from_examples(ACCEPTING, ['abb']))
+    assert key3 != key1
+
+
+def test_memory_tier():
+    cache = PreprocessCache()
+    apta = APTA.from_examples(ACCEPTING, REJECTING)
+    graph, clique = cache.preprocess(apta)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # Same examples, different insertion order and node ids.
+    rng = random.Random(0)
+    examples = [(True, w) for w in ACCEPTING] + [(False, w) for w in REJECTING]
+    rng.shuffle(examples)
+    shuffled = APTA.from_labeled(examples)
+    graph2, clique2 = cache.preprocess(shuffled)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    def access(apta, word):
+        node = apta.root
+        for char in word:
+            node = apta.transition(node, char)
+        return node
+
+    words = {''} | {w[:i] for w in ACCEPTING + REJECTING
+                    for i in range(len(w) + 1)}
+    for u in words:
+        for v in words:
+            assert graph.has_edge(access(apta, u), access(apta, v)) == \
+                graph2.has_edge(access(shuffled, u), access(shuffled, v))
+    assert all(graph2.has_edge(u, v) for u in clique2 for v in clique2
+               if u != v)
+    assert len(clique2) == len(clique)
+    assert shuffled.consistency_graph(compact=True) is graph2
+
+
+def test_eviction_and_disk_tier(tmp_path):
+    cache = PreprocessCache(max_entries=1, path=tmp_path)
+    apta1 = APTA.from_examples(ACCEPTING, REJECTING)
+    apta2 = APTA.from_examples(['a'], ['b'])
+    cache.preprocess(apta1)
+    cache.preprocess(apta2)
+    assert len(cache) == 1
+    assert len(list(tmp_path.glob('*.npz'))) == 2
+
+    graph, _ = cache.preprocess(apta1)  # Evicted from memory, on disk.
+    assert (cache.hits, cache.disk_hits, cache.misses) == (0, 1, 2)
+    assert graph.number_of_edges() == \
+        apta1.consistency_graph(compact=True).number_of_edges()
+
+    fresh = PreprocessCache(path=tmp_path, max_disk_bytes=0)
+    assert APTA.from_examples(['a'], ['b']) in fresh
+    fresh.preprocess(APTA.from_examples(['b'], ['a']))
+    assert not list(tmp_path.glob('*.npz'))
+
+
+def test_cached_encodings():
+    cache = PreprocessCache()
+    apta = APTA.from_examples(ACCEPTING, REJECTING)
+    expected = list(dfa_id_encodings(apta, sym_mode='bfs'))
+    for _ in range(2):
+        apta = APTA.from_examples(ACCEPTING, REJECTING)
+        assert list(dfa_id_encodings(apta, sym_mode='bfs', cache=cache)) \
+            == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    my_dfa = find_dfa(ACCEPTING, REJECTING, cache=cache)
+    assert cache.hits == 2
+    assert all(my_dfa.label(x) for x in ACCEPTING)
+    assert not any(my_dfa.label(x) for x in REJECTING)
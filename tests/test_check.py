@@ -0,0 +1,44 @@
+import pytest
+from dfa import DFA
+
+from dfa_identify import find_dfa
+from dfa_identify.check import ExampleChecker, check_dfa, check_dfas
+from dfa_identify.graphs import APTA
+
+
+ACCEPTING = ['a', 'abaa', 'bb']
+REJECTING = ['abb', 'b']
+
+
+def parity(char):
+    return DFA(
+        start=False, inputs={'a', 'b'},
+        label=lambda s: s,
+        transition=lambda s, c: s ^ (c == char),
+    )
+
+
+def test_check_dfa():
+    apta = APTA.from_examples(ACCEPTING, REJECTING)
+    my_dfa = find_dfa(ACCEPTING, REJECTING)
+    assert not check_dfa(my_dfa, apta)
+
+    # Accepts words with an odd number of a's.
+    mismatches = check_dfa(parity('a'), apta)
+    assert mismatches.count == 2
+    assert mismatches.false_rejects == [('b', 'b')]
+    assert mismatches.false_accepts == [('a', 'b', 'b')]
+
+    states, accepted = ExampleChecker(apta).states(parity('b'))
+    for node in apta.nodes:
+        assert accepted[node] == parity('b').label(apta.word(node))
+
+
+def test_check_dfas():
+    apta = APTA.from_examples(ACCEPTING, REJECTING, alphabet={'a', 'b', 'c'})
+    results = list(check_dfas([parity('a'), parity('b')], apta))
+    assert [r.count for r in results] == [2, 3]
+
+    apta.add_examples(['c'], [])
+    with pytest.raises(ValueError):
+        check_dfa(parity('a'), apta)
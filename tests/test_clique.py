@@ -0,0 +1,60 @@
+import random
+
+import networkx as nx
+import pytest
+
+from dfa_identify.clique import greedy_clique, search_clique
+from dfa_identify.graphs import APTA, BitGraph, max_clique
+
+
+def random_adjacency(n, density, seed):
+    rng = random.Random(seed)
+    graph = nx.gnp_random_graph(n, density, seed=rng.randrange(2**32))
+    adjacency = [sum(1 << v for v in graph.neighbors(u)) for u in graph]
+    return graph, adjacency
+
+
+def is_clique(adjacency, nodes):
+    return all(adjacency[u] >> v & 1 for u in nodes for v in nodes if u != v)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_search_clique(seed):
+    graph, adjacency = random_adjacency(40, 0.2 + 0.06 * seed, seed)
+    result = search_clique(adjacency)
+    assert result.optimal
+    assert is_clique(adjacency, result.nodes)
+    expected = max(len(c) for c in nx.find_cliques(graph))
+    assert len(result.nodes) == expected
+    assert len(greedy_clique(adjacency)) <= expected
+
+
+def test_time_budget():
+    _, adjacency = random_adjacency(300, 0.7, 0)
+    result = search_clique(adjacency, time_budget=0)
+    assert not result.optimal  # The budget also covers the greedy start.
+    assert is_clique(adjacency, result.nodes)
+
+
+def test_max_steps():
+    _, adjacency = random_adjacency(300, 0.7, 0)
+    result = search_clique(adjacency, max_steps=10**4)
+    assert not result.optimal
+    assert is_clique(adjacency, result.nodes)
+    assert len(result.nodes) >= len(greedy_clique(adjacency))
+    assert search_clique(adjacency, max_steps=10**4) == result
+
+    # The greedy initial clique counts against the limit too.
+    result = search_clique(adjacency, max_steps=500)
+    assert not result.optimal
+    assert is_clique(adjacency, result.nodes)
+
+
+def test_max_clique():
+    apta = APTA.from_examples(['a', 'abaa', 'bb'], ['abb', 'b'])
+    bit_graph = apta.consistency_graph(compact=True)
+    graph = bit_graph.to_networkx()
+    assert isinstance(bit_graph, BitGraph)
+    assert len(max_clique(bit_graph)) == len(max_clique(graph, None)) == \
+        max(len(c) for c in nx.find_cliques(graph))
+    assert max_clique(nx.Graph()) == set()
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from pysat.solvers import Glucose4
+
+from dfa_identify.cnf import CNF
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+
+
+CLAUSES = [[1, -2], [3], [4, 5, -6], [-1]]
+
+
+def test_cnf():
+    cnf = CNF.from_clauses(CLAUSES)
+    assert len(cnf) == 4
+    assert list(cnf) == CLAUSES
+    assert cnf[2] == [4, 5, -6] and cnf[-1] == [-1]
+    with pytest.raises(IndexError):
+        cnf[4]
+    assert list(cnf[1:3]) == CLAUSES[1:3]
+    assert list(cnf[::2]) == CLAUSES[::2]
+    assert list(cnf[3:1]) == []
+    assert cnf.max_var() == 6
+    assert list(cnf.shifted(10)) == [[11, -12], [13], [14, 15, -16], [-11]]
+    assert cnf.nbytes == 4 * 7 + 8 * 5
+
+    cnf.append([7])
+    cnf.extend(np.array([[8, -9], [10, 11]]))
+    cnf.extend(CNF.from_clauses([[12]]))
+    assert list(cnf) == CLAUSES + [[7], [8, -9], [10, 11], [12]]
+    assert cnf == CNF.from_clauses(list(cnf))
+
+    literals, offsets = cnf.arrays()
+    assert literals.dtype == np.int32 and offsets[-1] == len(literals)
+
+
+def test_solver_handoff():
+    apta = APTA.from_examples(['a', 'abaa', 'bb'], ['abb', 'b'])
+    for backend in ['python', 'numpy']:
+        codec, clauses = next(dfa_id_encodings(apta, backend=backend))
+        assert isinstance(clauses, CNF)
+        with Glucose4(bootstrap_with=clauses) as solver:
+            assert solver.solve()
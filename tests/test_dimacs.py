@@ -0,0 +1,133 @@
+import io
+import sys
+from functools import partial
+
+import pytest
+
+from dfa_identify import find_dfa, find_dfas
+from dfa_identify.budget import BudgetExhausted
+from dfa_identify.cnf import CNF
+from dfa_identify.dimacs import (
+    ExternalSolver, read_dimacs, read_solution, write_dimacs,
+    write_encodings,
+)
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from dfa_identify.identify import extract_dfa
+
+
+CLAUSES = [[1, -2], [3], [], [4, 5, -6], [-1]]
+
+# Stand in for a solver binary: SAT competition output via pysat.
+SOLVER = '''
+import sys
+from pysat.formula import CNF
+from pysat.solvers import Glucose4
+
+formula = CNF(from_file=sys.argv[1]) if len(sys.argv) > 1 else \\
+    CNF(from_fp=sys.stdin)
+with Glucose4(bootstrap_with=formula.clauses) as solver:
+    if solver.solve():
+        print('s SATISFIABLE')
+        print('v', *solver.get_model(), 0)
+    else:
+        print('s UNSATISFIABLE')
+'''
+
+
+class Pipe(io.StringIO):
+    def seekable(self):
+        return False
+
+
+def test_write_dimacs():
+    expected = 'p cnf 6 5'
+    for clauses in [CNF.from_clauses(CLAUSES), iter(CLAUSES)]:
+        for out in [io.StringIO(), Pipe()]:
+            assert write_dimacs(clauses, out, comments=['test']) == 5
+            lines = out.getvalue().splitlines()
+            assert lines[0] == 'c test' and lines[1].strip() == expected
+            assert lines[2:] == ['1 -2 0', '3 0', '0', '4 5 -6 0', '-1 0']
+            assert list(read_dimacs(lines)) == CLAUSES
+            clauses = iter(CLAUSES)
+
+    out = io.StringIO()
+    write_dimacs(iter(CLAUSES), out, n_vars=8, n_clauses=5)
+    assert out.getvalue().splitlines()[0].strip() == 'p cnf 8 5'
+    with pytest.raises(ValueError):
+        write_dimacs(iter(CLAUSES), out, n_vars=8, n_clauses=4)
+
+
+def test_read_solution():
+    output = ['c comment', 's SATISFIABLE', 'v 1 -2', 'v 4 0']
+    assert read_solution(output, n_vars=5) == (True, [1, -2, -3, 4, -5])
+    assert read_solution(['s UNSATISFIABLE']) == (False, [])
+    assert read_solution(['s UNKNOWN']) == (None, [])
+
+
+@pytest.fixture
+def solver_fact(tmp_path):
+    script = tmp_path / 'solver.py'
+    script.write_text(SOLVER)
+    return ExternalSolver.factory(sys.executable, str(script))
+
+
+def test_external_solver(solver_fact):
+    with solver_fact(bootstrap_with=[[1, 2], [-1, 2]]) as solver:
+        assert solver.solve() and solver.get_model()[1] == 2
+        assert not solver.solve(assumptions=[-2])
+        assert solver.get_model() is None
+        assert len(list(solver.enum_models())) == 2
+
+    pipe = partial(solver_fact, pipe=True)
+    with pipe(bootstrap_with=[[1], [-1, 2]]) as solver:
+        assert solver.solve() and solver.get_model() == [1, 2]
+
+
+def test_external_solver_timeout():
+    sleeper = [sys.executable, '-c', 'import time; time.sleep(60)']
+    for pipe in [False, True]:
+        with ExternalSolver([[1]], sleeper, pipe=pipe,
+                            timeout=0.2) as solver:
+            with pytest.raises(BudgetExhausted) as info:
+                solver.solve()
+            assert info.value.result.reason == 'timeout'
+            assert solver.get_status() is None
+
+
+def test_find_dfas(solver_fact):
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    expected = sorted(map(repr, find_dfas(accepting, rejecting)))
+    dfas = find_dfas(accepting, rejecting, solver_fact=solver_fact)
+    assert sorted(map(repr, dfas)) == expected
+
+    dfa = find_dfa(accepting, rejecting, solver_fact=solver_fact,
+                   order_by_stutter=True)
+    assert all(dfa.label(word) for word in accepting)
+    assert not any(dfa.label(word) for word in rejecting)
+
+
+def test_write_encodings(tmp_path, solver_fact):
+    apta = APTA.from_examples(['a', 'abaa', 'bb'], ['abb', 'b'])
+    written = write_encodings(apta, str(tmp_path), sym_mode='bfs',
+                              bounds=(None, 4))
+    expected = list(dfa_id_encodings(apta, sym_mode='bfs', bounds=(None, 4)))
+    assert len(written) == len(expected)
+    for (codec, path), (_, clauses) in zip(written, expected):
+        with open(path) as formula:
+            assert read_dimacs(formula) == clauses
+
+    codec, path = written[-1]
+    with open(path) as formula, solver_fact(read_dimacs(formula)) as solver:
+        assert solver.solve()
+        dfa = extract_dfa(codec, apta, solver.get_model())
+    assert dfa.label('a') and not dfa.label('b')
+
+    # Sizes below the clique, e.g., for decompose.
+    written = write_encodings(apta, str(tmp_path), sym_mode='bfs',
+                              bounds=(1, 2), clique_bound=False)
+    expected = dfa_id_encodings(apta, sym_mode='bfs', bounds=(1, 2),
+                                clique_bound=False)
+    assert [codec for codec, _ in written] == \
+        [codec for codec, _ in expected]
+    assert len(written) == 2
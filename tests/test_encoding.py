@@ -1,10 +1,17 @@
+import attr
+import numpy as np
 import pytest
 
 from itertools import product
 
-from dfa_identify.graphs import APTA
-from dfa_identify.encoding import Codec, dfa_id_encodings
+from dfa_identify import find_dfas
+from dfa_identify.graphs import APTA, max_clique
+from pysat.solvers import Glucose4
+
+from dfa_identify.encoding import Codec, dfa_id_encodings, encode_dfa_id
+from dfa_identify.encoding import EncodingContext, dfa_id_incremental_encoding
 from dfa_identify.encoding import (
+    AuxillaryVar,
     ColorAcceptingVar,
     ColorNodeVar,
     ParentRelationVar
@@ -108,6 +115,24 @@ def test_encode_dfa_id():
     assert 1 < (len(clauses3) / len(clauses2)) < 3
 
 
+def test_clique_lower_bound():
+    apta = APTA.from_examples(
+        accepting=['a', 'abaa', 'bb'],
+        rejecting=['abb', 'b'],
+    )
+    clique = max_clique(apta.consistency_graph(compact=True))
+    assert len(clique) > 1
+
+    codec, _ = next(dfa_id_encodings(apta, sym_mode='clique'))
+    assert codec.n_colors == len(clique)
+
+    codec, _ = next(dfa_id_encodings(apta, bounds=(len(clique) + 1, None)))
+    assert codec.n_colors == len(clique) + 1
+
+    encodings = dfa_id_encodings(apta, bounds=(None, len(clique) - 1))
+    assert next(encodings, None) is None
+
+
 def test_codec_errors():
     """Check that codec performs checks on token/colors being within range."""
     codec = Codec(n_nodes=10, n_colors=3, n_tokens=4, sym_mode="bfs")
@@ -129,3 +154,155 @@ def test_codec_errors():
     for func, args in tests:
         with pytest.raises(AssertionError):
             func(*args)
+    with pytest.raises(AssertionError):
+        codec.color_node(node=10, color=0)
+
+    # Range checks can be turned off.
+    unchecked = attr.evolve(codec, validate=False)
+    assert unchecked == codec
+    assert unchecked.color_accepting(3) == codec.color_accepting(2) + 1
+
+
+def test_validate_option():
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    apta = APTA.from_examples(accepting, rejecting)
+    checked = list(dfa_id_encodings(apta, sym_mode='bfs', bounds=(3, 4)))
+    unchecked = list(dfa_id_encodings(apta, sym_mode='bfs', bounds=(3, 4),
+                                      validate=False))
+    assert [list(c) for _, c in unchecked] == [list(c) for _, c in checked]
+    assert not any(codec.validate for codec, _ in unchecked)
+
+    expected = sorted(map(repr, find_dfas(accepting, rejecting)))
+    for kwargs in [{}, {'incremental': True}]:
+        dfas = find_dfas(accepting, rejecting, validate=False, **kwargs)
+        assert sorted(map(repr, dfas)) == expected
+
+
+def test_decode_model():
+    apta = APTA.from_examples(['a', 'abaa', 'bb'], ['abb', 'b'])
+    for codec, clauses in dfa_id_encodings(apta, sym_mode='bfs',
+                                           bounds=(None, 4)):
+        with Glucose4(bootstrap_with=clauses) as solver:
+            models = list(solver.enum_models())
+        for model in models[:20]:
+            decoded = codec.decode_model(model)
+            assert decoded.transitions.shape == (codec.n_colors,
+                                                 codec.n_tokens)
+            transitions = -np.ones_like(decoded.transitions)
+            accepting = np.zeros(codec.n_colors, dtype=bool)
+            for var in map(codec.decode, model):
+                if not getattr(var, 'true', False):
+                    continue
+                if kind(var) == 'color_accepting':
+                    accepting[var.color] = True
+                elif kind(var) == 'color_node' and var.node == 0:
+                    assert decoded.start == var.color
+                elif kind(var) == 'parent_relation':
+                    transitions[var.parent_color, var.token] = var.node_color
+            assert (decoded.accepting == accepting).all()
+            assert (decoded.transitions == transitions).all()
+            # Order and missing (false) literals do not matter.
+            for shuffled in [[lit for lit in reversed(model) if lit > 0],
+                             model[::-1]]:
+                other = codec.decode_model(shuffled)
+                assert other.start == decoded.start
+                assert (other.accepting == accepting).all()
+                assert (other.transitions == transitions).all()
+
+
+@pytest.mark.parametrize('sym_mode', [None, 'bfs', 'clique'])
+@pytest.mark.parametrize('amo', ['pairwise', 'sequential', 'product'])
+def test_numpy_backend(sym_mode, amo):
+    examples = [
+        (['a', 'abaa', 'bb'], ['abb', 'b']),
+        (['a', 'abaa', 'bb'], []),
+        ([], ['ab', 'ba', 'c']),
+    ]
+    for accepting, rejecting in examples:
+        apta = APTA.from_examples(accepting, rejecting)
+        for compact in [True, False]:
+            cgraph = apta.consistency_graph(compact=compact)
+            clique = max_clique(cgraph)
+            sizes = product(range(max(1, len(clique)), 5), [False, True])
+            for n_colors, incremental in sizes:
+                codec = Codec.from_apta(apta, n_colors, sym_mode=sym_mode,
+                                        incremental=incremental, amo=amo)
+                expected = list(encode_dfa_id(apta, codec, cgraph, clique))
+                clauses = list(encode_dfa_id(apta, codec, cgraph, clique,
+                                             backend='numpy'))
+                assert clauses == expected
+                assert all(type(lit) is int for c in clauses for lit in c)
+
+    with pytest.raises(ValueError):
+        list(encode_dfa_id(apta, codec, cgraph, clique, backend='fortran'))
+
+
+@pytest.mark.parametrize('sym_mode', [None, 'bfs', 'clique'])
+@pytest.mark.parametrize('amo', ['pairwise', 'sequential', 'commander'])
+def test_incremental_encoding(sym_mode, amo):
+    def count_models(clauses, assumptions=()):
+        with Glucose4(bootstrap_with=clauses) as solver:
+            return sum(1 for _ in solver.enum_models(assumptions))
+
+    apta = APTA.from_examples(['a', 'abaa', 'bb'], ['abb', 'b'])
+    # Without BFS symmetry breaking, unused colors blow up the counts.
+    bounds = (None, 4 if sym_mode == 'bfs' else 3)
+    encodings = dfa_id_encodings(apta, sym_mode=sym_mode, bounds=bounds,
+                                 amo=amo)
+    codec, clauses, sizes = dfa_id_incremental_encoding(
+        apta, sym_mode=sym_mode, bounds=bounds, amo=amo)
+    assert codec.incremental and codec.n_colors == max(sizes)
+    assert [c.n_colors for c, _ in encodings] == list(sizes)
+
+    # Same number of models at each size, i.e., no free variables.
+    for size_codec, size_clauses in dfa_id_encodings(
+            apta, sym_mode=sym_mode, bounds=bounds, amo=amo):
+        assumptions = codec.assumptions(size_codec.n_colors)
+        assert count_models(clauses, assumptions) == \
+            count_models(size_clauses)
+
+    _, clauses, sizes = dfa_id_incremental_encoding(apta, bounds=(1, 2))
+    assert not sizes and not clauses
+
+
+@pytest.mark.parametrize('amo', ['sequential', 'commander', 'product'])
+def test_amo_encodings(amo):
+    def count_models(clauses):
+        with Glucose4(bootstrap_with=clauses) as solver:
+            return sum(1 for _ in solver.enum_models())
+
+    words = ['a' * i for i in range(12)]
+    apta = APTA.from_examples(words[::5], [w for w in words if len(w) % 5])
+    bounds = (None, 6)
+    pairwise = dfa_id_encodings(apta, sym_mode='bfs', bounds=bounds)
+    encodings = dfa_id_encodings(apta, sym_mode='bfs', bounds=bounds, amo=amo)
+    for (codec1, clauses1), (codec2, clauses2) in zip(pairwise, encodings):
+        assert codec2.amo_template.n_aux > 0
+        assert codec2.offsets[-1] > codec1.offsets[-1]
+        aux = codec2.decode(codec2.amo_aux(codec2.n_amo_groups - 1, 0))
+        assert isinstance(aux, AuxillaryVar)
+        assert count_models(clauses1) == count_models(clauses2) > 0
+
+
+def test_encoding_context():
+    apta = APTA.from_examples(['a', 'abaa', 'bb'], ['abb', 'b'])
+    cgraph = apta.consistency_graph(compact=True)
+    ctx = EncodingContext.from_apta(apta, cgraph)
+    assert ctx.labeled
+    assert set(ctx.accepting) == apta.accepting
+    assert set(ctx.rejecting) == apta.rejecting
+    for node, parent, token in zip(ctx.nodes, ctx.parents, ctx.tokens):
+        assert apta.children[token][parent] == node
+    labeled = apta.accepting | apta.rejecting
+    expected = {(a, b) for a, b in cgraph.edges
+                if {a, b} <= labeled and (a in apta.accepting) !=
+                (b in apta.accepting)}
+    assert set(map(tuple, ctx.edges.tolist())) == expected
+
+    codec = Codec.from_apta(apta, 3, sym_mode='bfs')
+    assert list(encode_dfa_id(apta, codec, cgraph, ctx=ctx)) == \
+        list(encode_dfa_id(apta, codec, cgraph))
+
+    apta = APTA.from_examples(['a', 'ab'], [])
+    ctx = EncodingContext.from_apta(apta, apta.consistency_graph())
+    assert not ctx.labeled and len(ctx.rejecting) == 0
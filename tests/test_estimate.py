@@ -0,0 +1,103 @@
+from itertools import product
+
+import pytest
+
+from dfa_identify import find_dfa
+from dfa_identify import encoding
+from dfa_identify.encoding import (
+    Codec, EncodingContext, dfa_id_encodings, dfa_id_incremental_encoding,
+    estimate_sizes,
+)
+from dfa_identify.estimate import (
+    EncodingTooLarge, check_limits, estimate_encoding,
+)
+from dfa_identify.graphs import APTA, max_clique
+from dfa_identify.parallel import search_size
+
+
+EXAMPLES = (['a', 'abaa', 'bb', 'c'], ['abb', 'b', 'cc'])
+
+
+def size(clauses):
+    clauses = list(clauses)
+    return len(clauses), sum(map(len, clauses))
+
+
+@pytest.mark.parametrize('sym_mode', [None, 'bfs', 'clique'])
+@pytest.mark.parametrize('amo', ['pairwise', 'sequential', 'product'])
+def test_estimate_encoding(sym_mode, amo):
+    apta = APTA.from_examples(*EXAMPLES)
+    cgraph = apta.consistency_graph(compact=True)
+    clique = max_clique(cgraph)
+    ctx = EncodingContext.from_apta(apta, cgraph)
+    for n_colors, incremental in product([3, 4, 6], [False, True]):
+        codec = Codec.from_apta(apta, n_colors, sym_mode, incremental, amo)
+        estimate = estimate_encoding(codec, ctx, len(clique))
+        families = {
+            'onehot_color': encoding.onehot_color_clauses(codec),
+            'partition_by_accepting':
+                encoding.partition_by_accepting_clauses(codec, ctx),
+            'parent_rel_coupling':
+                encoding.colors_parent_rel_coupling_clauses(codec, ctx),
+            'onehot_parent_relation':
+                encoding.onehot_parent_relation_clauses(codec),
+            'determination_conflicts':
+                encoding.determination_conflicts(codec, ctx),
+            'symmetry_breaking':
+                encoding.symmetry_breaking_clauses(codec, clique),
+            'activation': encoding.activation_clauses(codec),
+        }
+        for family, clauses in families.items():
+            assert estimate.families[family] == size(clauses)
+        assert estimate.variables == codec.offsets[-1]
+
+        clauses = encoding.encode_dfa_id_cnf(apta, codec, cgraph, clique)
+        assert estimate.clauses == len(clauses)
+        assert estimate.cnf_bytes == clauses.nbytes
+        assert estimate.memory > estimate.cnf_bytes
+
+
+def test_estimate_sizes():
+    apta = APTA.from_examples(*EXAMPLES)
+    estimates = estimate_sizes(apta, sym_mode='bfs', bounds=(None, 6))
+    encodings = list(dfa_id_encodings(apta, sym_mode='bfs', bounds=(None, 6)))
+    assert [e.n_colors for e in estimates] == \
+        [codec.n_colors for codec, _ in encodings]
+    assert [e.clauses for e in estimates] == [len(c) for _, c in encodings]
+
+    cgraph = apta.consistency_graph()
+    [estimate] = estimate_sizes(apta, sym_mode='bfs', bounds=(None, 6),
+                                cgraph=cgraph, incremental=True)
+    _, clauses, _ = dfa_id_incremental_encoding(apta, sym_mode='bfs',
+                                                bounds=(None, 6))
+    assert estimate.clauses == len(clauses)
+
+
+def test_limits():
+    apta = APTA.from_examples(*EXAMPLES)
+    estimates = estimate_sizes(apta, sym_mode='bfs', bounds=(None, 6))
+    smallest = estimates[0]
+    check_limits(smallest, smallest.clauses, smallest.memory)
+    with pytest.raises(EncodingTooLarge):
+        check_limits(smallest, max_clauses=smallest.clauses - 1)
+    with pytest.raises(EncodingTooLarge):
+        check_limits(smallest, max_memory=smallest.memory - 1)
+
+    # Every size in bounds is checked before the first encoding.
+    encodings = dfa_id_encodings(apta, sym_mode='bfs', bounds=(None, 6),
+                                 max_clauses=estimates[1].clauses)
+    with pytest.raises(EncodingTooLarge):
+        next(encodings)
+    encodings = dfa_id_encodings(apta, sym_mode='bfs', bounds=(None, 6),
+                                 max_clauses=estimates[-1].clauses)
+    assert [codec.n_colors for codec, _ in encodings] == \
+        [estimate.n_colors for estimate in estimates]
+    with pytest.raises(EncodingTooLarge):
+        dfa_id_incremental_encoding(apta, sym_mode='bfs', bounds=(None, 6),
+                                    max_memory=estimates[-1].memory)
+
+    with pytest.raises(EncodingTooLarge):
+        find_dfa(*EXAMPLES, max_clauses=10)
+    with pytest.raises(EncodingTooLarge):
+        search_size(apta, 2, sym_mode='bfs', max_memory=1000)
+    assert find_dfa(*EXAMPLES, max_memory=2**30) is not None
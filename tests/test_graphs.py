@@ -1,4 +1,12 @@
-from dfa_identify.graphs import APTA
+from itertools import combinations
+
+import funcy as fn
+import networkx as nx
+import pytest
+
+from dfa_identify.graphs import (
+    APTA, BitGraph, LabelConflict, conflict_matrix, max_clique
+)
 
 
 def test_fig1():
@@ -18,3 +26,152 @@ def test_fig1():
     graph = apta.consistency_graph()
     assert len(graph.nodes) == 8
     assert len(graph.edges) == 10
+
+
+def test_array_layout():
+    apta = APTA.from_examples(
+        accepting=['a', 'abaa', 'bb'],
+        rejecting=['abb', 'b'],
+        alphabet=frozenset('abc'),
+    )
+    assert list(apta.alphabet) == ['a', 'b', 'c']
+    assert len(apta.children) == 3
+    assert all(c == -1 for c in apta.children[2])
+
+    for node in apta.nodes:
+        if node == apta.root:
+            continue
+        parent, token = apta.parents[node], apta.tokens[node]
+        assert parent < node
+        assert apta.children[token][parent] == node
+
+    node = apta.root
+    for char in 'abaa':
+        node = apta.transition(node, char)
+    assert node in apta.accepting
+    assert apta.nodes[node] == {'source': 'a', 'label': True}
+    assert apta.transition(apta.root, 'c') is None
+
+
+def reference_consistency_graph(apta):
+    """Pairwise DFS construction used before the bit matrix propagation."""
+    graph = nx.Graph()
+    graph.add_nodes_from(apta.nodes)
+    for pair in combinations(apta.nodes, 2):
+        if not reference_can_merge(apta, graph, pair):
+            graph.add_edge(*pair)
+    return graph
+
+
+def reference_can_merge(apta, graph, pair):
+    nodes = apta.nodes
+    stack, visited = [pair], set()
+    while stack:
+        left, right = stack.pop()
+        if (left, right) in visited:
+            continue
+        visited.add((left, right))
+
+        if (left, right) in graph.edges:
+            return False
+
+        left_lbl = nodes[left].get('label')
+        right_lbl = nodes[right].get('label')
+        if None not in {left_lbl, right_lbl} and left_lbl != right_lbl:
+            return False
+
+        succ_left = {nodes[n]['source']: n for n in apta.successors(left)}
+        succ_right = {nodes[n]['source']: n for n in apta.successors(right)}
+        merged = list(fn.merge_with(set, succ_left, succ_right).values())
+        for p1, p2 in [pair, pair[::-1]]:
+            merged.extend([(p | {p1}) - {p2} for p in merged if p2 in p])
+        stack.extend([p for p in merged if len(p) == 2])
+    return True
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_consistency_graph_matches_reference(seed, random_examples):
+    alphabet = 'ab' if seed % 2 else 'abc'
+    accepting, rejecting = random_examples(seed, n_states=8, n_words=30,
+                                           max_len=6, alphabet=alphabet)
+    apta = APTA.from_examples(accepting=accepting, rejecting=rejecting)
+
+    expected = reference_consistency_graph(apta)
+    graph = apta.consistency_graph()
+    assert set(graph.nodes) == set(expected.nodes)
+    assert set(map(frozenset, graph.edges)) == \
+        set(map(frozenset, expected.edges))
+
+
+def test_bit_graph(random_examples):
+    accepting, rejecting = random_examples(0, n_states=8, n_words=30,
+                                           max_len=6)
+    apta = APTA.from_examples(accepting=accepting, rejecting=rejecting)
+    expected = apta.consistency_graph()
+    graph = apta.consistency_graph(compact=True)
+
+    assert isinstance(graph, BitGraph)
+    assert list(graph.nodes) == list(expected.nodes)
+    assert len(graph.edges) == expected.number_of_edges()
+    assert set(graph.edges) == {tuple(sorted(e)) for e in expected.edges}
+    assert set(map(tuple, graph.edge_array().tolist())) == set(graph.edges)
+    for left, right in combinations(graph.nodes, 2):
+        assert graph.has_edge(left, right) == expected.has_edge(left, right)
+        assert ((left, right) in graph.edges) == graph.has_edge(left, right)
+    for node in graph.nodes:
+        assert set(graph.neighbors(node)) == set(expected.neighbors(node))
+        assert graph.degree(node) == expected.degree(node)
+
+    clique = max_clique(graph)
+    assert len(clique) > 1
+    assert all(graph.has_edge(*pair) for pair in combinations(clique, 2))
+
+
+def test_consistency_graph_workers(random_examples):
+    accepting, rejecting = random_examples(3, n_states=8)
+    apta = APTA.from_examples(accepting=accepting, rejecting=rejecting)
+
+    serial, serial_loops = conflict_matrix(apta)
+    assert serial_loops  # The pool checks the ancestor pairs as well.
+    for workers in [2, 3]:
+        matrix, loops = conflict_matrix(apta, workers=workers)
+        assert (matrix == serial).all() and loops == serial_loops
+
+        # A fresh APTA builds its graph, rather than reusing the cache.
+        fresh = APTA.from_examples(accepting=accepting, rejecting=rejecting)
+        graph = fresh.consistency_graph(compact=True, workers=workers)
+        assert (graph.matrix == serial).all()
+
+
+def test_add_examples():
+    apta = APTA.from_examples(accepting=['a', 'bb'], rejecting=['b'])
+    n_nodes = len(apta.nodes)
+
+    update = apta.add_examples(accepting=['abc', ''], rejecting=['ab'])
+    assert update.added == range(n_nodes, n_nodes + 2)
+    assert update.relabeled == {apta.root}
+    assert 'c' in apta.alphabet
+    assert apta.transition(apta.transition(0, 'a'), 'b') in update.added
+    assert apta.accepting == {0, 1, 3, 5}
+    assert apta.rejecting == {2, 4}
+
+    with pytest.raises(LabelConflict):
+        apta.add_examples(accepting=['b'], rejecting=[])
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_incremental_consistency_graph(seed, random_examples):
+    accepting, rejecting = random_examples(seed, n_states=8, n_words=40,
+                                           max_len=6)
+    apta = APTA.from_examples(accepting=accepting[:10],
+                              rejecting=rejecting[:10])
+    apta.consistency_graph(compact=True)
+
+    for start in [10, 20]:
+        stop = start + 10
+        apta.add_examples(accepting[start:stop], rejecting[start:stop])
+        graph = apta.consistency_graph(compact=True)
+
+        matrix, loops = conflict_matrix(apta)
+        assert (graph.matrix == matrix).all()
+        assert graph.loops == loops
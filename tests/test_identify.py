@@ -1,9 +1,18 @@
+from collections import Counter
+
 import pytest
 
 import dfa
 from more_itertools import take
 
-from dfa_identify import find_dfa, find_dfas
+from pysat.solvers import Glucose4
+
+from dfa_identify import find_dfa, find_dfas, identify
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from dfa_identify.identify import (
+    EnumerationStats, blocking_clause, projected_models,
+)
 
 
 def test_identify():
@@ -162,6 +171,72 @@ def test_order_by_stutter():
         assert set(ordered_counts) == set(unordered_counts)
         assert ordered == sorted(ordered, key=non_stutter_count)
 
+        maxsat = list(find_dfas(
+            accepting=accepting,
+            rejecting=rejecting,
+            order_by_stutter=True,
+            stutter_engine='rc2',
+        ))
+        maxsat_counts = list(map(non_stutter_count, maxsat))
+        assert maxsat_counts == sorted(ordered_counts)
+        assert set(map(repr, maxsat)) == set(map(repr, ordered))
+
+    with pytest.raises(ValueError):
+        next(find_dfas(['a'], ['b'], order_by_stutter=True,
+                       stutter_engine='bogus'))
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'incremental': True},
+    {'simplify': True},
+    {'allow_unminimized': True, 'bounds': (None, 3)},
+    {'allow_unminimized': True, 'bounds': (None, 3), 'incremental': True},
+])
+def test_stutter_engines(kwargs):
+    def non_stutter_count(x):
+        graph, _ = dfa.dfa2dict(x)
+        return sum(s1 != s2 for s1, (_, transitions) in graph.items()
+                   for s2 in transitions.values())
+
+    examples = [
+        (['x'], []),  # A single state: no non stutter transitions.
+        (['a'], ['', 'b']),
+        (['a', 'abaa', 'bb'], ['abb', 'b']),
+    ]
+    for accepting, rejecting in examples:
+        results = {}
+        for engine in ['totalizer', 'rc2']:
+            dfas = list(find_dfas(accepting, rejecting, order_by_stutter=True,
+                                  stutter_engine=engine, **kwargs))
+            counts = [(len(x.states()), non_stutter_count(x)) for x in dfas]
+            results[engine] = counts, set(map(repr, dfas))
+        assert results['totalizer'] == results['rc2']
+
+
+def test_edsm_bound(monkeypatch):
+    calls, original = [], identify.edsm
+
+    def edsm(apta):
+        calls.append(len(apta.nodes))
+        return original(apta)
+
+    monkeypatch.setattr(identify, 'edsm', edsm)
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    expected = sorted(map(repr, find_dfas(accepting, rejecting)))
+    assert len(calls) == 1
+
+    for edsm_bound in [False, True]:
+        dfas = find_dfas(accepting, rejecting, edsm_bound=edsm_bound)
+        assert sorted(map(repr, dfas)) == expected
+    assert len(calls) == 2
+
+    # By default, large APTAs skip state merging.
+    monkeypatch.setattr(identify, 'EDSM_MAX_NODES', calls[0] - 1)
+    dfas = find_dfas(accepting, rejecting)
+    assert sorted(map(repr, dfas)) == expected
+    assert len(calls) == 2
+
 
 def test_empty_examples():
     with pytest.raises(ValueError):
@@ -171,3 +246,96 @@ def test_empty_examples():
     assert len(dfas) == 2
     for i, dfa in enumerate(dfas):
         assert dfa.label(()) != (i & 1)
+
+
+def test_incremental():
+    examples = [
+        (['a', 'abaa', 'bb'], ['abb', 'b']),
+        (['a'], ['', 'b']),
+        ([[0], [0, 'z', 0, 0], ['z', 'z']], [[0, 'z', 'z'], ['z']]),
+    ]
+    for accepting, rejecting in examples:
+        for kwargs in [{}, {'order_by_stutter': True},
+                       {'allow_unminimized': True, 'bounds': (None, 4)}]:
+            expected = find_dfas(accepting, rejecting, **kwargs)
+            dfas = find_dfas(accepting, rejecting, incremental=True,
+                             **kwargs)
+            # Same DFAs, though the solver may find them in another order.
+            assert sorted(map(repr, dfas)) == sorted(map(repr, expected))
+
+    with pytest.raises(ValueError):
+        next(find_dfas(['a'], ['b'], incremental=True,
+                       extra_clauses=lambda *_: [[1]]))
+
+
+def test_incremental_blocking():
+    # Without symmetry breaking, each size has many models. Blocking
+    # one size's models must not cut off those of the larger sizes.
+    accepting, rejecting = ['a'], ['', 'b']
+    kwargs = {'sym_mode': None, 'allow_unminimized': True,
+              'bounds': (None, 3)}
+    expected = Counter(
+        len(dfa.states()) for dfa in find_dfas(accepting, rejecting,
+                                               **kwargs))
+    counts = Counter(
+        len(dfa.states()) for dfa in find_dfas(accepting, rejecting,
+                                               incremental=True, **kwargs))
+    assert counts == expected
+
+
+def test_amo():
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    expected = sorted(map(repr, find_dfas(accepting, rejecting)))
+    for amo in ['sequential', 'commander', 'product']:
+        dfas = find_dfas(accepting, rejecting, amo=amo)
+        assert sorted(map(repr, dfas)) == expected
+
+
+def test_simplify():
+    examples = [
+        (['a', 'abaa', 'bb'], ['abb', 'b']),
+        ([[0], [0, 'z', 0, 0], ['z', 'z']], [[0, 'z', 'z'], ['z']]),
+    ]
+    for accepting, rejecting in examples:
+        for kwargs in [{}, {'order_by_stutter': True},
+                       {'allow_unminimized': True, 'bounds': (None, 4)}]:
+            expected = find_dfas(accepting, rejecting, **kwargs)
+            dfas = find_dfas(accepting, rejecting, simplify=True, **kwargs)
+            assert sorted(map(repr, dfas)) == sorted(map(repr, expected))
+
+    with pytest.raises(ValueError):
+        next(find_dfas(['a'], ['b'], incremental=True, simplify=True))
+
+
+def test_projected_enumeration():
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    apta = APTA.from_examples(accepting, rejecting)
+    codec, clauses = next(dfa_id_encodings(apta, sym_mode='bfs'))
+    with Glucose4(bootstrap_with=clauses) as solver:
+        expected = {tuple(m) for m in solver.enum_models()}
+    with Glucose4(bootstrap_with=clauses) as solver:
+        models = [tuple(m) for m, _ in projected_models(solver, codec)]
+    # Auxiliary variables are determined by the DFA defining ones.
+    assert set(models) == expected and len(models) == len(expected)
+
+    model = list(models[0])
+    blocking = blocking_clause(codec, codec.decode_model(model))
+    assert not any(lit in model for lit in blocking)
+
+
+def test_unique_up_to_isomorphism():
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    kwargs = {'sym_mode': None, 'bounds': (None, 3),
+              'allow_unminimized': True}
+    stats = EnumerationStats()
+    dfas = list(find_dfas(accepting, rejecting, **kwargs))
+    unique = list(find_dfas(accepting, rejecting, unique=True, stats=stats,
+                            **kwargs))
+    assert len(unique) < len(dfas)
+    assert stats.dfas == len(unique)
+    assert stats.models == len(dfas) == stats.dfas + stats.duplicates
+    assert stats.dfas_per_second > 0
+
+    # Without symmetry breaking, each DFA is found once per renaming.
+    bfs = find_dfas(accepting, rejecting, **{**kwargs, 'sym_mode': 'bfs'})
+    assert len(unique) == len(list(bfs))
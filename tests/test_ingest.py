@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from dfa_identify import find_dfa
+from dfa_identify.graphs import APTA, LabelConflict
+from dfa_identify.ingest import apta_from_file, read_examples
+
+
+ACCEPTING = [['a'], ['a', 'b', 'a', 'a'], ['b', 'b']]
+REJECTING = [['a', 'b', 'b'], ['b']]
+
+
+def write_jsonl(path, examples):
+    with path.open('w') as f:
+        for label, word in examples:
+            f.write(json.dumps({'label': label, 'trace': word}) + '\n')
+
+
+def test_read_examples(tmp_path):
+    examples = [(True, w) for w in ACCEPTING] + \
+        [(False, w) for w in REJECTING]
+
+    jsonl = tmp_path / 'examples.jsonl'
+    write_jsonl(jsonl, examples)
+    assert list(read_examples(jsonl)) == examples
+
+    csv = tmp_path / 'examples.csv'
+    csv.write_text('accept,a\n1,a,b,a,a\nTRUE,b,b\n0,a,b,b\n-,b\n')
+    assert list(read_examples(csv)) == examples
+
+    with pytest.raises(ValueError):
+        list(read_examples(tmp_path / 'examples.txt'))
+
+
+def test_jsonl_labels(tmp_path):
+    path = tmp_path / 'examples.jsonl'
+    labels = [True, 'TRUE', 1, '+', False, 'false', 0, '0', 'reject']
+    write_jsonl(path, [(label, ['a']) for label in labels])
+    assert [label for label, _ in read_examples(path)] == \
+        [True] * 4 + [False] * 5
+
+    for label in ['maybe', 2, None]:
+        write_jsonl(path, [(label, ['a'])])
+        with pytest.raises(ValueError):
+            list(read_examples(path))
+
+
+def test_apta_from_file(tmp_path):
+    path = tmp_path / 'examples.jsonl'
+    write_jsonl(path, [(True, w) for w in ACCEPTING])
+    with path.open('a') as f:
+        f.write('\n')  # Blank lines are skipped.
+
+    apta = apta_from_file(path)
+    expected = APTA.from_examples(ACCEPTING, [])
+    assert list(apta.parents) == list(expected.parents)
+    assert list(apta.labels) == list(expected.labels)
+
+    apta.add_examples([], REJECTING)
+    my_dfa = find_dfa([], [], apta=apta)
+    assert all(my_dfa.label(x) for x in ACCEPTING)
+    assert not any(my_dfa.label(x) for x in REJECTING)
+
+
+def test_conflicts(tmp_path):
+    path = tmp_path / 'examples.csv'
+    path.write_text('1,a,b\n0,b\n0,a,b\n')
+    with pytest.raises(LabelConflict):
+        apta_from_file(path)
+
+    apta = APTA.from_examples(ACCEPTING, REJECTING)
+    assert find_dfa(accepting=[], rejecting=[['b', 'b']], apta=apta) is None
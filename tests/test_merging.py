@@ -0,0 +1,28 @@
+import pytest
+
+from dfa_identify import find_dfa, learn_dfa
+from dfa_identify.check import check_dfa
+from dfa_identify.graphs import APTA
+from dfa_identify.merging import edsm
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_edsm_consistent(seed, random_examples):
+    accepting, rejecting = random_examples(seed)
+    apta = APTA.from_examples(accepting, rejecting)
+    my_dfa = edsm(apta)
+    assert not check_dfa(my_dfa, apta)
+
+    minimal = find_dfa(accepting, rejecting, bounds=(None, len(apta.nodes)))
+    assert len(minimal.states()) <= len(my_dfa.states())
+    assert len(find_dfa(accepting, rejecting).states()) == \
+        len(minimal.states())
+
+
+def test_learn_dfa():
+    accepting = ['a', 'abaa', 'bb']
+    rejecting = ['abb', 'b']
+    my_dfa = learn_dfa(accepting, rejecting)
+    assert all(my_dfa.label(x) for x in accepting)
+    assert not any(my_dfa.label(x) for x in rejecting)
+    assert learn_dfa(['a'], ['a']) is None
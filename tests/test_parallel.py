@@ -0,0 +1,48 @@
+from dfa_identify import find_dfa, find_dfas
+from dfa_identify.graphs import APTA
+from dfa_identify.parallel import _next_size, search_size
+
+
+def test_next_size():
+    # Gallop from the lowest open size until something is SAT.
+    running = set()
+    for expected in [3, 4, 6, 10, 18, 20, 14]:
+        size = _next_size(3, 20, None, running)
+        assert size == expected
+        running.add(size)
+
+    # Then bisect the open sizes below the smallest SAT size.
+    assert _next_size(3, 20, 10, {3, 4, 6}) == 8
+    assert _next_size(3, 20, 7, {3, 4, 6}) == 5
+    assert _next_size(3, 20, 5, {3, 4}) is None
+    assert _next_size(5, 20, 5, set()) is None
+
+
+def test_search_size():
+    apta = APTA.from_examples(['a', 'abaa', 'bb'], ['abb', 'b'])
+    for workers in [1, 2, 3]:
+        size, model = search_size(apta, workers, sym_mode='bfs',
+                                  bounds=(1, 6))
+        assert size == 3 and model
+        size, _ = search_size(apta, workers, bounds=(5, 6))
+        assert size == 5
+        assert search_size(apta, workers, bounds=(1, 2)) is None
+
+
+def test_parallel_find_dfas():
+    examples = [
+        (['a', 'abaa', 'bb'], ['abb', 'b']),
+        (['a'], ['', 'b']),
+        ([[0], [0, 'z', 0, 0], ['z', 'z']], [[0, 'z', 'z'], ['z']]),
+    ]
+    for accepting, rejecting in examples:
+        for kwargs in [{}, {'order_by_stutter': True},
+                       {'allow_unminimized': True, 'bounds': (None, 4)}]:
+            expected = find_dfas(accepting, rejecting, **kwargs)
+            dfas = find_dfas(accepting, rejecting, workers=2, **kwargs)
+            assert sorted(map(repr, dfas)) == sorted(map(repr, expected))
+
+        my_dfa = find_dfa(accepting, rejecting, workers=3, bounds=(4, 6))
+        assert len(my_dfa.states()) == 4
+        assert all(my_dfa.label(x) for x in accepting)
+        assert not any(my_dfa.label(x) for x in rejecting)
@@ -0,0 +1,65 @@
+import os
+import signal
+
+import pytest
+
+from dfa_identify import find_dfa, find_dfas
+from dfa_identify.portfolio import (
+    DEFAULT_MEMBERS, SOLVER_NAMES, Member, Portfolio, PortfolioStats,
+)
+
+
+MEMBERS = [Member('g4'), Member('m22', seed=1)]
+
+
+def test_portfolio():
+    stats = PortfolioStats()
+    clauses = [[1, 2], [-1, 2]]
+    with Portfolio(clauses, members=MEMBERS, stick=False,
+                   stats=stats) as solver:
+        assert solver.solve() and solver.get_model()[1] == 2
+        assert solver.winner in MEMBERS
+        assert not solver.solve(assumptions=[-2])
+        assert solver.get_model() is None
+        assert len(list(solver.enum_models())) == 2
+        assert solver.leader is None
+
+        # Dead members drop out of the race, the others are restarted
+        # with all clauses, including those blocking the models.
+        for process, _, _ in list(solver.running.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        assert not solver.solve()
+    assert stats.races == sum(stats.wins.values()) == 6
+
+    with Portfolio(clauses, members=MEMBERS) as solver:
+        assert solver.solve()
+        assert solver.leader == solver.winner
+        assert list(solver.running) == [solver.leader]
+
+    with pytest.raises(ValueError):
+        Portfolio(members=[Member('bogus')])
+
+
+def test_default_members():
+    assert DEFAULT_MEMBERS
+    assert all(member.solver in SOLVER_NAMES for member in DEFAULT_MEMBERS)
+    with Portfolio([[1, 2], [-1, 2]], stick=False) as solver:
+        assert solver.solve() and solver.get_model()[1] == 2
+        assert not solver.solve(assumptions=[-2])
+
+
+def test_find_dfas():
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    expected = sorted(map(repr, find_dfas(accepting, rejecting)))
+    stats = PortfolioStats()
+    solver_fact = Portfolio.factory(*MEMBERS, stats=stats)
+    for incremental in [False, True]:
+        dfas = find_dfas(accepting, rejecting, solver_fact=solver_fact,
+                         incremental=incremental)
+        assert sorted(map(repr, dfas)) == expected
+    assert stats.races > 0
+
+    dfa = find_dfa(accepting, rejecting, solver_fact=solver_fact,
+                   order_by_stutter=True)
+    assert all(dfa.label(word) for word in accepting)
+    assert not any(dfa.label(word) for word in rejecting)
@@ -0,0 +1,94 @@
+from itertools import product
+
+import numpy as np
+from pysat.solvers import Glucose4
+
+from dfa_identify.cnf import CNF
+from dfa_identify.encoding import dfa_id_encodings
+from dfa_identify.graphs import APTA
+from dfa_identify.identify import extract_dfa
+from dfa_identify.simplify import simplify
+
+
+def models(clauses, n_vars):
+    return {
+        bits for bits in product([False, True], repeat=n_vars)
+        if all(any((lit > 0) == bits[abs(lit) - 1] for lit in clause)
+               for clause in clauses)
+    }
+
+
+def expanded_models(simplified, n_vars):
+    with Glucose4(bootstrap_with=simplified.clauses) as solver:
+        expanded = [simplified.expand(m) for m in solver.enum_models()]
+    # Variables above the largest occurring one are set to false.
+    return [tuple(lit > 0 for lit in m) + (False,) * (n_vars - len(m))
+            for m in expanded]
+
+
+def test_simplify():
+    clauses = [[1], [-1, 2], [-2, 3, 4], [3, 4, 5], [4, 3], [5, 6, -6],
+               [6, 7], [6, 7, 8], [7, 6], [-5, -7, 8]]
+    simplified = simplify(CNF.from_clauses(clauses))
+    stats = simplified.stats
+    assert not simplified.unsat
+    assert stats.units == 2  # 1, then 2.
+    assert stats.subsumed == 4  # Copies of [3, 4], [6, 7] and supersets.
+    assert stats.clauses == (10, len(simplified.clauses)) == (10, 3)
+    assert list(simplified.variables) == [3, 4, 5, 6, 7, 8]
+    assert list(simplified.assignment[1:3]) == [1, 1]
+    assert simplified.compress([1, -3, 8, 9]) == [-1, 6]
+    assert 'units' in str(stats)
+
+    # Same models, up to the variables that vanished.
+    expanded = expanded_models(simplified, 8)
+    assert len(expanded) == len(set(expanded))
+    assert set(expanded) == models(clauses, 8)
+
+
+def test_random_formulas():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n_vars = int(rng.integers(1, 7))
+        clauses = [
+            [int(rng.choice([-1, 1]) * rng.integers(1, n_vars + 1))
+             for _ in range(rng.integers(1, 4))]
+            for _ in range(rng.integers(0, 12))
+        ]
+        expected = models(clauses, n_vars)
+        for pure_literals in [False, True]:
+            simplified = simplify(CNF.from_clauses(clauses), pure_literals)
+            assert simplified.unsat <= (not expected)
+            expanded = set(expanded_models(simplified, n_vars))
+            assert expanded <= expected
+            assert bool(expanded) == bool(expected)
+
+
+def test_pure_literals():
+    clauses = CNF.from_clauses([[1, 2], [-2, 3], [-3, 1]])
+    simplified = simplify(clauses, pure_literals=True)
+    # 1 is pure, leaving [-2, 3] with two pure literals.
+    assert simplified.stats.pure == 3 and len(simplified.clauses) == 0
+    assert list(simplified.assignment) == [0, 1, -1, 1]
+    protected = simplify(clauses, pure_literals=True, protect=[1])
+    assert protected.stats.pure == 0 and len(protected.clauses) == 3
+
+
+def test_unsat():
+    simplified = simplify(CNF.from_clauses([[1, 2], [-1], [-2]]))
+    assert simplified.unsat
+    with Glucose4(bootstrap_with=simplified.clauses) as solver:
+        assert not solver.solve()
+
+
+def test_extract_dfa():
+    accepting, rejecting = ['a', 'abaa', 'bb'], ['abb', 'b']
+    apta = APTA.from_examples(accepting, rejecting)
+    codec, clauses = next(dfa_id_encodings(apta, sym_mode='bfs'))
+    simplified = simplify(clauses)
+    assert len(simplified.clauses) < len(clauses)
+    with Glucose4(bootstrap_with=simplified.clauses) as solver:
+        assert solver.solve()
+        dfa = extract_dfa(codec, apta, simplified.expand(solver.get_model()))
+    assert all(dfa.label(word) for word in accepting)
+    assert not any(dfa.label(word) for word in rejecting)